@@ -0,0 +1,252 @@
+import hashlib
+import json
+import threading
+import time
+from langchain_core.messages import AIMessage, HumanMessage
+from app.utils.batch_client import get_batch_client, wait_for
+from app.utils.config import BATCH_MAX_RECORDS, BATCH_POLL_SECONDS, BATCH_TIMEOUT_SECONDS
+from app.utils.metrics import register, Counter
+from app.utils.cancellation import JobCancelled
+
+BATCH_RECORDS = register(Counter("review_batch_records_total", "Prompts sent through batch inference.", ["result"]))
+
+# content of the placeholder handed out for a call that is waiting on a batch
+PENDING_RESULT = "\x00pending batch result\x00"
+
+
+class BatchRecordError(RuntimeError):
+    pass
+
+
+def _to_messages(prompt) -> list:
+    if isinstance(prompt, str):
+        prompt = [HumanMessage(content=prompt)]
+    return [
+        {"role": "assistant" if message.type == "ai" else "user", "content": [{"text": message.content}]}
+        for message in prompt
+    ]
+
+
+def _parse_output(output: dict, seconds: float):
+    if "error" in output:
+        return BatchRecordError(output["error"].get("errorMessage") or "Batch record failed")
+    model_output = output["modelOutput"]
+    text = "".join(part.get("text", "") for part in model_output["output"]["message"]["content"])
+    usage = model_output.get("usage", {})
+    input_tokens, output_tokens = usage.get("inputTokens", 0), usage.get("outputTokens", 0)
+    return AIMessage(
+        content=text,
+        usage_metadata={"input_tokens": input_tokens, "output_tokens": output_tokens,
+                        "total_tokens": input_tokens + output_tokens},
+        response_metadata={"stopReason": model_output.get("stopReason"), "batchSeconds": seconds},
+    )
+
+
+class BatchSession:
+    """
+    Collects the LLM calls of many jobs and runs them as batch inference.
+
+    While a job belongs to a session, invoke_llm hands its calls here. A call
+    whose result is in hand gets it; any other is recorded and answered with
+    a placeholder, and the bulk runner re-runs the step once flush() has
+    fetched the batch results. Identical calls from different jobs share one
+    record. release() drops what the session holds for finished jobs, so a
+    session can serve any number of rounds.
+    """
+
+    def __init__(self, client=None):
+        self.client = client or get_batch_client()
+        self._results = {}  # record key -> AIMessage or BatchRecordError
+        self._pending = {}  # record key -> (model_id, record)
+        self._waiting = {}  # job_id -> placeholders handed out
+        self._keys = {}  # job_id -> record keys it asked for
+        self._delivered = {}  # job_id -> record keys already returned to it
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.records = 0
+
+    def call(self, job_id, model_id: str, prompt, max_tokens: int):
+        messages = _to_messages(prompt)
+        serialized = json.dumps([model_id, max_tokens, messages])
+        key = hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+        with self._lock:
+            self._keys.setdefault(job_id, set()).add(key)
+            result = self._results.get(key)
+            if result is None:
+                self._waiting[job_id] = self._waiting.get(job_id, 0) + 1
+                # a prompt built from another placeholder waits for the next round
+                if PENDING_RESULT not in serialized:
+                    self._pending.setdefault(key, (model_id, {
+                        "recordId": key,
+                        "modelInput": {"messages": messages, "inferenceConfig": {"maxTokens": max_tokens}},
+                    }))
+                return AIMessage(content=PENDING_RESULT, response_metadata={"batchPending": True})
+            delivered = self._delivered.setdefault(job_id, set())
+            repeat = key in delivered
+            delivered.add(key)
+        if isinstance(result, Exception):
+            raise result
+        if repeat:
+            # already counted when the step first got it
+            return result.model_copy(update={"response_metadata": {**result.response_metadata, "batchRepeat": True}})
+        return result
+
+    def waiting(self, job_id) -> int:
+        with self._lock:
+            return self._waiting.get(job_id, 0)
+
+    def release(self, job_ids):
+        """Forgets finished jobs, and the results no other job of the session asked for."""
+        with self._lock:
+            keys = set()
+            for job_id in job_ids:
+                self._waiting.pop(job_id, None)
+                self._delivered.pop(job_id, None)
+                keys |= self._keys.pop(job_id, set())
+            for other in self._keys.values():
+                keys -= other
+            for key in keys:
+                self._results.pop(key, None)
+                self._pending.pop(key, None)
+
+    def flush(self) -> int:
+        """Submits the recorded calls, one batch per model and BATCH_MAX_RECORDS, and waits for their results."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+        by_model = {}
+        for model_id, record in pending.values():
+            by_model.setdefault(model_id, []).append(record)
+
+        started = time.monotonic()
+        batch_ids = [
+            self.client.submit(model_id, records[i:i + BATCH_MAX_RECORDS])
+            for model_id, records in by_model.items()
+            for i in range(0, len(records), BATCH_MAX_RECORDS)
+        ]
+        wait_for(self.client, batch_ids, BATCH_POLL_SECONDS, BATCH_TIMEOUT_SECONDS)
+        seconds = time.monotonic() - started
+        results = {}
+        for batch_id in batch_ids:
+            for output in self.client.results(batch_id):
+                results[output["recordId"]] = _parse_output(output, seconds)
+
+        with self._lock:
+            for key in pending:
+                result = results.get(key) or BatchRecordError("Batch returned no result for this prompt")
+                self._results[key] = result
+                BATCH_RECORDS.inc(result="error" if isinstance(result, Exception) else "ok")
+            self.batches += len(batch_ids)
+            self.records += len(pending)
+        return len(pending)
+
+
+# job_id -> session for jobs being reviewed in bulk
+_sessions = {}
+
+
+def batch_session(job_id):
+    return _sessions.get(job_id)
+
+
+def _run_steps(session: BatchSession, steps: list, states: dict):
+    """
+    Runs (job_id, node, node input) steps, re-running those left waiting on
+    batch results. A cancelled job's state gets cancelled=True and its
+    remaining steps are dropped.
+    """
+    while steps:
+        waiting = []
+        for step in steps:
+            job_id, node, node_input = step
+            if states[job_id].get("cancelled"):
+                continue
+            before = session.waiting(job_id)
+            try:
+                output = node(node_input)
+            except JobCancelled:
+                states[job_id]["cancelled"] = True
+                continue
+            if session.waiting(job_id) > before:
+                waiting.append(step)
+            else:
+                # errors accumulate across nodes, as the graph's reducer does
+                errors = output.pop("errors", None)
+                states[job_id].update(output)
+                if errors:
+                    states[job_id]["errors"] = list(states[job_id].get("errors") or []) + errors
+        if waiting and not session.flush():
+            raise RuntimeError("Bulk review steps are waiting on batch results that were never requested")
+        steps = waiting
+
+
+def run_bulk(jobs: list, session: BatchSession = None) -> dict:
+    """
+    Reviews many submissions through batch inference.
+
+    jobs are (job_id, user_code, user_id) tuples. The analyzers of every job
+    run first, then generate_report for every job, each phase flushing its
+    prompts as batches. Returns job_id -> final graph state.
+    """
+    from app.analyzer_logic.graph import detect_language, generate_report, branch_input, SECTION_KEYS
+    from app.analyzer_logic.python_analyzer import (
+        python_code_analyzer, python_security_checker, python_performance_evaluator,
+        python_best_practices_checker, python_complexity_analyzer, python_documentation_reviewer,
+    )
+    from app.analyzer_logic.react_analyzer import (
+        react_code_analyzer, react_specific_analyzer, react_security_checker, react_accessibility_checker,
+        react_performance_evaluator, react_best_practices_checker, react_complexity_analyzer,
+        react_documentation_reviewer,
+    )
+    from app.analyzer_logic.code_buffer import register_code, release_code
+    from app.analyzer_logic.near_dup import near_dup_index
+    from app.analyzer_logic.unit_findings import findings_scope
+    from app.analyzer_logic.budgets import release_job
+    from app.utils.extensions import AgentState
+
+    analyzers = {
+        "python": [python_code_analyzer, python_security_checker, python_performance_evaluator,
+                   python_best_practices_checker, python_complexity_analyzer, python_documentation_reviewer],
+        "react": [react_code_analyzer, react_specific_analyzer, react_security_checker, react_accessibility_checker,
+                  react_performance_evaluator, react_best_practices_checker, react_complexity_analyzer,
+                  react_documentation_reviewer],
+    }
+
+    session = session or BatchSession()
+    states, fingerprints = {}, {}
+    try:
+        for job_id, user_code, user_id in jobs:
+            code_ref = register_code(user_code)
+            _sessions[job_id] = session
+            state = states[job_id] = AgentState(code_ref=code_ref, job_id=job_id, findings_scope=findings_scope(user_id))
+            state.update(detect_language(state))
+            fingerprints[job_id] = near_dup_index.fingerprint(user_code, state["language"], state["findings_scope"])
+            near_dup = near_dup_index.lookup(user_code, fingerprints[job_id])
+            state["reused_sections"] = near_dup[0] if near_dup else None
+
+        _run_steps(session, [
+            (job_id, analyzer, branch_input(state))
+            for job_id, state in states.items()
+            for analyzer in analyzers[state["language"]]
+        ], states)
+        _run_steps(session, [
+            (job_id, generate_report, state)
+            for job_id, state in states.items()
+            if not state.get("cancelled")
+        ], states)
+
+        for job_id, user_code, _ in jobs:
+            state = states[job_id]
+            if not state.get("reused_sections") and not state.get("cancelled"):
+                near_dup_index.add(job_id, user_code, fingerprints[job_id], {
+                    key: state[key] for key in SECTION_KEYS
+                    if state.get(key) and not state[key].startswith("Error during")
+                })
+    finally:
+        for job_id, state in states.items():
+            _sessions.pop(job_id, None)
+            release_job(job_id)
+            release_code(state["code_ref"])
+        session.release(states)
+    return states
@@ -0,0 +1,187 @@
+import re
+import threading
+from langchain_core.messages import AIMessage, HumanMessage
+from app.utils.config import (
+    OUTPUT_BUDGET_BASE_TOKENS,
+    OUTPUT_BUDGET_PER_UNIT_TOKENS,
+    OUTPUT_BUDGET_PER_KLINE_TOKENS,
+    OUTPUT_BUDGET_PER_FINDING_TOKENS,
+    OUTPUT_BUDGET_MIN_TOKENS,
+    OUTPUT_MAX_CONTINUATIONS,
+    SUMMARY_INPUT_TOKEN_BUDGET,
+)
+from app.utils.metrics import register, Counter
+
+TOKEN_BUDGET_RESERVED = register(Counter("review_output_tokens_reserved_total",
+                                         "Output tokens requested as max tokens, by section.", ["section"]))
+TOKEN_BUDGET_TRUNCATED = register(Counter("review_output_truncations_total",
+                                          "Responses that stopped at their output budget.", ["section", "continued"]))
+SUMMARY_TOKENS_SAVED = register(Counter("review_summary_input_tokens_saved_total",
+                                        "Estimated tokens kept out of generate_report by summarizing long sections."))
+
+# Fixed per-call cap the analyzers used before budgets, the baseline for savings
+UNBUDGETED_MAX_TOKENS = 32000
+
+CONTINUE_PROMPT = ("Your previous answer was cut off at the output limit. Continue exactly where it stopped, "
+                   "without repeating anything already written.")
+
+_FINDING_LINE = re.compile(r"^\s*(?:[-*]|\d+\.)\s+\S", re.M)
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // 4
+
+
+def count_findings(text: str) -> int:
+    """List items in a section, a rough count of its findings."""
+    return len(_FINDING_LINE.findall(text))
+
+
+def output_budget(route_cap: int, code_lines: int = 0, units: int = 0, findings: int = 0) -> int:
+    """Max output tokens for one call: grows with the code and what there is to report, within the route's cap."""
+    budget = (OUTPUT_BUDGET_BASE_TOKENS
+              + OUTPUT_BUDGET_PER_UNIT_TOKENS * units
+              + OUTPUT_BUDGET_PER_KLINE_TOKENS * code_lines // 1000
+              + OUTPUT_BUDGET_PER_FINDING_TOKENS * findings)
+    return max(min(budget, route_cap), min(OUTPUT_BUDGET_MIN_TOKENS, route_cap))
+
+
+def budget_note(max_tokens: int) -> str:
+    return (f"\n\nKeep the whole answer under about {max_tokens * 3 // 4} words. "
+            "List critical and high severity findings first so nothing important is lost if space runs out.")
+
+
+def is_batch_placeholder(result) -> bool:
+    """True for a bulk review's placeholder or repeated batch result, which are not counted again."""
+    metadata = getattr(result, "response_metadata", None) or {}
+    return bool(metadata.get("batchPending") or metadata.get("batchRepeat"))
+
+
+def is_truncated(result) -> bool:
+    metadata = getattr(result, "response_metadata", None) or {}
+    return (metadata.get("stopReason") or metadata.get("stop_reason")) == "max_tokens"
+
+
+class _JobBudget:
+    __slots__ = ("calls", "reserved", "output", "truncated", "continuations", "summary_before", "summary_after")
+
+    def __init__(self):
+        self.calls = 0
+        self.reserved = 0
+        self.output = 0
+        self.truncated = []
+        self.continuations = 0
+        self.summary_before = 0
+        self.summary_after = 0
+
+
+_jobs = {}
+_jobs_lock = threading.Lock()
+
+
+def _job(job_id) -> _JobBudget:
+    return _jobs.setdefault(job_id, _JobBudget())
+
+
+def record_call(job_id, section: str, max_tokens: int, result, continued: bool = False):
+    if is_batch_placeholder(result):
+        return
+    usage = getattr(result, "usage_metadata", None) or {}
+    TOKEN_BUDGET_RESERVED.inc(max_tokens, section=section)
+    with _jobs_lock:
+        stats = _job(job_id)
+        stats.calls += 1
+        stats.reserved += max_tokens
+        stats.output += usage.get("output_tokens", 0)
+        stats.continuations += continued
+
+
+def record_truncated(job_id, section: str, continued: bool):
+    TOKEN_BUDGET_TRUNCATED.inc(section=section, continued=str(continued).lower())
+    with _jobs_lock:
+        stats = _job(job_id)
+        if section not in stats.truncated:
+            stats.truncated.append(section)
+
+
+def record_summary(job_id, tokens_before: int, tokens_after: int):
+    SUMMARY_TOKENS_SAVED.inc(tokens_before - tokens_after)
+    with _jobs_lock:
+        stats = _job(job_id)
+        stats.summary_before = tokens_before
+        stats.summary_after = tokens_after
+
+
+def job_token_report(job_id) -> dict:
+    """Token savings so far for a job, for the report metadata."""
+    with _jobs_lock:
+        stats = _jobs.get(job_id) or _JobBudget()
+        baseline = stats.calls * UNBUDGETED_MAX_TOKENS
+        return {
+            "calls": stats.calls,
+            "reserved_output_tokens": stats.reserved,
+            "unbudgeted_output_tokens": baseline,
+            "reserved_tokens_saved": baseline - stats.reserved,
+            "output_tokens": stats.output,
+            "truncated_sections": list(stats.truncated),
+            "continuations": stats.continuations,
+            "summary_input_tokens": stats.summary_after,
+            "summary_input_tokens_saved": stats.summary_before - stats.summary_after,
+        }
+
+
+def release_job(job_id):
+    with _jobs_lock:
+        _jobs.pop(job_id, None)
+
+
+def call_with_continuation(call, job_id, section: str, prompt: str, max_tokens: int, max_continuations: int = None):
+    """
+    call(messages, max_tokens) -> AIMessage. A response cut off at max_tokens
+    is continued up to max_continuations (OUTPUT_MAX_CONTINUATIONS) times and the parts joined.
+    """
+    if max_continuations is None:
+        max_continuations = OUTPUT_MAX_CONTINUATIONS
+    result = call(prompt, max_tokens)
+    record_call(job_id, section, max_tokens, result)
+    parts = [result.content]
+    usage = dict(getattr(result, "usage_metadata", None) or {})
+    continuations = 0
+    while is_truncated(result):
+        continued = continuations < max_continuations
+        record_truncated(job_id, section, continued)
+        if not continued:
+            break
+        continuations += 1
+        messages = [HumanMessage(content=prompt), AIMessage(content="".join(parts)), HumanMessage(content=CONTINUE_PROMPT)]
+        result = call(messages, max_tokens)
+        record_call(job_id, section, max_tokens, result, continued=True)
+        parts.append(result.content)
+        for key, value in (getattr(result, "usage_metadata", None) or {}).items():
+            usage[key] = usage.get(key, 0) + value
+    if continuations == 0:
+        return result
+    return AIMessage(content="".join(parts), usage_metadata=usage, response_metadata=result.response_metadata)
+
+
+def fit_sections(sections: dict, budget: int = SUMMARY_INPUT_TOKEN_BUDGET) -> tuple:
+    """
+    Splits a token budget over the sections: short sections keep their full
+    text and the rest share what is left equally. Returns
+    (tokens each over-long section must be cut to, total tokens before).
+    """
+    sizes = {key: estimate_tokens(text) for key, text in sections.items()}
+    total = sum(sizes.values())
+    if total <= budget:
+        return {}, total
+    remaining, pending = budget, dict(sizes)
+    while pending:
+        share = remaining // len(pending)
+        fitting = {key: size for key, size in pending.items() if size <= share}
+        if not fitting:
+            return {key: share for key in pending}, total
+        for key, size in fitting.items():
+            remaining -= size
+            del pending[key]
+    return {}, total
+
@@ -0,0 +1,56 @@
+import hashlib
+import threading
+
+
+class CodeBuffer:
+    """Immutable holder for one submission's source text."""
+
+    __slots__ = ("text", "sha256", "size")
+
+    def __init__(self, text: str, sha256: str = None):
+        object.__setattr__(self, "text", text)
+        object.__setattr__(self, "sha256", sha256 or hashlib.sha256(text.encode("utf-8")).hexdigest())
+        object.__setattr__(self, "size", len(text))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("CodeBuffer is immutable")
+
+
+# code_ref -> [CodeBuffer, reference count]. Graph state carries only the
+# ref, so fan-out branches, checkpoints and prompts all read one copy.
+_buffers = {}
+_lock = threading.Lock()
+
+
+def register_code(text: str, sha256: str = None) -> str:
+    """Stores the code (once per distinct content) and returns its ref; pass sha256 if already known."""
+    buffer = CodeBuffer(text, sha256)
+    with _lock:
+        entry = _buffers.get(buffer.sha256)
+        if entry is None:
+            _buffers[buffer.sha256] = [buffer, 1]
+        else:
+            entry[1] += 1
+    return buffer.sha256
+
+
+def get_buffer(code_ref: str) -> CodeBuffer:
+    with _lock:
+        entry = _buffers.get(code_ref)
+    if entry is None:
+        raise KeyError(f"Code buffer {code_ref} is not registered")
+    return entry[0]
+
+
+def get_code(code_ref: str) -> str:
+    return get_buffer(code_ref).text
+
+
+def release_code(code_ref: str):
+    with _lock:
+        entry = _buffers.get(code_ref)
+        if entry is None:
+            return
+        entry[1] -= 1
+        if entry[1] <= 0:
+            del _buffers[code_ref]
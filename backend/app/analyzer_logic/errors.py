@@ -0,0 +1,89 @@
+from app.utils.metrics import register, Counter
+
+NODE_FAILURES = register(Counter("review_node_failures_total", "Analyzer sections and reports that failed, by error code.", ["node", "code"]))
+
+# Error codes on job rows and in graph state. Retryable ones may succeed if
+# the same call is made again later; the others will fail the same way.
+THROTTLED = "throttled"
+TIMEOUT = "timeout"
+UNAVAILABLE = "unavailable"
+VALIDATION = "validation"
+ACCESS_DENIED = "access_denied"
+QUOTA_EXCEEDED = "quota_exceeded"
+CODE_UNAVAILABLE = "code_unavailable"
+ABANDONED = "abandoned"
+INTERNAL = "internal"
+RETRYABLE = {THROTTLED, TIMEOUT, UNAVAILABLE, ABANDONED}
+
+# node name of the report step; its failure fails the job
+REPORT_NODE = "final_documentation"
+
+# provider error codes (a botocore ClientError's Error.Code) and exception class names
+_KNOWN_ERRORS = {
+    "ThrottlingException": THROTTLED,
+    "TooManyRequestsException": THROTTLED,
+    "ServiceQuotaExceededException": THROTTLED,
+    "ModelTimeoutException": TIMEOUT,
+    "ReadTimeoutError": TIMEOUT,
+    "ConnectTimeoutError": TIMEOUT,
+    "TimeoutError": TIMEOUT,
+    "ServiceUnavailableException": UNAVAILABLE,
+    "InternalServerException": UNAVAILABLE,
+    "ModelNotReadyException": UNAVAILABLE,
+    "ModelErrorException": UNAVAILABLE,
+    "EndpointConnectionError": UNAVAILABLE,
+    "ConnectionClosedError": UNAVAILABLE,
+    "ConnectionError": UNAVAILABLE,
+    "ValidationException": VALIDATION,
+    "ResourceNotFoundException": VALIDATION,
+    "AccessDeniedException": ACCESS_DENIED,
+    "UnrecognizedClientException": ACCESS_DENIED,
+    "ExpiredTokenException": ACCESS_DENIED,
+}
+
+
+def classify(error: BaseException) -> str:
+    """
+    Error code for an exception: the provider's error code if it has one,
+    else the first known class in its MRO, else a known code named in its
+    message (batch records carry only a message), else INTERNAL.
+    """
+    response = getattr(error, "response", None)
+    if isinstance(response, dict):
+        code = _KNOWN_ERRORS.get((response.get("Error") or {}).get("Code"))
+        if code:
+            return code
+    for cls in type(error).__mro__:
+        if cls.__name__ in _KNOWN_ERRORS:
+            return _KNOWN_ERRORS[cls.__name__]
+    message = str(error)
+    for name, code in _KNOWN_ERRORS.items():
+        if name in message:
+            return code
+    return INTERNAL
+
+
+def node_error(node: str, error: BaseException) -> dict:
+    """The state entry for a failed section or report; plain data so checkpoints can hold it."""
+    code = classify(error)
+    NODE_FAILURES.inc(node=node, code=code)
+    return {
+        "node": node,
+        "code": code,
+        "retryable": code in RETRYABLE,
+        "message": f"{type(error).__name__}: {error}"[:500],
+    }
+
+
+def job_outcome(errors: list) -> tuple:
+    """
+    (status, error_code, reason) for a finished graph run: failed if the
+    report could not be generated, partial if only sections failed.
+    """
+    if not errors:
+        return "completed", None, None
+    report_errors = [error for error in errors if error["node"] == REPORT_NODE]
+    if report_errors:
+        return "failed", report_errors[0]["code"], f"Report generation failed: {report_errors[0]['message']}"
+    failed = ", ".join(f"{error['node']} ({error['code']})" for error in errors)
+    return "partial", errors[0]["code"], f"Sections failed: {failed}. First error: {errors[0]['message']}"
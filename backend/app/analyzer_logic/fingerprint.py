@@ -0,0 +1,214 @@
+import ast
+import builtins
+import hashlib
+import re
+import struct
+
+# Mersenne prime for the universal hash family used by MinHash
+_PRIME = (1 << 61) - 1
+
+JS_KEYWORDS = frozenset("""
+    async await break case catch class const continue debugger default delete do else export extends
+    false finally for from function if import in instanceof let new null of return static super switch
+    this throw true try typeof undefined var void while with yield
+    useState useEffect useContext useReducer useMemo useCallback useRef React props
+""".split())
+
+_JS_COMMENT = re.compile(r"//[^\n]*|/\*.*?\*/", re.S)
+_JS_TOKEN = re.compile(r"""`(?:\\.|[^`\\])*`|"(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*'|[A-Za-z_$][\w$]*|\d[\w.]*|[^\s\w]""")
+_JS_IMPORT = re.compile(r"^\s*import\b.*?;?\s*$", re.M)
+_JS_DECLARE = frozenset(("var", "let", "const", "function", "class"))
+_BUILTINS = frozenset(dir(builtins))
+
+
+def _bound_names(tree) -> set:
+    """
+    Names the code binds itself: parameters, assignment, loop and with
+    targets, functions, classes and except aliases. Builtins and imported
+    names are left out even when rebound, so int(x) and eval(x) never
+    canonicalize to the same thing.
+    """
+    bound, imported = set(), set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.arg):
+            bound.add(node.arg)
+        elif isinstance(node, ast.Name) and isinstance(node.ctx, (ast.Store, ast.Del)):
+            bound.add(node.id)
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            bound.add(node.name)
+        elif isinstance(node, ast.ExceptHandler) and node.name:
+            bound.add(node.name)
+        elif isinstance(node, ast.alias):
+            imported.add((node.asname or node.name).split(".")[0])
+    return bound - imported - _BUILTINS
+
+
+class _Canonicalize(ast.NodeTransformer):
+    """Renames locally bound names to positional placeholders and drops docstrings."""
+
+    def __init__(self, bound: set):
+        self.bound = bound
+        self.names = {}
+
+    def _name(self, name: str) -> str:
+        if name not in self.bound:
+            return name
+        return self.names.setdefault(name, f"v{len(self.names)}")
+
+    def _strip_docstring(self, node):
+        body = getattr(node, "body", None)
+        if body and isinstance(body[0], ast.Expr) and isinstance(body[0].value, ast.Constant) \
+                and isinstance(body[0].value.value, str):
+            node.body = body[1:] or [ast.Pass()]
+
+    def generic_visit(self, node):
+        if isinstance(node, (ast.Module, ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            self._strip_docstring(node)
+        return super().generic_visit(node)
+
+    def visit_Name(self, node):
+        node.id = self._name(node.id)
+        return node
+
+    def visit_arg(self, node):
+        node.arg = self._name(node.arg)
+        node.annotation = None
+        return node
+
+    def visit_FunctionDef(self, node):
+        node.name = self._name(node.name)
+        return self.generic_visit(node)
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+    def visit_ClassDef(self, node):
+        node.name = self._name(node.name)
+        return self.generic_visit(node)
+
+
+def python_tokens(code: str):
+    """
+    Token stream of a normalized ast dump: comments, docstrings, formatting,
+    locally bound names and top-level import order do not change it; free
+    names (builtins, imports, globals) and attributes do. Returns None if
+    the code does not parse.
+    """
+    try:
+        tree = ast.parse(code)
+    except (SyntaxError, ValueError):
+        return None
+    imports = sorted((node for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))), key=ast.dump)
+    tree.body = imports + [node for node in tree.body if not isinstance(node, (ast.Import, ast.ImportFrom))]
+    dump = ast.dump(_Canonicalize(_bound_names(tree)).visit(tree), annotate_fields=False, include_attributes=False)
+    return re.findall(r"\w+|[^\w\s]", dump)
+
+
+def _is_identifier(token: str) -> bool:
+    return (token[0].isalpha() or token[0] in "_$") and token not in JS_KEYWORDS
+
+
+def _is_property(tokens: list, i: int) -> bool:
+    """tokens[i] follows a member-access dot (not a spread's ...)."""
+    return i > 0 and tokens[i - 1] == "." and (i < 2 or tokens[i - 2] != ".")
+
+
+def _js_params(tokens: list, start: int, bound: set):
+    """Adds the names in the bracketed list opening at tokens[start], skipping default values."""
+    depth = 0
+    for i in range(start, len(tokens)):
+        token = tokens[i]
+        if token in "([{":
+            depth += 1
+        elif token in ")]}":
+            depth -= 1
+            if depth == 0:
+                return
+        elif _is_identifier(token) and tokens[i - 1] in ("(", ",", "{", "[", ".") and not _is_property(tokens, i):
+            bound.add(token)
+
+
+def _js_bound_names(tokens: list) -> set:
+    """Declared names (var/let/const/function/class, parameters, arrow and catch parameters)."""
+    bound = set()
+    for i, token in enumerate(tokens[:-1]):
+        following = tokens[i + 1]
+        if token in _JS_DECLARE:
+            if following in ("{", "["):
+                _js_params(tokens, i + 1, bound)
+            elif _is_identifier(following):
+                bound.add(following)
+            if token == "function":
+                opening = next((j for j in range(i + 1, min(i + 4, len(tokens))) if tokens[j] == "("), None)
+                if opening is not None:
+                    _js_params(tokens, opening, bound)
+        elif token == "catch" and following == "(":
+            _js_params(tokens, i + 1, bound)
+        elif token == "=" and following == ">" and i > 0:
+            if _is_identifier(tokens[i - 1]):
+                bound.add(tokens[i - 1])
+            elif tokens[i - 1] == ")":
+                depth = 0
+                for j in range(i - 1, -1, -1):
+                    depth += tokens[j] == ")"
+                    depth -= tokens[j] == "("
+                    if depth == 0:
+                        _js_params(tokens, j, bound)
+                        break
+    return bound
+
+
+def js_tokens(code: str):
+    """
+    Token stream of JS/JSX with comments stripped, imports sorted and
+    declared names numbered; globals, imports and properties keep their names.
+    """
+    code = _JS_COMMENT.sub(" ", code)
+    imports = sorted(match.group(0).strip() for match in _JS_IMPORT.finditer(code))
+    code = "\n".join(imports) + "\n" + _JS_IMPORT.sub("", code)
+    tokens = _JS_TOKEN.findall(code)
+    bound = _js_bound_names(tokens)
+    names = {}
+    for i, token in enumerate(tokens):
+        if token in bound and not _is_property(tokens, i):
+            tokens[i] = names.setdefault(token, f"v{len(names)}")
+    return tokens
+
+
+def fingerprint_tokens(code: str, language: str):
+    """Returns (kind, tokens); codes are only compared with codes of the same kind."""
+    if language == "python":
+        tokens = python_tokens(code)
+        if tokens is not None:
+            return "python-ast", tokens
+    return "js-tokens", js_tokens(code)
+
+
+def _hash64(data: bytes) -> int:
+    return struct.unpack("<Q", hashlib.blake2b(data, digest_size=8).digest())[0]
+
+
+class MinHasher:
+    """MinHash signatures over token k-shingles."""
+
+    def __init__(self, num_perm: int = 64, shingle_size: int = 5, seed: int = 1):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self._params = [
+            (_hash64(f"a{seed}:{i}".encode()) % (_PRIME - 1) + 1, _hash64(f"b{seed}:{i}".encode()) % _PRIME)
+            for i in range(num_perm)
+        ]
+
+    def shingles(self, tokens: list) -> set:
+        k = self.shingle_size
+        if len(tokens) <= k:
+            return {_hash64(" ".join(tokens).encode())}
+        return {_hash64(" ".join(tokens[i:i + k]).encode()) for i in range(len(tokens) - k + 1)}
+
+    def signature(self, tokens: list) -> tuple:
+        hashed = self.shingles(tokens)
+        return tuple(min((a * h + b) % _PRIME for h in hashed) for a, b in self._params)
+
+
+def estimate_similarity(left: tuple, right: tuple) -> float:
+    """Estimated Jaccard similarity of the shingle sets behind two signatures."""
+    return sum(1 for a, b in zip(left, right) if a == b) / len(left)
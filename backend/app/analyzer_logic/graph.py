@@ -4,9 +4,29 @@ from langgraph.graph import StateGraph, END
 from app.analyzer_logic.python_analyzer import *
 from app.analyzer_logic.react_analyzer import *
 from datetime import datetime
-from app.utils.extensions import AgentState
+from app.utils.extensions import AgentState, BranchInput, llm
+from app.analyzer_logic.code_buffer import register_code, release_code, get_code, get_buffer
 from langgraph.types import Send
-import os
+from app.analyzer_logic.llm_runner import PENDING_SECTION, invoke_llm, pop_late_sections, collect_late_sections, set_resumed_deadline, summarize_sections, output_tokens_for
+from app.analyzer_logic.budgets import count_findings, job_token_report, release_job, budget_note
+from app.analyzer_logic.templates import prompts
+from app.analyzer_logic.errors import node_error, REPORT_NODE
+from app.analyzer_logic.single_flight import single_flight, SharedReview
+from app.analyzer_logic.near_dup import near_dup_index
+from app.analyzer_logic.unit_findings import findings_scope
+from app.utils.config import JOB_TIMEOUT_SECONDS, LLM_PROVIDER, LLM_ROUTING, CHECKPOINT_DB_PATH
+from app.utils.metrics import instrument_node, save_job_metrics, JOB_QUEUE_SECONDS, JOB_SECONDS
+from app.utils.storage import get_storage
+from app.utils.cancellation import cancellations, JobCancelled
+import hashlib
+import sqlite3
+import threading
+import time
+
+try:
+    from langgraph.checkpoint.sqlite import SqliteSaver
+except ImportError:  # optional: without it a retried job starts from scratch
+    SqliteSaver = None
 
 def detect_language(state: AgentState) -> str:
     """
@@ -36,7 +56,7 @@ def detect_language(state: AgentState) -> str:
         r'\.py[\'"]',
     ]
     
-    code = state["user_code"]
+    code = get_code(state["code_ref"])
     react_score = sum(1 for pattern in react_patterns if re.search(pattern, code))
     python_score = sum(1 for pattern in python_patterns if re.search(pattern, code))
     
@@ -44,104 +64,54 @@ def detect_language(state: AgentState) -> str:
 
     return {"language": language}
 
+PENDING_NOTE = ("Some sections are marked pending because they did not finish in time. "
+                "Do not guess their findings; note them as pending in the relevant scores.")
+
+SECTION_KEYS = [
+    "code_analysis",
+    "security_report",
+    "performance_report",
+    "best_practices_report",
+    "complexity_report",
+    "documentation_report",
+    "react_specific_report",
+    "accessibility_report",
+]
+
 def generate_report(state: AgentState):
     """Generates comprehensive report combining all analyses."""
     language = state['language']
-    user_code = state['user_code']
-    code_analysis = state.get('code_analysis', 'Not available')
-    security_report = state.get('security_report', 'Not available')
-    performance_report = state.get('performance_report', 'Not available')
-    best_practices = state.get('best_practices_report', 'Not available')
-    complexity_report = state.get('complexity_report', 'Not available')
-    documentation_report = state.get('documentation_report', 'Not available')
-    react_specific = state.get('react_specific_report', 'Not analyzed')
-    accessibility_report = state.get('accessibility_report', 'Not analyzed')
-
-    sections = f"""
-## Code Quality Analysis
-{code_analysis}
-
-## Security Assessment
-{security_report}
-
-## Performance Evaluation
-{performance_report}
-
-## Best Practices Review
-{best_practices}
-
-## Complexity Analysis
-{complexity_report}
-
-## Documentation Review
-{documentation_report}"""
-
-    if language == "react":
-        sections += f"""
-
-## React-Specific Analysis
-{react_specific}
-
-## Accessibility (a11y) Review
-{accessibility_report}"""
-
-    prompt = f"""You are a senior technical reviewer creating an executive summary for {language.upper()} code.
-
-Based on the comprehensive analysis reports below, create a unified, well-structured report:
-
-# Analysis Reports
-{sections}
-
-# Your Task
-
-Create a comprehensive executive report with:
-
-1. **Executive Summary**
-    - Overall code quality rating (1-10)
-    - Key findings summary
-    - Critical issues count by category
-
-    2. **Priority Action Items**
-    - Top 10 critical issues to address immediately
-    - Ranked by impact and effort
-
-    3. **Detailed Findings by Category**
-    - Consolidate and organize findings
-    - Remove redundancy
-    - Provide context and impact
-
-    4. **Code Health Metrics**
-    - Security score (1-10)
-    - Performance score (1-10)
-    - Maintainability score (1-10)
-    - Documentation score (1-10)
-    {"- Accessibility score (1-10)" if language == "react" else ""}
-
-    5. **Recommendations**
-    - Quick fixes (< 1 hour)
-    - Short-term fixes (< 1 day)
-    - Medium-term improvements (1-5 days)
-    - Long-term refactoring (> 5 days)
-
-    6. **Positive Aspects**
-    - What the code does well
-    - Good practices followed
-
-    7. **Technology-Specific Insights**
-    {"- React patterns and hooks usage" if language == "react" else "- Python-specific optimizations"}
-    {"- Frontend performance considerations" if language == "react" else "- Backend optimization opportunities"}
-
-**DO NOT provide corrected code in this report.**
-
-Format the report in clear markdown with proper sections."""
+    code_buffer = get_buffer(state['code_ref'])
+    pending_sections = [key for key in SECTION_KEYS if state.get(key) == PENDING_SECTION]
+    # the error text is for the job row, not for the model writing the report
+    failed = {error["node"]: error["code"] for error in state.get("errors") or [] if error["node"] in SECTION_KEYS}
+    report_keys = SECTION_KEYS if language == "react" else SECTION_KEYS[:6]
+    texts = summarize_sections(state.get("job_id"), {
+        key: f"Not available: this analysis failed ({failed[key]})." if key in failed
+        else state.get(key) or ("Not analyzed" if key in SECTION_KEYS[6:] else "Not available")
+        for key in report_keys
+    }, code_buffer.size)
+    findings = sum(count_findings(text) for text in texts.values())
+    max_tokens = output_tokens_for("final_documentation", code_buffer.size, findings=findings)
+    prompt = prompts.render(
+        f"{language}/final_documentation",
+        extra=(budget_note(max_tokens),),
+        pending_note=PENDING_NOTE if pending_sections else "",
+        **texts
+    )
 
     try:
-        result = llm.invoke(prompt)
+        result = invoke_llm(state.get("job_id"), REPORT_NODE, prompt, code_length=code_buffer.size,
+                            max_tokens=max_tokens)
         
         metadata = {
             "review_date": datetime.now().isoformat(),
             "language": language,
-            "code_length": len(user_code),
+            "code_length": code_buffer.size,
+            "pending_sections": pending_sections,
+            "failed_sections": sorted(failed),
+            "reused_sections": sorted(state.get("reused_sections") or {}),
+            "token_budget": job_token_report(state.get("job_id")),
             "review_sections": [
                 "Code Quality",
                 "Security",
@@ -162,7 +132,8 @@ Format the report in clear markdown with proper sections."""
     except Exception as e:
         return {
             "final_documentation": f"Error generating final report: {str(e)}",
-            "metadata": {"error": str(e)}
+            "metadata": {"error": str(e)},
+            "errors": [node_error(REPORT_NODE, e)]
         }
 
 def python_node(code: str) -> dict:
@@ -171,54 +142,67 @@ def python_node(code: str) -> dict:
 def react_node(code: str) -> dict:
     return {"language": "react"}
 
+def branch_input(state: AgentState) -> BranchInput:
+    """Only what the analyzers read; the messages list and other sections stay behind."""
+    return BranchInput(
+        code_ref=state["code_ref"],
+        language=state.get("language"),
+        job_id=state.get("job_id"),
+        deadline=state.get("deadline"),
+        reused_sections=state.get("reused_sections"),
+        findings_scope=state.get("findings_scope")
+    )
+
 def python_parallel_node(state: AgentState):
+    branch = branch_input(state)
     return[
-        Send("python_code_reviwer",state),
-        Send("python_security_checker",state),
-        Send("python_performance_evaluator",state),
-        Send("python_best_practices_checker",state),
-        Send("python_complexity_analyzer",state),
-        Send("python_documentation_reviewer",state)
+        Send("python_code_reviwer",branch),
+        Send("python_security_checker",branch),
+        Send("python_performance_evaluator",branch),
+        Send("python_best_practices_checker",branch),
+        Send("python_complexity_analyzer",branch),
+        Send("python_documentation_reviewer",branch)
     ]
     
 def react_parallel_node(state: AgentState):
+    branch = branch_input(state)
     return[
-        Send("react_code_analyzer",state),
-        Send("react_security_checker",state),
-        Send("react_accessibility_checker",state),
-        Send("react_performance_evaluator",state),
-        Send("react_best_practices_checker",state),
-        Send("react_complexity_analyzer",state),
-        Send("react_documentation_reviewer",state),
-        Send("react_specific_analyzer",state)
+        Send("react_code_analyzer",branch),
+        Send("react_security_checker",branch),
+        Send("react_accessibility_checker",branch),
+        Send("react_performance_evaluator",branch),
+        Send("react_best_practices_checker",branch),
+        Send("react_complexity_analyzer",branch),
+        Send("react_documentation_reviewer",branch),
+        Send("react_specific_analyzer",branch)
     ]
     
-def create_workflow():
+def create_workflow(checkpointer=None):
     graph = StateGraph(AgentState)
 
-    graph.add_node("detect_language",detect_language)
+    graph.add_node("detect_language",instrument_node("detect_language",detect_language))
 
     # graph.add_node("python_parallel_node",python_parallel_node)
-    graph.add_node("python_node",python_node)
-    graph.add_node("python_code_reviwer",python_code_analyzer)
-    graph.add_node("python_security_checker",python_security_checker)
-    graph.add_node("python_performance_evaluator",python_performance_evaluator)
-    graph.add_node("python_best_practices_checker",python_best_practices_checker)
-    graph.add_node("python_complexity_analyzer",python_complexity_analyzer)
-    graph.add_node("python_documentation_reviewer",python_documentation_reviewer)
+    graph.add_node("python_node",instrument_node("python_node",python_node))
+    graph.add_node("python_code_reviwer",instrument_node("python_code_reviwer",python_code_analyzer))
+    graph.add_node("python_security_checker",instrument_node("python_security_checker",python_security_checker))
+    graph.add_node("python_performance_evaluator",instrument_node("python_performance_evaluator",python_performance_evaluator))
+    graph.add_node("python_best_practices_checker",instrument_node("python_best_practices_checker",python_best_practices_checker))
+    graph.add_node("python_complexity_analyzer",instrument_node("python_complexity_analyzer",python_complexity_analyzer))
+    graph.add_node("python_documentation_reviewer",instrument_node("python_documentation_reviewer",python_documentation_reviewer))
 
     # graph.add_node("react_parallel_node",react_parallel_node)
-    graph.add_node("react_node",react_node)
-    graph.add_node("react_code_analyzer",react_code_analyzer)
-    graph.add_node("react_specific_analyzer",react_specific_analyzer)
-    graph.add_node("react_security_checker",react_security_checker)
-    graph.add_node("react_accessibility_checker",react_accessibility_checker)
-    graph.add_node("react_performance_evaluator",react_performance_evaluator)
-    graph.add_node("react_best_practices_checker",react_best_practices_checker)
-    graph.add_node("react_complexity_analyzer",react_complexity_analyzer)
-    graph.add_node("react_documentation_reviewer",react_documentation_reviewer)
-
-    graph.add_node("generate_report",generate_report)
+    graph.add_node("react_node",instrument_node("react_node",react_node))
+    graph.add_node("react_code_analyzer",instrument_node("react_code_analyzer",react_code_analyzer))
+    graph.add_node("react_specific_analyzer",instrument_node("react_specific_analyzer",react_specific_analyzer))
+    graph.add_node("react_security_checker",instrument_node("react_security_checker",react_security_checker))
+    graph.add_node("react_accessibility_checker",instrument_node("react_accessibility_checker",react_accessibility_checker))
+    graph.add_node("react_performance_evaluator",instrument_node("react_performance_evaluator",react_performance_evaluator))
+    graph.add_node("react_best_practices_checker",instrument_node("react_best_practices_checker",react_best_practices_checker))
+    graph.add_node("react_complexity_analyzer",instrument_node("react_complexity_analyzer",react_complexity_analyzer))
+    graph.add_node("react_documentation_reviewer",instrument_node("react_documentation_reviewer",react_documentation_reviewer))
+
+    graph.add_node("generate_report",instrument_node("generate_report",generate_report))
 
     graph.set_entry_point("detect_language")
     graph.add_conditional_edges(
@@ -261,7 +245,29 @@ def create_workflow():
 
     graph.add_edge("generate_report",END)
 
-    return graph.compile()
+    return graph.compile(checkpointer=checkpointer)
+
+_workflow = None
+_workflow_lock = threading.Lock()
+
+def create_checkpointer():
+    if SqliteSaver is None or not CHECKPOINT_DB_PATH:
+        return None
+    return SqliteSaver(sqlite3.connect(CHECKPOINT_DB_PATH, check_same_thread=False))
+
+def get_workflow():
+    """The compiled graph for this process, built on first use and shared by its job threads."""
+    global _workflow
+    with _workflow_lock:
+        if _workflow is None:
+            _workflow = create_workflow(create_checkpointer())
+        return _workflow
+
+def discard_checkpoint(job_id: str):
+    """Drops a job's checkpoints once its report is stored; a later retry starts fresh."""
+    checkpointer = get_workflow().checkpointer
+    if checkpointer is not None:
+        checkpointer.delete_thread(job_id)
 
 def get_latest_file_name(user: str) -> str:
     import os
@@ -273,24 +279,143 @@ def get_latest_file_name(user: str) -> str:
     latest_file_count = len(files) 
     return latest_file_count
 
-def analyze_code(user_code: str,user_id: str,job_id) -> dict:
-    graph = create_workflow()
+def write_report(report_key: str, final_documentation: str):
+    get_storage().put(report_key, final_documentation.encode("utf-8"))
 
-    initial_state = AgentState(user_code=user_code)
-    result_state = graph.invoke(initial_state)
-    print(result_state)
-    final_documentation = result_state.get("final_documentation")
+def fill_late_sections(result_state: dict, late: dict, review: SharedReview):
+    """Waits for sections that missed the deadline, then regenerates the stored reports."""
+    state = dict(result_state)
+    job_id = state.get("job_id")
+    try:
+        sections, errors = collect_late_sections(job_id, late)
+        state.update(sections)
+        state["errors"] = list(state.get("errors") or []) + errors
+        report = generate_report(state)
+        # a failed regeneration would replace a usable report with an error message
+        if not report.get("errors"):
+            review.update(report["final_documentation"])
+        if errors:
+            from app.analyzer_logic.tasks import record_late_errors
+            record_late_errors(review.report_keys(), state["errors"])
+    except JobCancelled:
+        # the stored report keeps its pending notes; the job row says cancelled
+        pass
+    finally:
+        save_job_metrics(job_id)
+        release_job(job_id)
+        release_code(state["code_ref"])
+        cancellations.forget(job_id)
+
+def analysis_key(user_code: str, code_sha256: str = None, user_id: str = None) -> str:
+    """
+    Jobs with equal keys would produce interchangeable reviews. A review
+    reuses findings of its findings_scope, so with FINDINGS_ISOLATION=user
+    only jobs of the same user share one.
+    """
+    config = f"{LLM_PROVIDER}:{LLM_ROUTING}:{getattr(llm, 'model_id', '')}:{prompts.version}"
+    code_sha256 = code_sha256 or hashlib.sha256(user_code.encode("utf-8")).hexdigest()
+    scope = findings_scope(user_id)
+    return code_sha256 + ":" + config + (":" + scope if scope else "")
 
-    user_dir = os.path.join(os.getcwd(), user_id)
-    os.makedirs(user_dir, exist_ok=True)
+def run_review(user_code: str, job_id: str, code_sha256: str = None, user_id: str = None) -> SharedReview:
+    """
+    Runs the graph once; the job that starts it owns its metrics and late sections.
+
+    Checkpoints are keyed by job_id, so when a job is retried after its worker
+    died, branches that had finished are replayed from their saved writes and
+    only the missing ones call the LLM again.
+    """
+    graph = get_workflow()
 
-    file_path = os.path.join(user_dir, f"{job_id}.md")
+    code_ref = register_code(user_code, code_sha256)
+    config = {"configurable": {"thread_id": job_id}}
+    snapshot = graph.get_state(config) if graph.checkpointer is not None else None
+    resumable = snapshot is not None and snapshot.values.get("code_ref") == code_ref
 
-    with open(file_path, "w", encoding="utf-8") as f:
-        f.write(final_documentation)    
+    started = time.monotonic()
+    try:
+        if resumable and not snapshot.next:
+            # the graph finished before the job was recorded as completed
+            result_state = snapshot.values
+        elif resumable:
+            set_resumed_deadline(job_id, time.time() + JOB_TIMEOUT_SECONDS)
+            result_state = graph.invoke(None, config)
+        else:
+            scope = findings_scope(user_id)
+            fingerprint = near_dup_index.fingerprint(user_code, detect_language({"code_ref": code_ref})["language"], scope)
+            near_dup = near_dup_index.lookup(user_code, fingerprint)
+            initial_state = AgentState(
+                code_ref=code_ref,
+                job_id=job_id,
+                deadline=time.time() + JOB_TIMEOUT_SECONDS,
+                reused_sections=near_dup[0] if near_dup else None,
+                findings_scope=scope
+            )
+            result_state = graph.invoke(initial_state, config)
+            if near_dup is None:
+                near_dup_index.add(job_id, user_code, fingerprint, {
+                    key: result_state[key] for key in SECTION_KEYS
+                    if result_state.get(key) and result_state[key] != PENDING_SECTION
+                    and not result_state[key].startswith("Error during")
+                })
+    except BaseException as e:
+        release_job(job_id)
+        release_code(code_ref)
+        if isinstance(e, JobCancelled):
+            # a cancelled job is never retried, so its progress is of no use
+            discard_checkpoint(job_id)
+        raise
+    finally:
+        set_resumed_deadline(job_id)
+        save_job_metrics(job_id)
+    JOB_SECONDS.observe(time.monotonic() - started, language=result_state.get("language"))
+
+    review = SharedReview(result_state, write_report)
+    late = pop_late_sections(job_id)
+    if late:
+        threading.Thread(
+            target=fill_late_sections,
+            args=(result_state, late, review),
+            daemon=True
+        ).start()
+    else:
+        release_job(job_id)
+        release_code(code_ref)
+    return review
+
+def analyze_code(user_code: str,user_id: str,job_id, submitted_at: float = None, code_sha256: str = None) -> dict:
+    if submitted_at is not None:
+        JOB_QUEUE_SECONDS.observe(time.time() - submitted_at)
+
+    # Identical code submitted while an analysis is running attaches to it
+    while True:
+        try:
+            review, shared = single_flight.do(
+                analysis_key(user_code, code_sha256, user_id),
+                lambda: run_review(user_code, job_id, code_sha256, user_id)
+            )
+            break
+        except JobCancelled as e:
+            # the job this one attached to was cancelled; run it again for this one
+            if e.job_id == job_id or cancellations.is_cancelled(job_id):
+                raise
+    cancellations.check(job_id)
+
+    errors = list(review.result_state.get("errors") or [])
+    # a job whose report failed has nothing to store
+    report_key = None if any(error["node"] == REPORT_NODE for error in errors) else f"{user_id}/{job_id}.md"
+    if report_key is not None:
+        review.attach(report_key)
+    if not shared:
+        discard_checkpoint(job_id)
+
+    metadata = dict(review.result_state.get("metadata") or {})
+    if shared:
+        metadata["coalesced"] = True
 
     return {
-        "metadata": result_state.get("metadata"),
-        "file_path": file_path,
+        "metadata": metadata,
+        "errors": errors,
+        "report_key": report_key,
         "job_id": job_id
-    }
\ No newline at end of file
+    }
@@ -0,0 +1,153 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from app.utils.config import (
+    HEDGE_ENABLED,
+    HEDGE_PERCENTILE,
+    HEDGE_MIN_SAMPLES,
+    HEDGE_MAX_EXTRA_COST_PCT,
+    HEDGE_BUDGET_WINDOW_SECONDS,
+    LLM_POOL_SIZE,
+)
+
+
+class LatencyTracker:
+    """Rolling window of recent call latencies."""
+
+    def __init__(self, size: int = 200):
+        self._samples = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, pct: float):
+        with self._lock:
+            if len(self._samples) < HEDGE_MIN_SAMPLES:
+                return None
+            ordered = sorted(self._samples)
+        index = min(int(len(ordered) * pct / 100), len(ordered) - 1)
+        return ordered[index]
+
+
+class HedgeBudget:
+    """
+    Caps hedge spend at a percentage of primary spend over a sliding window.
+
+    Cost is approximated by prompt length, since input tokens dominate what
+    a duplicate call bills and a cancelled hedge may still be charged.
+    """
+
+    def __init__(self, max_extra_pct: float, window_seconds: float):
+        self.max_extra_pct = max_extra_pct
+        self.window_seconds = window_seconds
+        self._events = deque()  # (timestamp, cost, is_hedge)
+        self._primary = 0
+        self._extra = 0
+        self._lock = threading.Lock()
+
+    def _expire(self, now: float):
+        while self._events and now - self._events[0][0] > self.window_seconds:
+            _, cost, is_hedge = self._events.popleft()
+            if is_hedge:
+                self._extra -= cost
+            else:
+                self._primary -= cost
+
+    def record_primary(self, cost: int):
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            self._events.append((now, cost, False))
+            self._primary += cost
+
+    def try_acquire(self, cost: int) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            if (self._extra + cost) * 100 > self._primary * self.max_extra_pct:
+                return False
+            self._events.append((now, cost, True))
+            self._extra += cost
+            return True
+
+
+def _prompt_size(prompt) -> int:
+    """Characters in a prompt string or message list, the unit HedgeBudget charges in."""
+    if isinstance(prompt, str):
+        return len(prompt)
+    return sum(len(str(getattr(message, "content", message))) for message in prompt)
+
+
+class HedgedLLM:
+    """
+    Wraps a chat model so slow calls are raced against a duplicate.
+
+    When a call has not returned by HEDGE_PERCENTILE of recent latency, a
+    second identical call is issued and whichever finishes first wins. The
+    loser is cancelled if it has not started; a request already on the wire
+    cannot be aborted, so its result is simply dropped.
+    """
+
+    def __init__(self, llm, enabled: bool = HEDGE_ENABLED):
+        self.llm = llm
+        self.enabled = enabled
+        self.latency = LatencyTracker()
+        self.budget = HedgeBudget(HEDGE_MAX_EXTRA_COST_PCT, HEDGE_BUDGET_WINDOW_SECONDS)
+        self._pool = ThreadPoolExecutor(max_workers=LLM_POOL_SIZE, thread_name_prefix="llm-hedge")
+        self._stats = {"calls": 0, "hedges_issued": 0, "hedge_wins": 0, "primary_wins": 0, "budget_denied": 0}
+        self._stats_lock = threading.Lock()
+
+    def _count(self, key: str):
+        with self._stats_lock:
+            self._stats[key] += 1
+
+    def _timed_invoke(self, prompt, **kwargs):
+        start = time.monotonic()
+        result = self.llm.invoke(prompt, **kwargs)
+        self.latency.record(time.monotonic() - start)
+        return result
+
+    def invoke(self, prompt, **kwargs):
+        self._count("calls")
+        if not self.enabled:
+            return self._timed_invoke(prompt, **kwargs)
+
+        cost = _prompt_size(prompt)
+        self.budget.record_primary(cost)
+        primary = self._pool.submit(self._timed_invoke, prompt, **kwargs)
+
+        delay = self.latency.percentile(HEDGE_PERCENTILE)
+        if delay is None:
+            return primary.result()
+        done, _ = wait([primary], timeout=delay)
+        if done:
+            return primary.result()
+        if not self.budget.try_acquire(cost):
+            self._count("budget_denied")
+            return primary.result()
+
+        self._count("hedges_issued")
+        hedge = self._pool.submit(self._timed_invoke, prompt, **kwargs)
+        pending = {primary: "primary_wins", hedge: "hedge_wins"}
+        error = None
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                outcome = pending.pop(future)
+                if future.exception() is None:
+                    for other in pending:
+                        other.cancel()
+                    self._count(outcome)
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        issued = stats["hedges_issued"]
+        stats["hedge_win_rate"] = stats["hedge_wins"] / issued if issued else 0.0
+        return stats
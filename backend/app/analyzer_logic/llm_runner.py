@@ -0,0 +1,244 @@
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from app.utils.config import (
+    NODE_TIMEOUT_SECONDS,
+    LATE_SECTION_TIMEOUT_SECONDS,
+    LLM_POOL_SIZE,
+    LLM_RETRY_ATTEMPTS,
+    LLM_RETRY_BACKOFF_SECONDS,
+)
+from app.utils.extensions import AgentState
+from app.analyzer_logic.routing import router
+from app.analyzer_logic.code_buffer import get_buffer
+from app.utils.metrics import COLLECTORS, record_llm_call, register, Counter
+from app.analyzer_logic.unit_findings import plan_units, split_units
+from app.analyzer_logic.batching import batch_session
+from app.analyzer_logic.templates import prompts
+from app.utils.cancellation import cancellations, JobCancelled, CALLS_ABANDONED
+from app.analyzer_logic.errors import classify, node_error, RETRYABLE
+from app.analyzer_logic.budgets import (
+    is_batch_placeholder,
+    output_budget,
+    budget_note,
+    call_with_continuation,
+    fit_sections,
+    record_summary,
+    estimate_tokens,
+)
+
+PENDING_SECTION = "_Pending: this section did not finish before the job deadline. The report will be updated when it arrives._"
+
+LLM_CALL_RETRIES = register(Counter("review_llm_call_retries_total", "LLM calls retried after a retryable error.", ["section", "code"]))
+
+COLLECTORS.append(lambda: {f"review_llm_hedge_{key}": value for key, value in router.hedge_stats().items()})
+
+_executor = ThreadPoolExecutor(max_workers=LLM_POOL_SIZE, thread_name_prefix="llm")
+
+# job_id -> {state key: Future} for calls that missed their deadline
+_late_sections = {}
+_late_lock = threading.Lock()
+
+# how often a waiting node looks for its job's cancellation
+_CANCEL_CHECK_SECONDS = 0.25
+
+# job_id -> deadline replacing the one saved in a checkpoint being resumed
+_resumed_deadlines = {}
+
+
+def set_resumed_deadline(job_id: str, deadline: float = None):
+    """Gives a resumed job a fresh deadline; None clears it once the run is over."""
+    if deadline is None:
+        _resumed_deadlines.pop(job_id, None)
+    else:
+        _resumed_deadlines[job_id] = deadline
+
+
+def node_timeout(state: AgentState) -> float:
+    """Seconds a node may wait: the node budget, capped by the job deadline."""
+    timeout = NODE_TIMEOUT_SECONDS
+    deadline = _resumed_deadlines.get(state.get("job_id"), state.get("deadline"))
+    if deadline is not None:
+        timeout = min(timeout, deadline - time.time())
+    return max(timeout, 0)
+
+
+def output_tokens_for(label: str, code_length: int = 0, **sizing) -> int:
+    """output_budget() within the output cap of the route the call will take."""
+    return output_budget(router.select(label, code_length).max_tokens, **sizing)
+
+
+def invoke_llm(job_id, label: str, prompt: str, submitted: float = None, code_length: int = 0,
+               max_tokens: int = None, max_continuations: int = None):
+    """
+    Calls the model routed for this section and code size, recording latency, queue wait, tokens and errors.
+
+    max_tokens (default: the route's cap) limits the answer; one cut off at
+    the limit is continued up to max_continuations (default
+    OUTPUT_MAX_CONTINUATIONS) times. A call failing with a retryable error
+    is retried up to LLM_RETRY_ATTEMPTS times with jittered backoff.
+
+    Calls of a job in a bulk BatchSession are recorded for batch inference
+    instead; see app/analyzer_logic/batching.py. A cancelled job's calls
+    raise JobCancelled instead of reaching the model.
+    """
+    route = router.select(label, code_length)
+    queue_seconds = time.monotonic() - submitted if submitted is not None else 0.0
+    max_tokens = min(max_tokens, route.max_tokens) if max_tokens is not None else route.max_tokens
+
+    session = batch_session(job_id)
+
+    def call(messages, max_tokens):
+        attempt = 0
+        while True:
+            cancellations.check(job_id)
+            started = time.monotonic()
+            try:
+                if session is not None:
+                    result = session.call(job_id, route.model_id, messages, max_tokens)
+                else:
+                    result = router.client(route).invoke(messages, maxTokens=max_tokens)
+                break
+            except Exception as e:
+                seconds = time.monotonic() - started
+                record_llm_call(job_id, label, seconds, queue_seconds, error=type(e).__name__, model=route.model_id)
+                router.record(route, seconds, error=True)
+                code = classify(e)
+                # a batch result is final; re-asking the session returns the same error
+                if session is not None or code not in RETRYABLE or attempt >= LLM_RETRY_ATTEMPTS:
+                    raise
+                LLM_CALL_RETRIES.inc(section=label, code=code)
+                time.sleep(random.uniform(0, LLM_RETRY_BACKOFF_SECONDS * 2 ** attempt))
+                attempt += 1
+        if is_batch_placeholder(result):
+            return result
+        seconds = result.response_metadata.get("batchSeconds", time.monotonic() - started)
+        record_llm_call(job_id, label, seconds, queue_seconds, result=result, model=route.model_id)
+        router.record(route, seconds, result=result)
+        return result
+
+    return call_with_continuation(call, job_id, label, prompt, max_tokens, max_continuations)
+
+
+def _wait(job_id, section: str, future, timeout: float):
+    """
+    future.result(timeout), except that a cancelled job stops waiting: the
+    call is cancelled if it has not started, abandoned if it has, and
+    JobCancelled raised.
+    """
+    give_up_at = time.monotonic() + timeout
+    while True:
+        remaining = give_up_at - time.monotonic()
+        try:
+            return future.result(timeout=max(min(remaining, _CANCEL_CHECK_SECONDS), 0))
+        except FutureTimeout:
+            if cancellations.is_cancelled(job_id):
+                if not future.cancel():
+                    CALLS_ABANDONED.inc(section=section)
+                raise JobCancelled(job_id)
+            if remaining <= _CANCEL_CHECK_SECONDS:
+                raise
+
+
+def _section_call(job_id, section: str, prompt: str, submitted: float, code_length: int, max_tokens: int, finish) -> str:
+    return finish(invoke_llm(job_id, section, prompt, submitted, code_length, max_tokens).content)
+
+
+def summarize_sections(job_id, sections: dict, code_length: int = 0) -> dict:
+    """
+    Keeps the section texts generate_report reads within SUMMARY_INPUT_TOKEN_BUDGET,
+    condensing the longest sections in parallel; a section whose summary fails is cut.
+    """
+    targets, before = fit_sections(sections)
+    if not targets:
+        return sections
+    futures = {
+        key: _executor.submit(
+            invoke_llm, job_id, "section_summary",
+            prompts.render("shared/section_summary", title=key.replace("_", " "), words=str(target * 3 // 4),
+                           text=sections[key]),
+            time.monotonic(), code_length, max_tokens=target, max_continuations=0
+        )
+        for key, target in targets.items()
+    }
+    fitted = dict(sections)
+    for key, future in futures.items():
+        try:
+            fitted[key] = _wait(job_id, "section_summary", future, NODE_TIMEOUT_SECONDS).content
+        except Exception:
+            # a cut section still beats a summary over budget
+            fitted[key] = sections[key][:targets[key] * 4] + "\n\n_(truncated)_"
+    record_summary(job_id, before, sum(estimate_tokens(text) for text in fitted.values()))
+    return fitted
+
+
+def invoke_section(state: AgentState, section: str, template: str) -> str:
+    """
+    Renders one analyzer's prompt template over the job's code, runs it and
+    returns the response text.
+
+    Sections reused from a near-duplicate review are returned without a call.
+    Functions/components with indexed findings are left out of the prompt
+    and their stored findings merged into the response. The output budget
+    follows the code's line count and number of top-level units.
+
+    If the call misses its deadline, PENDING_SECTION is returned and the call
+    keeps running; it is parked under the job id so the stored report can be
+    regenerated once it lands.
+    """
+    reused = (state.get("reused_sections") or {}).get(section)
+    if reused is not None:
+        return reused
+    template = prompts.get(template)
+    plan = plan_units(state, section, template.version)
+    if plan is not None and plan.skip_call:
+        return plan.finish("")
+    code_buffer = get_buffer(state["code_ref"])
+    units = plan.units if plan is not None else split_units(state["code_ref"], state.get("language") or "python")
+    max_tokens = output_tokens_for(section, code_buffer.size,
+                                   code_lines=code_buffer.text.count("\n") + 1, units=len(units))
+    prompt = template.render(
+        code=plan.code if plan is not None else code_buffer.text,
+        extra=(plan.instructions if plan is not None else "", budget_note(max_tokens)),
+    )
+    finish = plan.finish if plan is not None else str
+    job_id = state.get("job_id")
+    future = _executor.submit(_section_call, job_id, section, prompt, time.monotonic(), code_buffer.size,
+                              max_tokens, finish)
+    try:
+        return _wait(job_id, section, future, node_timeout(state))
+    except FutureTimeout:
+        if job_id is not None:
+            with _late_lock:
+                _late_sections.setdefault(job_id, {})[section] = future
+        return PENDING_SECTION
+
+
+def pop_late_sections(job_id: str) -> dict:
+    with _late_lock:
+        return _late_sections.pop(job_id, {})
+
+
+def collect_late_sections(job_id, late: dict) -> tuple:
+    """
+    Waits for parked calls and returns (section texts, node_error entries);
+    all are dropped if the job is cancelled.
+    """
+    give_up_at = time.time() + LATE_SECTION_TIMEOUT_SECONDS
+    sections, errors = {}, []
+    for section, future in late.items():
+        try:
+            sections[section] = _wait(job_id, section, future, max(give_up_at - time.time(), 0))
+        except JobCancelled:
+            for other in late.values():
+                other.cancel()
+            raise
+        except FutureTimeout:
+            future.cancel()
+            sections[section] = "_Not available: this section did not complete._"
+            errors.append(node_error(section, TimeoutError("Did not finish within LATE_SECTION_TIMEOUT_SECONDS")))
+        except Exception as e:
+            sections[section] = f"Error during analysis: {str(e)}"
+            errors.append(node_error(section, e))
+    return sections, errors
@@ -0,0 +1,220 @@
+import difflib
+import keyword
+import re
+import threading
+import time
+from collections import OrderedDict
+from app.analyzer_logic.fingerprint import MinHasher, fingerprint_tokens, estimate_similarity, JS_KEYWORDS
+from app.utils.config import NEAR_DUP_CACHE_SIZE, NEAR_DUP_THRESHOLD, NEAR_DUP_MAX_BYTES
+from app.utils.metrics import register, Counter, Histogram, COLLECTORS
+
+NEAR_DUP_LOOKUPS = register(Counter("review_near_dup_lookups_total", "Near-duplicate cache lookups; changed_units are similar submissions whose units differ.", ["result"]))
+NEAR_DUP_LOOKUP_SECONDS = register(Histogram("review_near_dup_lookup_seconds", "LSH lookup and line remapping time per job.",
+                                             buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1)))
+
+_LINE_REF = re.compile(r"\b([Ll]ines?|L)(\s*)(\d+)(?:(\s*(?:-|–|to)\s*)(\d+))?")
+_LINE_COMMENT = re.compile(r"#.*|//.*")
+_IDENTIFIER = re.compile(r"[A-Za-z_$][\w$]*")
+_KEEP_WORDS = frozenset(keyword.kwlist) | JS_KEYWORDS
+
+# never copied from another submission: a missed finding here is the costly kind
+NEVER_REUSED = frozenset(("security_report",))
+
+
+def _line_shape(line: str) -> str:
+    """A line with comments, spacing and identifier names stripped, for aligning renamed code."""
+    line = _LINE_COMMENT.sub("", line)
+    line = _IDENTIFIER.sub(lambda m: m.group(0) if m.group(0) in _KEEP_WORDS else "_", line)
+    return "".join(line.split())
+
+
+def _line_map(old_code: str, new_code: str) -> dict:
+    """Maps 1-based line numbers of old_code onto new_code."""
+    old_lines = [_line_shape(line) for line in old_code.splitlines()]
+    new_lines = [_line_shape(line) for line in new_code.splitlines()]
+    mapping = {}
+    matcher = difflib.SequenceMatcher(None, old_lines, new_lines, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        for offset in range(i2 - i1):
+            # deleted lines point at where they would have been
+            mapping[i1 + offset + 1] = min(j1 + offset, max(j2 - 1, j1)) + 1
+    return mapping
+
+
+def remap_line_numbers(text: str, old_code: str, new_code: str) -> str:
+    """Rewrites 'line N' / 'lines N-M' references in a finding from old_code to new_code."""
+    mapping = _line_map(old_code, new_code)
+
+    def replace(match):
+        start = mapping.get(int(match.group(3)), int(match.group(3)))
+        if match.group(5) is None:
+            return f"{match.group(1)}{match.group(2)}{start}"
+        end = mapping.get(int(match.group(5)), int(match.group(5)))
+        return f"{match.group(1)}{match.group(2)}{start}{match.group(4)}{end}"
+
+    return _LINE_REF.sub(replace, text)
+
+
+def shift_line_numbers(text: str, delta: int) -> str:
+    """Adds delta to every 'line N' / 'lines N-M' reference in a finding."""
+    def replace(match):
+        start = max(int(match.group(3)) + delta, 1)
+        if match.group(5) is None:
+            return f"{match.group(1)}{match.group(2)}{start}"
+        end = max(int(match.group(5)) + delta, 1)
+        return f"{match.group(1)}{match.group(2)}{start}{match.group(4)}{end}"
+
+    return _LINE_REF.sub(replace, text)
+
+
+def code_layout(code: str, language: str) -> tuple:
+    """
+    (sorted hashes of the top-level functions/classes/components, hash of
+    the code between them). Equal layouts mean every unit is unchanged up to
+    local renames, formatting, comments and order.
+    """
+    # unit_findings imports this module for the line helpers
+    from app.analyzer_logic.unit_findings import units_of, unit_hash
+
+    units = units_of(code, language, min_lines=1)
+    covered = {n for unit in units for n in range(unit.start_line, unit.end_line + 1)}
+    rest = "\n".join(line for n, line in enumerate(code.splitlines(), 1) if n not in covered)
+    return tuple(sorted(unit.unit_hash for unit in units)), unit_hash(rest, language)
+
+
+class Fingerprint:
+    __slots__ = ("kind", "signature", "scope", "language")
+
+    def __init__(self, kind, signature, scope, language):
+        self.kind = kind
+        self.signature = signature
+        self.scope = scope
+        self.language = language
+
+
+class _Entry:
+    __slots__ = ("job_id", "fingerprint", "code", "sections", "layout")
+
+    def __init__(self, job_id, fingerprint, code, sections):
+        self.job_id = job_id
+        self.fingerprint = fingerprint
+        self.code = code
+        self.sections = sections
+        self.layout = None  # computed the first time the entry is a candidate
+
+
+class NearDuplicateIndex:
+    """
+    MinHash/LSH index over previously reviewed submissions.
+
+    Signatures are split into bands; two codes become candidates when any
+    band matches exactly. The most similar candidate at or above the
+    threshold is then compared unit by unit, and is a hit only when no
+    function, class or component was added, removed or changed (see
+    code_layout). Otherwise the review runs, and the per-unit findings
+    index sends only the changed units to the model. Sections in
+    NEVER_REUSED are always reviewed again.
+
+    Entries and lookups are scoped like unit findings (findings_scope), so
+    with FINDINGS_ISOLATION=user one user's sections are never served to
+    another. Entries are evicted least recently used.
+    """
+
+    def __init__(self, capacity: int = NEAR_DUP_CACHE_SIZE, threshold: float = NEAR_DUP_THRESHOLD,
+                 num_perm: int = 64, bands: int = 16):
+        self.capacity = capacity
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.hasher = MinHasher(num_perm=num_perm)
+        self._entries = OrderedDict()  # job_id -> _Entry
+        self._buckets = {}  # (kind, band, band values) -> set of job_ids
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.lookups = 0
+
+    def _band_keys(self, fingerprint: Fingerprint):
+        signature = fingerprint.signature
+        return [(fingerprint.scope, fingerprint.kind, band, signature[band * self.rows:(band + 1) * self.rows])
+                for band in range(self.bands)]
+
+    def fingerprint(self, code: str, language: str, scope):
+        """
+        Returns the code's Fingerprint, or None when the index does not apply:
+        reuse is off for this scope (None) or the code is too large to
+        fingerprint cheaply on the job thread.
+        """
+        if self.capacity <= 0 or scope is None or len(code) > NEAR_DUP_MAX_BYTES:
+            return None
+        kind, tokens = fingerprint_tokens(code, language)
+        return Fingerprint(kind, self.hasher.signature(tokens), scope, language)
+
+    def lookup(self, code: str, fingerprint):
+        """Returns (sections remapped onto code, source job_id, similarity) or None."""
+        started = time.monotonic()
+        match = None
+        if fingerprint is not None:
+            with self._lock:
+                candidates = set()
+                for key in self._band_keys(fingerprint):
+                    candidates |= self._buckets.get(key, set())
+                best, best_score = None, 0.0
+                for job_id in candidates:
+                    entry = self._entries[job_id]
+                    score = estimate_similarity(fingerprint.signature, entry.fingerprint.signature)
+                    if score > best_score:
+                        best, best_score = entry, score
+                if best is not None and best_score >= self.threshold:
+                    match = best, best_score
+
+        result, outcome = None, "miss"
+        if match is not None:
+            entry, score = match
+            if entry.layout is None:
+                entry.layout = code_layout(entry.code, entry.fingerprint.language)
+            if code_layout(code, fingerprint.language) != entry.layout:
+                outcome = "changed_units"
+            else:
+                outcome = "hit"
+                with self._lock:
+                    if entry.job_id in self._entries:
+                        self._entries.move_to_end(entry.job_id)
+                sections = {key: remap_line_numbers(text, entry.code, code) for key, text in entry.sections.items()}
+                result = sections, entry.job_id, score
+        NEAR_DUP_LOOKUP_SECONDS.observe(time.monotonic() - started)
+        NEAR_DUP_LOOKUPS.inc(result=outcome)
+        with self._lock:
+            self.lookups += 1
+            self.hits += bool(result)
+        return result
+
+    def add(self, job_id: str, code: str, fingerprint, sections: dict):
+        sections = {key: text for key, text in sections.items() if key not in NEVER_REUSED}
+        if fingerprint is None or not sections:
+            return
+        entry = _Entry(job_id, fingerprint, code, sections)
+        with self._lock:
+            self._entries[job_id] = entry
+            for key in self._band_keys(fingerprint):
+                self._buckets.setdefault(key, set()).add(job_id)
+            while len(self._entries) > self.capacity:
+                _, evicted = self._entries.popitem(last=False)
+                for key in self._band_keys(evicted.fingerprint):
+                    bucket = self._buckets.get(key)
+                    if bucket is not None:
+                        bucket.discard(evicted.job_id)
+                        if not bucket:
+                            del self._buckets[key]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "lookups": self.lookups,
+                "hits": self.hits,
+                "hit_rate": self.hits / self.lookups if self.lookups else 0.0,
+            }
+
+
+near_dup_index = NearDuplicateIndex()
+COLLECTORS.append(lambda: {f"review_near_dup_{key}": value for key, value in near_dup_index.stats().items()})
@@ -0,0 +1,152 @@
+import json
+import threading
+from app.analyzer_logic.hedging import HedgedLLM
+from app.utils.extensions import build_llm
+from app.utils.metrics import register, Counter, Histogram, estimate_cost
+from app.utils.config import (
+    LLM_ROUTING,
+    LLM_MODEL_TIERS,
+    LLM_ROUTES_FILE,
+    LLM_SMALL_CODE_CHARS,
+    LLM_LARGE_CODE_CHARS,
+)
+
+ROUTE_SECONDS = register(Histogram("review_llm_route_seconds", "LLM call latency per route.", ["route"]))
+ROUTE_COST = register(Counter("review_llm_route_cost_usd_total", "Estimated LLM spend per route.", ["route"]))
+ROUTE_BASELINE_COST = register(Counter("review_llm_route_baseline_cost_usd_total",
+                                       "What the same calls would have cost on the premier tier.", ["route"]))
+
+FIXED_MAX_TOKENS = 32000
+
+# section -> size class -> (tier, max output tokens). Output caps follow the
+# usual length of each section; the summary and security stay on premier.
+DEFAULT_ROUTES = {
+    "security_report": {"small": ("premier", 2000), "medium": ("premier", 4000), "large": ("premier", 6000)},
+    "final_documentation": {"small": ("premier", 3000), "medium": ("premier", 5000), "large": ("premier", 8000)},
+    "code_analysis": {"small": ("standard", 2000), "medium": ("standard", 4000), "large": ("premier", 6000)},
+    "performance_report": {"small": ("standard", 1500), "medium": ("standard", 3000), "large": ("standard", 5000)},
+    "best_practices_report": {"small": ("standard", 1500), "medium": ("standard", 3000), "large": ("standard", 5000)},
+    "react_specific_report": {"small": ("standard", 1500), "medium": ("standard", 3000), "large": ("standard", 5000)},
+    "complexity_report": {"small": ("fast", 1000), "medium": ("standard", 2000), "large": ("standard", 4000)},
+    "accessibility_report": {"small": ("fast", 1000), "medium": ("fast", 2000), "large": ("standard", 4000)},
+    "documentation_report": {"small": ("fast", 1000), "medium": ("fast", 2000), "large": ("fast", 3000)},
+    "section_summary": {"small": ("fast", 2000), "medium": ("fast", 2000), "large": ("fast", 3000)},
+}
+FALLBACK_ROUTE = ("premier", 4000)
+
+
+class Route:
+    __slots__ = ("name", "tier", "model_id", "max_tokens")
+
+    def __init__(self, name, tier, model_id, max_tokens):
+        self.name = name
+        self.tier = tier
+        self.model_id = model_id
+        self.max_tokens = max_tokens
+
+
+def size_class(code_length: int) -> str:
+    if code_length <= LLM_SMALL_CODE_CHARS:
+        return "small"
+    if code_length <= LLM_LARGE_CODE_CHARS:
+        return "medium"
+    return "large"
+
+
+def load_routes(path: str = LLM_ROUTES_FILE) -> dict:
+    """DEFAULT_ROUTES with per-section overrides from a JSON file of the same shape."""
+    routes = {section: dict(classes) for section, classes in DEFAULT_ROUTES.items()}
+    if path:
+        with open(path, encoding="utf-8") as f:
+            for section, classes in json.load(f).items():
+                routes.setdefault(section, {}).update({size: tuple(route) for size, route in classes.items()})
+    return routes
+
+
+class ModelRouter:
+    """
+    Picks the model and output cap for each call, keeps one hedged client
+    per (model, cap), and accumulates per-route latency, tokens and cost
+    next to what the same calls would have cost on the premier tier.
+    """
+
+    def __init__(self, mode: str = LLM_ROUTING, routes: dict = None):
+        self.mode = mode
+        self.routes = routes if routes is not None else load_routes()
+        self._clients = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def select(self, section: str, code_length: int) -> Route:
+        if self.mode == "fixed":
+            tier, max_tokens = "premier", FIXED_MAX_TOKENS
+        else:
+            size = size_class(code_length or 0)
+            tier, max_tokens = self.routes.get(section, {}).get(size, FALLBACK_ROUTE)
+        model_id = LLM_MODEL_TIERS[tier]
+        return Route(f"{section}:{tier}:{max_tokens}", tier, model_id, max_tokens)
+
+    def client(self, route: Route) -> HedgedLLM:
+        key = (route.model_id, route.max_tokens)
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                client = self._clients[key] = HedgedLLM(build_llm(route.model_id, route.max_tokens))
+            return client
+
+    def record(self, route: Route, seconds: float, result=None, error: bool = False):
+        usage = getattr(result, "usage_metadata", None) or {}
+        input_tokens = usage.get("input_tokens", 0)
+        output_tokens = usage.get("output_tokens", 0)
+        cost = estimate_cost(input_tokens, output_tokens, route.model_id)
+        baseline = estimate_cost(input_tokens, output_tokens, LLM_MODEL_TIERS["premier"])
+
+        ROUTE_SECONDS.observe(seconds, route=route.name)
+        ROUTE_COST.inc(cost, route=route.name)
+        ROUTE_BASELINE_COST.inc(baseline, route=route.name)
+        with self._lock:
+            stats = self._stats.setdefault(route.name, {
+                "model": route.model_id, "max_tokens": route.max_tokens, "calls": 0, "errors": 0,
+                "seconds": 0.0, "input_tokens": 0, "output_tokens": 0, "cost_usd": 0.0, "baseline_cost_usd": 0.0,
+            })
+            stats["calls"] += 1
+            stats["errors"] += bool(error)
+            stats["seconds"] += seconds
+            stats["input_tokens"] += input_tokens
+            stats["output_tokens"] += output_tokens
+            stats["cost_usd"] += cost
+            stats["baseline_cost_usd"] += baseline
+
+    def report(self) -> dict:
+        """Per-route latency and cost, and the savings against routing everything to premier."""
+        with self._lock:
+            routes = {name: dict(stats) for name, stats in self._stats.items()}
+        for stats in routes.values():
+            stats["avg_seconds"] = stats.pop("seconds") / stats["calls"] if stats["calls"] else 0.0
+            stats["savings_usd"] = stats["baseline_cost_usd"] - stats["cost_usd"]
+        cost = sum(stats["cost_usd"] for stats in routes.values())
+        baseline = sum(stats["baseline_cost_usd"] for stats in routes.values())
+        return {
+            "mode": self.mode,
+            "routes": routes,
+            "cost_usd": cost,
+            "baseline_cost_usd": baseline,
+            "savings_usd": baseline - cost,
+            "savings_pct": 100 * (baseline - cost) / baseline if baseline else 0.0,
+        }
+
+    def hedge_stats(self) -> dict:
+        """Hedging counters summed over every route's client."""
+        with self._lock:
+            clients = list(self._clients.values())
+        totals = {"calls": 0, "hedges_issued": 0, "hedge_wins": 0, "primary_wins": 0, "budget_denied": 0}
+        for client in clients:
+            for key, value in client.stats().items():
+                if key in totals:
+                    totals[key] += value
+        issued = totals["hedges_issued"]
+        totals["hedge_win_rate"] = totals["hedge_wins"] / issued if issued else 0.0
+        return totals
+
+
+router = ModelRouter()
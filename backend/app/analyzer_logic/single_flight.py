@@ -0,0 +1,85 @@
+import threading
+from app.utils.metrics import register, Counter
+
+COALESCED_JOBS = register(Counter("review_coalesced_jobs_total", "Jobs that attached to an identical in-flight analysis."))
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Runs at most one call per key at a time.
+
+    Callers that arrive while a call for their key is running wait for it
+    and get the same result (or exception) instead of starting their own.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: str, fn):
+        """Returns (result, shared); shared is True for callers that attached to another's call."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            COALESCED_JOBS.inc()
+            call.done.wait()
+        else:
+            try:
+                call.result = fn()
+            except BaseException as e:
+                call.error = e
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call.done.set()
+
+        if call.error is not None:
+            raise call.error
+        return call.result, not leader
+
+
+class SharedReview:
+    """
+    One analysis result fanned out to every job that asked for it.
+
+    Each job attaches its own report key; when late sections regenerate
+    the report, every attached report is rewritten.
+    """
+
+    def __init__(self, result_state: dict, write_report):
+        self.result_state = result_state
+        self.final_documentation = result_state.get("final_documentation")
+        self._write_report = write_report
+        self._report_keys = []
+        self._lock = threading.Lock()
+
+    def attach(self, report_key: str):
+        with self._lock:
+            self._report_keys.append(report_key)
+            self._write_report(report_key, self.final_documentation)
+
+    def report_keys(self) -> list:
+        with self._lock:
+            return list(self._report_keys)
+
+    def update(self, final_documentation: str):
+        with self._lock:
+            self.final_documentation = final_documentation
+            for report_key in self._report_keys:
+                self._write_report(report_key, final_documentation)
+
+
+single_flight = SingleFlight()
@@ -0,0 +1,103 @@
+import os
+from app.utils.database import get_db_connection
+from app.utils.cancellation import cancellations, JobCancelled
+from app.utils.scheduler import quota_exceeded
+from app.utils.storage import get_storage
+from app.utils.uploads import read_spooled
+from app.utils.notifier import notify_job
+from app.analyzer_logic.errors import classify, job_outcome, QUOTA_EXCEEDED, CODE_UNAVAILABLE
+
+def finish_job(job_id: str, status: str, error_code: str = None, error: str = None, report_key: str = None):
+    """
+    Records a job's final status and queues its callback notification; a
+    job cancelled meanwhile stays cancelled and was notified as such.
+    """
+    db,conn = get_db_connection()
+    conn.execute("update job set status= ?,error_code= ?,error= ?,path= ? where job_id=? and status != 'cancelled'",
+                 (status,error_code,error,report_key,job_id))
+    updated = conn.rowcount
+    conn.execute("select callback_url from job where job_id=?",(job_id,))
+    row = conn.fetchone()
+    db.commit()
+    conn.close()
+    if updated and row:
+        notify_job(row[0], job_id, status, error_code, error)
+
+def record_late_errors(report_keys: list, errors: list):
+    """Marks completed jobs whose late sections failed as partial."""
+    status, error_code, error = job_outcome(errors)
+    if status == "completed" or not report_keys:
+        return
+    db,conn = get_db_connection()
+    conn.execute(f"update job set status= 'partial',error_code= ?,error= ? where status = 'completed' AND path IN ({','.join('?' * len(report_keys))})",
+                 (error_code,error,*report_keys))
+    db.commit()
+    conn.close()
+
+def analyze_upload_task(path: str, code_sha256: str, user_id: str, job_id: str, submitted_at: float = None) -> str:
+    """Scheduler task for spooled uploads: loads the code, then runs the normal job."""
+    if cancellations.is_cancelled(job_id):
+        cancellations.forget(job_id)
+        os.remove(path)
+        return "cancelled"
+    try:
+        user_code = read_spooled(path)
+    except FileNotFoundError:
+        # swept by the compactor after the job had waited JOB_STALE_SECONDS
+        cancellations.forget(job_id)
+        finish_job(job_id, "failed", CODE_UNAVAILABLE, "Submitted code is no longer available")
+        return "failed"
+    return analyze_code_task(user_code, user_id, job_id, submitted_at, code_sha256)
+
+def analyze_stored_task(code_key: str, code_sha256: str, user_id: str, job_id: str, submitted_at: float = None) -> str:
+    """Worker task for brokered jobs: loads the code from shared storage, then runs the normal job."""
+    storage = get_storage()
+    try:
+        user_code = storage.get(code_key).decode("utf-8")
+    except FileNotFoundError:
+        cancellations.forget(job_id)
+        finish_job(job_id, "failed", CODE_UNAVAILABLE, "Submitted code is no longer available")
+        return "failed"
+    # kept until the job finishes so a redelivered message can still load it
+    status = analyze_code_task(user_code, user_id, job_id, submitted_at, code_sha256)
+    storage.delete(code_key)
+    return status
+
+def analyze_code_task(user_code: str, user_id: str, job_id: str, submitted_at: float = None, code_sha256: str = None) -> str:
+    """
+    Background task to analyze code and update job status.
+
+    Returns the status recorded: completed, partial (some sections failed),
+    failed (the report or the run failed) or cancelled. Failures carry an
+    error code from app.analyzer_logic.errors.
+    """
+    if cancellations.is_cancelled(job_id):
+        # cancelled while queued
+        cancellations.forget(job_id)
+        return "cancelled"
+    if quota_exceeded(user_id):
+        cancellations.forget(job_id)
+        finish_job(job_id, "failed", QUOTA_EXCEEDED, "Daily token quota exceeded")
+        return "failed"
+
+    db,conn = get_db_connection()
+    conn.execute("update job set status= ? where job_id=? and status != 'cancelled'",("processing",job_id))
+    db.commit()
+    conn.close()
+
+    try:
+        # loaded on first use, so importing the API stays cheap
+        from app.analyzer_logic.graph import analyze_code
+        result = analyze_code(user_code, user_id, job_id, submitted_at, code_sha256)
+    except JobCancelled:
+        # the cancel endpoint has already marked the row
+        return "cancelled"
+    except Exception as e:
+        finish_job(job_id, "failed", classify(e), f"{type(e).__name__}: {e}")
+        return "failed"
+    finally:
+        cancellations.forget(job_id)
+
+    status, error_code, error = job_outcome(result["errors"])
+    finish_job(job_id, status, error_code, error, result["report_key"])
+    return status
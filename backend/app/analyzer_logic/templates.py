@@ -0,0 +1,94 @@
+import hashlib
+import os
+import re
+from app.utils.config import PROMPTS_DIR
+
+_SLOT = re.compile(r"\{\{([a-z_][a-z0-9_]*)\}\}")
+
+_PYTHON_SECTIONS = ["code_analysis", "security_report", "performance_report", "best_practices_report",
+                    "complexity_report", "documentation_report"]
+_REACT_SECTIONS = _PYTHON_SECTIONS + ["react_specific_report", "accessibility_report"]
+
+# template name (path under PROMPTS_DIR without .txt) -> the {{slots}} it must use
+TEMPLATE_SLOTS = {
+    **{f"python/{section}": {"code"} for section in _PYTHON_SECTIONS},
+    **{f"react/{section}": {"code"} for section in _REACT_SECTIONS},
+    "python/final_documentation": set(_PYTHON_SECTIONS) | {"pending_note"},
+    "react/final_documentation": set(_REACT_SECTIONS) | {"pending_note"},
+    "shared/section_summary": {"title", "words", "text"},
+}
+
+
+class PromptTemplateError(ValueError):
+    pass
+
+
+class PromptTemplate:
+    """
+    A prompt split once into literal text and {{slot}} names.
+
+    render() fills the slots and appends any extra parts with a single join,
+    so the code buffer is copied once into the prompt and nowhere else.
+    """
+
+    __slots__ = ("name", "version", "slots", "_parts", "_slot_positions")
+
+    def __init__(self, name: str, text: str):
+        parts, position = [], 0
+        for match in _SLOT.finditer(text):
+            parts.append(text[position:match.start()])
+            parts.append(match.group(1))
+            position = match.end()
+        parts.append(text[position:])
+        stray = [part for part in parts[::2] if "{{" in part or "}}" in part]
+        if stray:
+            raise PromptTemplateError(f"Prompt {name} has a malformed slot near {stray[0][:40]!r}")
+
+        self.name = name
+        self.version = hashlib.sha256(text.encode("utf-8")).hexdigest()[:12]
+        self.slots = frozenset(parts[1::2])
+        self._parts = parts
+        self._slot_positions = range(1, len(parts), 2)
+
+    def render(self, extra=(), **values) -> str:
+        pieces = list(self._parts)
+        try:
+            for i in self._slot_positions:
+                pieces[i] = values[pieces[i]]
+        except KeyError as e:
+            raise PromptTemplateError(f"Prompt {self.name} needs a value for {{{{{e.args[0]}}}}}") from None
+        pieces.extend(extra)
+        return "".join(pieces)
+
+
+class PromptRegistry:
+    """The prompt templates under a directory, loaded and checked against TEMPLATE_SLOTS up front."""
+
+    def __init__(self, directory: str = PROMPTS_DIR):
+        self.directory = directory
+        self._templates = {}
+        for name, slots in TEMPLATE_SLOTS.items():
+            path = os.path.join(directory, name + ".txt")
+            try:
+                with open(path, encoding="utf-8") as f:
+                    template = PromptTemplate(name, f.read())
+            except FileNotFoundError:
+                raise PromptTemplateError(f"Prompt {name} is missing ({path})") from None
+            if template.slots != slots:
+                raise PromptTemplateError(
+                    f"Prompt {name} uses slots {sorted(template.slots)}, expected {sorted(slots)}"
+                )
+            self._templates[name] = template
+        # one hash over every template, for cache keys that must change with the prompts
+        self.version = hashlib.sha256(
+            "".join(name + template.version for name, template in sorted(self._templates.items())).encode("utf-8")
+        ).hexdigest()[:12]
+
+    def get(self, name: str) -> PromptTemplate:
+        return self._templates[name]
+
+    def render(self, name: str, extra=(), **values) -> str:
+        return self._templates[name].render(extra, **values)
+
+
+prompts = PromptRegistry()
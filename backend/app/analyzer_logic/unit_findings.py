@@ -0,0 +1,291 @@
+import ast
+import hashlib
+import re
+import threading
+import time
+from functools import lru_cache
+from app.analyzer_logic.code_buffer import get_code
+from app.analyzer_logic.fingerprint import fingerprint_tokens
+from app.analyzer_logic.near_dup import shift_line_numbers, NEVER_REUSED
+from app.utils.database import get_db_connection
+from app.utils.config import (
+    FINDINGS_ISOLATION,
+    FINDINGS_MIN_UNIT_LINES,
+    FINDINGS_MAX_AGE_DAYS,
+    FINDINGS_MAX_ROWS,
+    FINDINGS_EVICT_EVERY,
+)
+from app.utils.metrics import register, Counter
+
+UNIT_FINDINGS_LOOKUPS = register(Counter("review_unit_findings_lookups_total", "Per-unit findings index lookups.", ["section", "result"]))
+
+APPENDIX_HEADING = "## Findings by Unit"
+REUSED_HEADING = "### Previously Reviewed Units"
+
+_JS_UNIT_START = re.compile(
+    r"^(?:export\s+(?:default\s+)?)?(?:async\s+)?"
+    r"(?:function\s*\*?\s*([A-Za-z_$][\w$]*)|class\s+([A-Za-z_$][\w$]*)|(?:const|let|var)\s+([A-Za-z_$][\w$]*)\s*=)"
+)
+_UNIT_HEADING = re.compile(r"^####\s+Unit:\s*`?([A-Za-z_$][\w$.]*)`?", re.M)
+# bumped when canonicalization changes, so rows stored under the old one never match
+UNIT_HASH_VERSION = "2"
+
+
+class Unit:
+    """One top-level function, class or component; lines are 1-based and inclusive."""
+
+    __slots__ = ("name", "start_line", "end_line", "text", "unit_hash")
+
+    def __init__(self, name, start_line, end_line, text, unit_hash):
+        self.name = name
+        self.start_line = start_line
+        self.end_line = end_line
+        self.text = text
+        self.unit_hash = unit_hash
+
+
+def _python_spans(code: str):
+    try:
+        tree = ast.parse(code)
+    except (SyntaxError, ValueError):
+        return []
+    spans = []
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            start = min([node.lineno] + [d.lineno for d in node.decorator_list])
+            spans.append((node.name, start, node.end_lineno))
+    return spans
+
+
+def _js_spans(lines: list):
+    """Top-level declarations, ended where their braces/parens balance again."""
+    spans = []
+    i = 0
+    while i < len(lines):
+        match = _JS_UNIT_START.match(lines[i])
+        if not match:
+            i += 1
+            continue
+        name = next(group for group in match.groups() if group)
+        depth, opened, end = 0, False, i
+        for j in range(i, len(lines)):
+            for char in lines[j]:
+                if char in "{(":
+                    depth += 1
+                    opened = True
+                elif char in "})":
+                    depth -= 1
+            end = j
+            if depth <= 0 and (opened or lines[j].rstrip().endswith(";")):
+                break
+        spans.append((name, i + 1, end + 1))
+        i = end + 1
+    return spans
+
+
+def unit_hash(text: str, language: str) -> str:
+    """Hash of the unit's normalized token stream, so renames and reformatting share findings."""
+    kind, tokens = fingerprint_tokens(text, language)
+    return hashlib.sha256((UNIT_HASH_VERSION + "\0" + kind + "\0" + "\0".join(tokens)).encode("utf-8")).hexdigest()
+
+
+def units_of(code: str, language: str, min_lines: int = FINDINGS_MIN_UNIT_LINES) -> tuple:
+    """Top-level units of code at least min_lines long."""
+    lines = code.splitlines()
+    spans = _python_spans(code) if language == "python" else _js_spans(lines)
+    units = []
+    for name, start, end in spans:
+        if end - start + 1 < min_lines:
+            continue
+        text = "\n".join(lines[start - 1:end])
+        units.append(Unit(name, start, end, text, unit_hash(text, language)))
+    return tuple(units)
+
+
+@lru_cache(maxsize=32)
+def split_units(code_ref: str, language: str) -> tuple:
+    """Top-level units of the registered code worth indexing, cached per code ref."""
+    return units_of(get_code(code_ref), language)
+
+
+class FindingsIndex:
+    """
+    Per-unit findings shared across jobs, in the unit_findings table.
+
+    Rows are keyed by (unit hash, section, scope); scope is "" when findings
+    are shared tenant-wide and the username when FINDINGS_ISOLATION=user.
+    Line numbers are stored relative to the unit's first line.
+    """
+
+    def __init__(self):
+        self._puts = 0
+        self._lock = threading.Lock()
+
+    def get_many(self, hashes: list, section: str, scope: str) -> dict:
+        if not hashes:
+            return {}
+        placeholders = ",".join("?" * len(hashes))
+        db,conn = get_db_connection()
+        conn.execute(
+            f"SELECT unit_hash, findings FROM unit_findings WHERE section = ? AND scope = ? AND unit_hash IN ({placeholders})",
+            (section, scope, *hashes)
+        )
+        found = dict(conn.fetchall())
+        if found:
+            conn.executemany(
+                "UPDATE unit_findings SET hits = hits + 1, last_used_at = ? WHERE unit_hash = ? AND section = ? AND scope = ?",
+                [(time.time(), h, section, scope) for h in found]
+            )
+            db.commit()
+        conn.close()
+        return found
+
+    def put_many(self, rows: list, section: str, scope: str):
+        """rows are (unit_hash, findings) pairs."""
+        if not rows:
+            return
+        now = time.time()
+        db,conn = get_db_connection()
+        conn.executemany(
+            """INSERT INTO unit_findings (unit_hash, section, scope, findings, created_at, last_used_at, hits)
+               VALUES (?, ?, ?, ?, ?, ?, 0)
+               ON CONFLICT(unit_hash, section, scope) DO UPDATE SET findings=excluded.findings, last_used_at=excluded.last_used_at""",
+            [(h, section, scope, findings, now, now) for h, findings in rows]
+        )
+        db.commit()
+        conn.close()
+        with self._lock:
+            self._puts += len(rows)
+            due = self._puts >= FINDINGS_EVICT_EVERY
+            if due:
+                self._puts = 0
+        if due:
+            self.evict()
+
+    def evict(self):
+        """
+        Drops rows unused for FINDINGS_MAX_AGE_DAYS, then the least recently
+        used rows over FINDINGS_MAX_ROWS. Evicting by hit count would drop
+        every new row (hits=0) first and stop the index taking in new units.
+        """
+        db,conn = get_db_connection()
+        conn.execute("DELETE FROM unit_findings WHERE last_used_at < ?", (time.time() - FINDINGS_MAX_AGE_DAYS * 86400,))
+        conn.execute(
+            """DELETE FROM unit_findings WHERE rowid IN (
+                   SELECT rowid FROM unit_findings ORDER BY last_used_at ASC
+                   LIMIT MAX((SELECT COUNT(*) FROM unit_findings) - ?, 0))""",
+            (FINDINGS_MAX_ROWS,)
+        )
+        db.commit()
+        conn.close()
+
+
+findings_index = FindingsIndex()
+
+
+def findings_scope(user_id: str):
+    """Index scope for a user's jobs, or None when the index is disabled."""
+    if FINDINGS_ISOLATION == "off":
+        return None
+    if FINDINGS_ISOLATION == "user":
+        return user_id or None
+    return ""
+
+
+def _comment(language: str) -> str:
+    return "#" if language == "python" else "//"
+
+
+class UnitPlan:
+    """
+    How one analyzer call uses the index: units with stored findings are
+    blanked out of the code sent (keeping line numbers), the model is asked
+    for per-unit findings on the rest, and finish() merges both into the section.
+    """
+
+    def __init__(self, section, scope, units, cached, code, instructions, skip_call):
+        self.section = section
+        self.scope = scope
+        self.units = units
+        self.cached = cached
+        self.code = code
+        self.instructions = instructions
+        self.skip_call = skip_call
+
+    def finish(self, text: str) -> str:
+        main, _, appendix = text.partition(APPENDIX_HEADING)
+        fresh = [unit for unit in self.units if unit.unit_hash not in self.cached]
+        names = [unit.name for unit in fresh]
+        parts = {}
+        headings = list(_UNIT_HEADING.finditer(appendix))
+        for index, heading in enumerate(headings):
+            stop = headings[index + 1].start() if index + 1 < len(headings) else len(appendix)
+            parts[heading.group(1)] = appendix[heading.end():stop].strip()
+
+        rows = [
+            (unit.unit_hash, shift_line_numbers(parts[unit.name], 1 - unit.start_line))
+            for unit in fresh
+            if parts.get(unit.name) and names.count(unit.name) == 1
+        ]
+        findings_index.put_many(rows, self.section, self.scope)
+
+        reused = [unit for unit in self.units if unit.unit_hash in self.cached]
+        if not reused:
+            return main.rstrip()
+        blocks = [
+            f"#### {unit.name} (lines {unit.start_line}-{unit.end_line})\n"
+            + shift_line_numbers(self.cached[unit.unit_hash], unit.start_line - 1)
+            for unit in reused
+        ]
+        return (main.rstrip() + f"\n\n{REUSED_HEADING}\n\n" + "\n\n".join(blocks)).strip()
+
+
+def plan_units(state, section: str, prompt_version: str):
+    """
+    Returns a UnitPlan for this analyzer call, or None when the index does not apply.
+
+    Findings are indexed per prompt version, so editing a prompt does not
+    reuse findings produced by the old one. Sections in NEVER_REUSED are
+    neither stored nor reused.
+    """
+    scope = state.get("findings_scope")
+    language = state.get("language")
+    if scope is None or not language or section in NEVER_REUSED:
+        return None
+    units = split_units(state["code_ref"], language)
+    if not units:
+        return None
+
+    index_section = f"{section}@{prompt_version}"
+    cached = findings_index.get_many([unit.unit_hash for unit in units], index_section, scope)
+    for unit in units:
+        UNIT_FINDINGS_LOOKUPS.inc(section=section, result="hit" if unit.unit_hash in cached else "miss")
+
+    code = get_code(state["code_ref"])
+    fresh = [unit for unit in units if unit.unit_hash not in cached]
+    if len(fresh) < len(units):
+        lines = code.splitlines()
+        for unit in units:
+            if unit.unit_hash in cached:
+                marker = f"{_comment(language)} [{unit.name}: reviewed earlier, findings reused]"
+                lines[unit.start_line - 1:unit.end_line] = [marker] + [""] * (unit.end_line - unit.start_line)
+        elided = "\n".join(lines)
+    else:
+        elided = code
+
+    covered = {n for unit in units for n in range(unit.start_line, unit.end_line + 1)}
+    leftover = [
+        line for n, line in enumerate(code.splitlines(), 1)
+        if n not in covered and line.strip() and not re.match(r"\s*(import|from)\b", line)
+    ]
+    skip_call = not fresh and not leftover
+
+    instructions = ""
+    if fresh:
+        instructions = (
+            f"\n\nAfter the report, add a final section `{APPENDIX_HEADING}` with a `#### Unit: <name>` "
+            "heading for each of these top-level definitions, listing only the findings inside it "
+            "(use the same line numbers as above):\n"
+            + "\n".join(f"- unit: {unit.name}" for unit in fresh)
+        )
+    return UnitPlan(index_section, scope, units, cached, elided, instructions, skip_call)
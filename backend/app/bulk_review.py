@@ -0,0 +1,134 @@
+"""
+Bulk reviews through batch inference, for nightly and CI scans of many files.
+
+    python -m app.bulk_review --user ci-bot path/to/repo other/file.py
+
+Every .py/.js/.jsx/.ts/.tsx file under the given paths becomes a job owned
+by --user. Their analyzer prompts, and then their summaries, are sent to
+BATCH_URL as batches instead of one interactive call each; the reports are
+stored and the job rows updated like any other job's.
+"""
+import argparse
+import json
+import os
+import time
+import uuid
+from datetime import datetime
+from app.utils.database import create_db, get_db_connection
+from app.utils.models import check_username
+from app.utils.config import MAX_CODE_BYTES
+from app.utils.metrics import save_job_metrics
+from app.analyzer_logic.batching import BatchSession, run_bulk
+from app.analyzer_logic.graph import write_report
+from app.analyzer_logic.errors import classify, job_outcome
+
+SOURCE_EXTENSIONS = (".py", ".js", ".jsx", ".ts", ".tsx")
+
+
+def collect_files(paths: list) -> list:
+    """Source files under paths, skipping empty and oversized ones."""
+    files = []
+    for path in paths:
+        if os.path.isfile(path):
+            candidates = [path]
+        else:
+            candidates = [
+                os.path.join(root, name)
+                for root, dirs, names in os.walk(path)
+                if not any(part.startswith(".") or part == "node_modules" for part in root.split(os.sep))
+                for name in sorted(names)
+            ]
+        for candidate in candidates:
+            if candidate.endswith(SOURCE_EXTENSIONS) and 0 < os.path.getsize(candidate) <= MAX_CODE_BYTES:
+                files.append(candidate)
+    return files
+
+
+def fail_jobs(rows: list, error_code: str, error: str):
+    """Marks the jobs of (file, job_id, status) rows failed, unless cancelled meanwhile."""
+    db, conn = get_db_connection()
+    for row in rows:
+        conn.execute("update job set status= 'failed',error_code= ?,error= ? where job_id=? and status != 'cancelled'",
+                     (error_code, error, row[1]))
+        row[2] = "failed" if conn.rowcount else "cancelled"
+    db.commit()
+    conn.close()
+    for row in rows:
+        save_job_metrics(row[1])
+
+
+def review_files(files: list, username: str, chunk: int = 500, session: BatchSession = None) -> list:
+    """Creates a job per file and reviews them chunk by chunk; returns (file, job_id, status) rows."""
+    session = session or BatchSession()
+    rows = []
+    for start in range(0, len(files), chunk):
+        jobs = []
+        db, conn = get_db_connection()
+        for path in files[start:start + chunk]:
+            with open(path, encoding="utf-8", errors="replace") as f:
+                code = f.read()
+            job_id = str(uuid.uuid4())
+            conn.execute("INSERT into job(job_id,status,username,created_at,result,error) VALUES (?, ?, ?, ?, ?, ?)",
+                         (job_id, "processing", username, datetime.now().isoformat(), None, None))
+            jobs.append((job_id, code, username))
+            rows.append([path, job_id, "processing"])
+        db.commit()
+        conn.close()
+
+        try:
+            states = run_bulk(jobs, session)
+        except Exception as e:
+            # a batch that failed or timed out leaves the whole chunk without results
+            fail_jobs(rows[start:], classify(e), f"{type(e).__name__}: {e}")
+            continue
+
+        db, conn = get_db_connection()
+        for row in rows[start:]:
+            job_id = row[1]
+            state = states[job_id]
+            status, error_code, error = job_outcome(state.get("errors") or [])
+            if state.get("cancelled"):
+                # the cancel endpoint has already marked the row
+                row[2] = "cancelled"
+                continue
+            report_key = None
+            if status != "failed":
+                report_key = f"{username}/{job_id}.md"
+                write_report(report_key, state["final_documentation"])
+            conn.execute("update job set status= ?,error_code= ?,error= ?,path= ? where job_id=? and status != 'cancelled'",
+                         (status, error_code, error, report_key, job_id))
+            row[2] = status
+        db.commit()
+        conn.close()
+        for job_id, _, _ in jobs:
+            save_job_metrics(job_id)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Review many files through batch inference.")
+    parser.add_argument("paths", nargs="+", help="files or directories to review")
+    parser.add_argument("--user", required=True, type=check_username, help="username owning the jobs")
+    parser.add_argument("--chunk", type=int, default=500, help="jobs held in memory per round of batches")
+    args = parser.parse_args()
+
+    create_db()
+    files = collect_files(args.paths)
+    session = BatchSession()
+    started = time.monotonic()
+    rows = review_files(files, args.user, args.chunk, session)
+    print(json.dumps({
+        "files": len(files),
+        "completed": sum(row[2] == "completed" for row in rows),
+        "partial": sum(row[2] == "partial" for row in rows),
+        "failed": sum(row[2] == "failed" for row in rows),
+        "cancelled": sum(row[2] == "cancelled" for row in rows),
+        "batches": session.batches,
+        "records": session.records,
+        "seconds": round(time.monotonic() - started, 1),
+        "jobs": [{"file": path, "job_id": job_id, "status": status} for path, job_id, status in rows],
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
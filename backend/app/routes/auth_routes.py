@@ -1,44 +1,81 @@
-from fastapi import APIRouter,HTTPException,Header
-from fastapi.security import HTTPBearer
-import hashlib
-import secrets
-from datetime import datetime,timedelta
+from fastapi import APIRouter,HTTPException,Header,Depends
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from starlette.concurrency import run_in_threadpool
+from datetime import datetime
 import sqlite3
 from app.utils.models import UserCreate, UserLogin, Token
 from app.utils.database import get_db_connection
+from app.utils.session_store import session_store
+from app.utils.passwords import password_hasher, DUMMY_HASH
 
 auth_routes = APIRouter()
 security = HTTPBearer()
 
-def hash_password(password: str) -> str:
-    return hashlib.sha256(password.encode()).hexdigest()
+async def hash_password(password: str) -> str:
+    return await password_hasher.hash(password)
 
 def create_session_token(user_id: int) -> tuple[str, datetime]:
-    token = secrets.token_urlsafe(32)
-    expires_at = datetime.now() + timedelta(days=7)
-    
+    return session_store.create(user_id)
+
+def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    """FastAPI dependency: resolves a Bearer token to its user_id, usually from cache."""
+    user_id = session_store.validate(credentials.credentials)
+    if user_id is None:
+        raise HTTPException(status_code=401, detail="Invalid or expired token")
+    return user_id
+
+def get_current_username(user_id = Depends(get_current_user)) -> str:
+    """FastAPI dependency: the caller's username, which job rows are owned by."""
+    username = find_username(user_id)
+    if username is None:
+        raise HTTPException(status_code=401, detail="Invalid or expired token")
+    return username
+
+def insert_user(username: str, email: str, password_hash: str) -> int:
     db,conn = get_db_connection()
-    db.execute(
-        "INSERT INTO sessions (user_id, token, expires_at) VALUES (?, ?, ?)",
-        (user_id, token, expires_at)
-    )
+    conn.execute("INSERT INTO users (username, email, password_hash) VALUES (?, ?, ?)",
+            (username, email, password_hash))
+    user_id = conn.lastrowid
+    db.commit()
+    conn.close()
+    return user_id
+
+def find_user(username: str):
+    db,conn = get_db_connection()
+    conn.execute("SELECT id, password_hash FROM users WHERE username = ?", (username,))
+    user = conn.fetchone()
+    conn.close()
+    return user
+
+def find_username(user_id):
+    """
+    Username for a session's user_id. Signed tokens issued at registration
+    before sessions carried users.id hold the username itself.
+    """
+    db,conn = get_db_connection()
+    if isinstance(user_id, str):
+        conn.execute("SELECT username FROM users WHERE username = ?", (user_id,))
+    else:
+        conn.execute("SELECT username FROM users WHERE id = ?", (user_id,))
+    user = conn.fetchone()
+    conn.close()
+    return user[0] if user else None
+
+def update_password_hash(user_id: int, password_hash: str):
+    db,conn = get_db_connection()
+    conn.execute("UPDATE users SET password_hash = ? WHERE id = ?", (password_hash, user_id))
     db.commit()
     conn.close()
-    
-    return token, expires_at
 
+# The KDF runs on the password pool and SQLite on the threadpool, so neither
+# blocks the event loop while other requests are being served.
 @auth_routes.post("/register",response_model=Token)
-def register(user : UserCreate):
-    password_hash = hash_password(user.password)
+async def register(user : UserCreate):
+    password_hash = await hash_password(user.password)
 
     try:
-        db,conn = get_db_connection()
-        db.execute("INSERT INTO users (username, email, password_hash) VALUES (?, ?, ?)",
-                (user.username, user.email, password_hash))
-        db.commit()
-        conn.close()
-        user_id = user.username
-        token, _ = create_session_token(user_id)
+        user_id = await run_in_threadpool(insert_user, user.username, user.email, password_hash)
+        token, _ = await run_in_threadpool(create_session_token, user_id)
         return {
             "access_token":token,"token_type":"bearer"
         }
@@ -47,22 +84,18 @@ def register(user : UserCreate):
         raise HTTPException(status_code=400, detail="Username or email already exists")
     
 @auth_routes.post("/login", response_model=Token)
-def login(credentials: UserLogin):
-    password_hash = hash_password(credentials.password)
-
-    db,conn = get_db_connection()
-    conn.execute(
-        "SELECT id FROM users WHERE username = ? AND password_hash = ?",
-        (credentials.username, password_hash)
-    )
-
-    user = conn.fetchone()
-    conn.close()
-
-    if not user:
+async def login(credentials: UserLogin):
+    user = await run_in_threadpool(find_user, credentials.username)
+    # unknown usernames pay for a KDF run too, so timing does not reveal which exist
+    matches, needs_rehash = await password_hasher.verify(credentials.password, user[1] if user else DUMMY_HASH)
+    if not user or not matches:
         raise HTTPException(status_code=401, detail="Invalid credentials")
+
+    # Transparent upgrade of legacy sha256 or outdated-cost hashes
+    if needs_rehash:
+        await run_in_threadpool(update_password_hash, user[0], await hash_password(credentials.password))
     
-    token, _ = create_session_token(user[0])
+    token, _ = await run_in_threadpool(create_session_token, user[0])
     return {"access_token": token, "token_type": "bearer"}
 
 @auth_routes.post("/logout")
@@ -72,9 +105,10 @@ def logout(authorization: str = Header(None)):
     
     token = authorization.replace("Bearer ", "")
     
-    db,conn = get_db_connection()
-    conn.execute("DELETE FROM sessions WHERE token = ?", (token,))
-    db.commit()
-    conn.close()
+    session_store.revoke(token)
     
-    return {"message": "Logged out successfully"}
\ No newline at end of file
+    return {"message": "Logged out successfully"}
+
+@auth_routes.get("/me")
+def me(user_id = Depends(get_current_user)):
+    return {"user_id": user_id}
\ No newline at end of file
@@ -1,71 +1,249 @@
-from fastapi import Header, APIRouter, HTTPException, BackgroundTasks
+from fastapi import Header, APIRouter, HTTPException, Response, Request, Depends
+from starlette.concurrency import run_in_threadpool
 from fastapi.security import HTTPBearer
+from typing import Literal
+import os
 import uuid
+import time
 from app.utils.database import get_db_connection 
-from app.utils.models import SubmitInput
+from app.utils.models import SubmitInput, check_username
 from datetime import datetime
-from app.analyzer_logic.graph import analyze_code
+from app.analyzer_logic.tasks import analyze_code_task, analyze_upload_task
+from app.utils.scheduler import scheduler, quota_exceeded
+from app.utils.broker import get_broker
+from app.utils.storage import get_storage
+from app.utils.uploads import spool_upload
+from app.utils.config import MAX_CODE_BYTES, JOB_DISPATCH
+from app.utils.report_render import report_cache, etag_matches, negotiate_encoding, parse_range, representation_etag
+from app.utils.cancellation import cancellations, JOBS_CANCELLED
+from app.analyzer_logic.errors import RETRYABLE
+from app.utils.notifier import notify_job, validate_callback_url
+from app.routes.auth_routes import get_current_username
 
 file_router = APIRouter()
 security = HTTPBearer()
 
+def dispatch_job(job_id: str, username: str, priority: str, code_size: int,
+                 user_code: str = None, spool_path: str = None, code_sha256: str = None) -> dict:
+    """
+    Hands a queued job to whoever runs it and returns its queue info.
+
+    In local mode the in-process scheduler runs it; in broker mode the code
+    goes to shared storage and a message to the broker, for any worker.
+    """
+    submitted_at = time.time()
+    # cost in KB of code, so a user's share is measured in work, not job count
+    cost = code_size / 1024
+
+    if JOB_DISPATCH == "broker":
+        code_key = f"code/{job_id}"
+        if spool_path:
+            with open(spool_path, "rb") as f:
+                get_storage().put(code_key, f.read())
+            os.remove(spool_path)
+        else:
+            get_storage().put(code_key, user_code.encode("utf-8"))
+        broker = get_broker()
+        broker.publish({
+            "job_id": job_id,
+            "username": username,
+            "priority": priority,
+            "cost": cost,
+            "code_key": code_key,
+            "code_sha256": code_sha256,
+            "submitted_at": submitted_at,
+        })
+        return {"queue_depth": broker.depth()}
+
+    if spool_path:
+        scheduler.submit(job_id, username, priority, cost,
+                         analyze_upload_task, spool_path, code_sha256, username, job_id, submitted_at)
+    else:
+        scheduler.submit(job_id, username, priority, cost,
+                         analyze_code_task, user_code, username, job_id, submitted_at)
+    return scheduler.queue_status(job_id) or {}
+
+def enqueue_job(username: str, priority: str, code_size: int, callback_url: str = None, **code) -> dict:
+    """
+    Creates the job row and dispatches it; code is user_code=... or
+    spool_path=..., code_sha256=... callback_url, if given, is notified when
+    the job finishes.
+    """
+    try:
+        # accounts from before usernames were validated cannot own report storage
+        check_username(username)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if quota_exceeded(username):
+        raise HTTPException(status_code=429, detail="Daily token quota exceeded.")
+    if callback_url:
+        try:
+            validate_callback_url(callback_url)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    job_id = str(uuid.uuid4())
+
+    db, conn = get_db_connection()
+    conn.execute("INSERT into job(job_id,status,username,created_at,result,error,callback_url) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job_id,"queued",username,datetime.now().isoformat(),None,None,callback_url))
+    db.commit()
+    conn.close()
+
+    return {"job_id":job_id,"status":"queued", **dispatch_job(job_id, username, priority, code_size, **code)}
+
+def check_owner(claimed: str, caller: str):
+    """Rejects a client-supplied username that is not the signed-in user's."""
+    if claimed is not None and claimed != caller:
+        raise HTTPException(status_code=403, detail="Jobs can only be submitted as the signed-in user.")
+
 @file_router.post("/submit_code")
-def submit_code(payload:SubmitInput,background_tasks: BackgroundTasks):
+def submit_code(payload:SubmitInput, username: str = Depends(get_current_username)):
 
     payload = payload.model_dump()
     user_code = payload.get("code")
-    username = payload.get("username")
-    print(username,user_code)
+    check_owner(payload.get("username"), username)
     if not user_code:
         raise HTTPException(status_code=400, detail="Code is required.")
-    print(user_code)
-    job_id = str(uuid.uuid4())
+    # the limit is in bytes, as for uploads; non-ASCII characters take several
+    size = len(user_code.encode("utf-8"))
+    if size > MAX_CODE_BYTES:
+        raise HTTPException(status_code=413, detail=f"Code exceeds {MAX_CODE_BYTES} bytes.")
 
-    db, conn = get_db_connection()
-    conn.execute("INSERT into job(job_id,status,username,created_at,result,error) VALUES (?, ?, ?, ?, ?, ?)",
-                (job_id,"processing",username,datetime.now().isoformat(),None,None))
-    db.commit()
-    conn.close()
+    return enqueue_job(username, payload.get("priority"), size, payload.get("callback_url"), user_code=user_code)
 
-    background_tasks.add_task(analyze_code_task, user_code, username, job_id)
+@file_router.post("/upload_code")
+async def upload_code(request: Request, username: str = None, priority: Literal["interactive", "batch"] = "interactive",
+                      callback_url: str = None, caller: str = Depends(get_current_username)):
+    """
+    Streams raw code from the request body (any content type) to disk.
 
-    return {"job_id":job_id,"status":"processing"}
+    The queued job holds only the spool path and hash; the code is read
+    into memory when a worker starts it.
+    """
+    check_owner(username, caller)
+    username = caller
+    path, code_sha256, size = await spool_upload(request)
+    try:
+        return await run_in_threadpool(enqueue_job, username, priority, size, callback_url,
+                                       spool_path=path, code_sha256=code_sha256)
+    except BaseException:
+        if os.path.exists(path):
+            os.remove(path)
+        raise
 
 @file_router.get("/job/{username}/{job_id}")
-def get_job_status(username:str,job_id: str):
+def get_job_status(username:str,job_id: str, caller: str = Depends(get_current_username)):
+    if username != caller:
+        raise HTTPException(status_code=404, detail="Job not found.")
 
     db,conn = get_db_connection()
-    conn.execute("select * from job where username= ? AND job_id = ?",(username,job_id))
+    conn.execute("select job_id, status, created_at, error, error_code from job where username= ? AND job_id = ?",(username,job_id))
     jobs = conn.fetchone()
+    conn.close()
     
-    print(jobs)
-    if job_id not in jobs:
+    if not jobs:
         raise HTTPException(status_code=404, detail="Job not found.")
     
-    print(jobs[0])
-
-    return {
+    # partial jobs have a report with some sections missing; error says which
+    status = {
         "job_id": jobs[0],
         "status": jobs[1],
-        "created_at": jobs[3],
-        "result": jobs[4] if jobs[4] == "completed" else None,
-        "error": jobs[5]
+        "created_at": jobs[2],
+        "result": f"/api/file/report/{jobs[0]}" if jobs[1] in ("completed", "partial") else None,
+        "error": jobs[3],
+        "error_code": jobs[4],
+        "retryable": jobs[4] in RETRYABLE if jobs[4] else None
     }
+    if jobs[1] == "queued":
+        if JOB_DISPATCH == "broker":
+            status["queue_depth"] = get_broker().depth()
+        else:
+            status.update(scheduler.queue_status(job_id) or {})
+    return status
 
-def analyze_code_task(user_code: str, user_id: str, job_id: str):
-    """Background task to analyze code and update job status."""
-    try:
-        # print(user_code,type(user_code))
-        result = analyze_code(user_code, user_id, job_id)
-        print(result)
-
-        db,conn = get_db_connection()
-        conn.execute("update job set status= ?,path=? where job_id=?",("completed",result['file_path'],job_id))
-        db.commit()
-        conn.close()
-
-    except Exception as e:
-        db,conn = get_db_connection()
-        conn.execute("update job set status= ?,error= ? where job_id=?",("failed",result["metadata"]["error"],job_id))
-        db.commit()
-        conn.close()
\ No newline at end of file
+@file_router.post("/job/{username}/{job_id}/cancel")
+def cancel_job(username: str, job_id: str, caller: str = Depends(get_current_username)):
+    """
+    Cancels a queued or running job of the signed-in user.
+
+    A queued job is skipped when its turn comes. A running one stops at its
+    next LLM call or wait: calls not yet started are dropped and calls in
+    flight are abandoned. Nodes in other processes notice within
+    CANCEL_POLL_SECONDS.
+    """
+    # other users' jobs are reported missing, not forbidden, so ids cannot be probed
+    if username != caller:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    db,conn = get_db_connection()
+    conn.execute("update job set status= ?,error= ? where username= ? AND job_id = ? AND status IN ('queued', 'processing')",
+                 ("cancelled","Cancelled by user",username,job_id))
+    cancelled = conn.rowcount
+    conn.execute("select status, callback_url from job where username= ? AND job_id = ?",(username,job_id))
+    job = conn.fetchone()
+    db.commit()
+    conn.close()
+
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    if not cancelled:
+        raise HTTPException(status_code=409, detail=f"Job is already {job[0]}.")
+    JOBS_CANCELLED.inc()
+    notify_job(job[1], job_id, "cancelled", error="Cancelled by user")
+    # in broker mode the job runs in a worker process, which polls the row
+    if JOB_DISPATCH == "local":
+        cancellations.cancel(job_id)
+    return {"job_id": job_id, "status": "cancelled"}
+
+@file_router.get("/report/{job_id}")
+def get_report(
+    job_id: str,
+    format: Literal["markdown", "html"] = "markdown",
+    if_none_match: str = Header(None),
+    accept_encoding: str = Header(None),
+    range_header: str = Header(None, alias="Range"),
+    if_range: str = Header(None),
+    caller: str = Depends(get_current_username),
+):
+    """Serves a finished report of the signed-in user with ETag revalidation, compression and byte ranges."""
+    db,conn = get_db_connection()
+    conn.execute("select status, path from job where job_id = ? AND username = ?",(job_id,caller))
+    job = conn.fetchone()
+    conn.close()
+
+    stored_etag = get_storage().etag(job[1]) if job and job[1] else None
+    if stored_etag is None:
+        raise HTTPException(status_code=404, detail="Report not found.")
+
+    # a Range against an older version (If-Range mismatch) gets the whole current body
+    if range_header and if_range and if_range.strip() != representation_etag(stored_etag, format, "identity"):
+        range_header = None
+    # Ranges address the uncompressed representation, so they skip compression
+    encoding = "identity" if range_header else negotiate_encoding(accept_encoding)
+    etag = representation_etag(stored_etag, format, encoding)
+
+    media_type = "text/html; charset=utf-8" if format == "html" else "text/markdown; charset=utf-8"
+    headers = {
+        "ETag": etag,
+        "Vary": "Accept-Encoding",
+        "Accept-Ranges": "bytes",
+        "Cache-Control": "private, no-cache",
+    }
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+
+    body = report_cache.body(job_id, job[1], stored_etag, format, encoding)
+
+    if range_header:
+        try:
+            byte_range = parse_range(range_header, len(body))
+        except ValueError:
+            headers["Content-Range"] = f"bytes */{len(body)}"
+            return Response(status_code=416, headers=headers)
+        if byte_range:
+            start, end = byte_range
+            headers["Content-Range"] = f"bytes {start}-{end}/{len(body)}"
+            return Response(body[start:end + 1], status_code=206, media_type=media_type, headers=headers)
+
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    return Response(body, media_type=media_type, headers=headers)
@@ -0,0 +1,68 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse, JSONResponse
+import time
+from app.utils.metrics import render_prometheus
+from app.utils.database import get_db_connection
+from app.utils.config import WORKER_HEARTBEAT_SECONDS
+from app.supervisor import worker_supervisor
+from app.utils.warmup import warmup
+from app.utils.compactor import compactor
+
+metrics_router = APIRouter()
+
+@metrics_router.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
+
+@metrics_router.get("/metrics/routing")
+def routing_report():
+    """Per-route latency and cost since this process started, with savings against premier-only routing."""
+    from app.analyzer_logic.routing import router
+    return router.report()
+
+@metrics_router.get("/warmup")
+def warmup_status():
+    """Whether this process has loaded the analyzer stack; 503 until it has, for readiness probes."""
+    status = warmup.status()
+    return JSONResponse(status_code=200 if status["state"] == "ready" else 503, content=status)
+
+@metrics_router.post("/warmup")
+def run_warmup():
+    """Loads the analyzer stack now (or waits for the load in progress) and reports how long it took."""
+    status = warmup.run()
+    return JSONResponse(status_code=200 if status["state"] == "ready" else 503, content=status)
+
+@metrics_router.get("/health/workers")
+def worker_health():
+    """Last heartbeat of every review worker process; stale ones have missed three in a row."""
+    db,conn = get_db_connection()
+    conn.execute("""SELECT worker_id, pid, state, running, completed, failed, peak_rss_bytes, started_at, heartbeat_at
+                    FROM worker_health ORDER BY worker_id""")
+    rows = conn.fetchall()
+    conn.close()
+
+    now = time.time()
+    workers = [
+        {
+            "worker_id": row[0],
+            "pid": row[1],
+            "state": row[2],
+            "running": row[3],
+            "completed": row[4],
+            "failed": row[5],
+            "peak_rss_bytes": row[6],
+            "uptime_seconds": round(row[8] - row[7], 1),
+            "seconds_since_heartbeat": round(now - row[8], 1),
+            "stale": row[2] != "stopped" and now - row[8] > 3 * WORKER_HEARTBEAT_SECONDS,
+        }
+        for row in rows
+    ]
+    health = {"workers": workers}
+    if worker_supervisor is not None:
+        health["supervisor"] = worker_supervisor.status()
+    return health
+
+@metrics_router.get("/health/compaction")
+def compaction_status():
+    """What the last retention and compaction pass on this node deleted, or null before the first."""
+    return {"last_run": compactor.last_run}
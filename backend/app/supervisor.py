@@ -0,0 +1,123 @@
+"""
+Supervisor for a pool of review worker processes on one host.
+
+    python -m app.supervisor
+
+Each child is a spawned interpreter running app.worker, so it has its own
+compiled graph, LLM client and GIL; CPU-bound stages in one job no longer
+compete with request handling or with other jobs. Children that exit are
+restarted. On SIGTERM/SIGINT every child stops pulling jobs and drains;
+children still busy after WORKER_DRAIN_TIMEOUT_SECONDS are terminated and
+their unacked messages are redelivered by the broker.
+"""
+import multiprocessing
+import signal
+import socket
+import threading
+import time
+from app.utils.config import WORKER_PROCESSES, WORKER_DRAIN_TIMEOUT_SECONDS
+
+RESTART_BACKOFF_SECONDS = 5.0
+
+
+def _worker_main(slot: int, stop):
+    # the supervisor decides when children stop; a terminal ^C must not kill them mid-job
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+
+    from app.utils.database import create_db
+    from app.worker import run_worker
+    from app.utils.warmup import warmup
+    create_db()
+    warmup.start()
+    run_worker(stop, worker_id=f"{socket.gethostname()}:worker-{slot}")
+
+
+class _Child:
+    __slots__ = ("slot", "process", "stop", "restarts", "started_at")
+
+    def __init__(self, slot):
+        self.slot = slot
+        self.process = None
+        self.stop = None
+        self.restarts = 0
+        self.started_at = 0.0
+
+
+class WorkerSupervisor:
+    def __init__(self, processes: int = WORKER_PROCESSES, drain_timeout: float = WORKER_DRAIN_TIMEOUT_SECONDS):
+        self.processes = processes
+        self.drain_timeout = drain_timeout
+        # spawn, not fork: children must not inherit the parent's threads, DB handles or LLM client
+        self._ctx = multiprocessing.get_context("spawn")
+        self._children = [_Child(slot) for slot in range(processes)]
+        self._stopping = threading.Event()
+        self._monitor = None
+
+    def _spawn(self, child: _Child):
+        child.stop = self._ctx.Event()
+        child.process = self._ctx.Process(target=_worker_main, args=(child.slot, child.stop),
+                                          name=f"review-worker-{child.slot}", daemon=False)
+        child.process.start()
+        child.started_at = time.time()
+
+    def _watch(self):
+        while not self._stopping.wait(1.0):
+            for child in self._children:
+                if child.process.is_alive() or self._stopping.is_set():
+                    continue
+                # a child that keeps crashing on start should not spin the CPU
+                if time.time() - child.started_at < RESTART_BACKOFF_SECONDS:
+                    continue
+                child.restarts += 1
+                self._spawn(child)
+
+    def start(self):
+        for child in self._children:
+            self._spawn(child)
+        self._monitor = threading.Thread(target=self._watch, daemon=True, name="worker-supervisor")
+        self._monitor.start()
+
+    def stop(self):
+        """Drains every child, terminating those that outlive the drain timeout."""
+        self._stopping.set()
+        for child in self._children:
+            child.stop.set()
+        give_up_at = time.monotonic() + self.drain_timeout
+        for child in self._children:
+            child.process.join(max(give_up_at - time.monotonic(), 0))
+        for child in self._children:
+            if child.process.is_alive():
+                child.process.terminate()
+                child.process.join()
+
+    def status(self) -> list:
+        """Liveness of each slot as seen by the supervisor; job counters come from worker_health."""
+        return [
+            {
+                "slot": child.slot,
+                "pid": child.process.pid if child.process else None,
+                "alive": bool(child.process and child.process.is_alive()),
+                "exitcode": child.process.exitcode if child.process else None,
+                "restarts": child.restarts,
+            }
+            for child in self._children
+        ]
+
+
+# Started by the API's lifespan when WORKER_PROCESSES > 0
+worker_supervisor = WorkerSupervisor() if WORKER_PROCESSES > 0 else None
+
+
+def main():
+    supervisor = worker_supervisor or WorkerSupervisor(multiprocessing.cpu_count())
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+    supervisor.start()
+    stop.wait()
+    supervisor.stop()
+
+
+if __name__ == "__main__":
+    main()
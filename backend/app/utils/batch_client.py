@@ -0,0 +1,132 @@
+import json
+import time
+import urllib.request
+import uuid
+from urllib.parse import urlparse
+from app.utils.config import BATCH_URL, BATCH_S3_URI, BATCH_ROLE_ARN, AWS_REGION
+
+# Records use the Bedrock batch inference format for Converse-style models:
+#   input:  {"recordId": ..., "modelInput": {"messages": [...], "inferenceConfig": {"maxTokens": N}}}
+#   output: {"recordId": ..., "modelOutput": {"output": {"message": {...}}, "stopReason": ..., "usage": {...}}}
+# or {"recordId": ..., "error": {...}} for a record that failed.
+
+DONE_STATUSES = ("Completed", "PartiallyCompleted", "Failed", "Stopped", "Expired")
+
+
+class BatchClient:
+    """Submits batches of records for one model and fetches their results once done."""
+
+    def submit(self, model_id: str, records: list) -> str:
+        raise NotImplementedError
+
+    def status(self, batch_id: str) -> str:
+        """One of Submitted, InProgress or a DONE_STATUSES value."""
+        raise NotImplementedError
+
+    def results(self, batch_id: str) -> list:
+        raise NotImplementedError
+
+
+class HttpBatchClient(BatchClient):
+    """
+    A batching endpoint speaking the record format above:
+
+        POST {url}/batches               {"modelId": ..., "records": [...]} -> {"batchId": ...}
+        GET  {url}/batches/{id}          -> {"status": ...}
+        GET  {url}/batches/{id}/results  -> JSON lines of output records
+
+    app/utils/fake_batch_server.py serves this locally.
+    """
+
+    def __init__(self, url: str, timeout: float = 60):
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+
+    def _request(self, method: str, path: str, body: dict = None) -> bytes:
+        data = json.dumps(body).encode("utf-8") if body is not None else None
+        request = urllib.request.Request(self.url + path, data=data, method=method,
+                                         headers={"Content-Type": "application/json"})
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            return response.read()
+
+    def submit(self, model_id: str, records: list) -> str:
+        return json.loads(self._request("POST", "/batches", {"modelId": model_id, "records": records}))["batchId"]
+
+    def status(self, batch_id: str) -> str:
+        return json.loads(self._request("GET", f"/batches/{batch_id}"))["status"]
+
+    def results(self, batch_id: str) -> list:
+        body = self._request("GET", f"/batches/{batch_id}/results").decode("utf-8")
+        return [json.loads(line) for line in body.splitlines() if line.strip()]
+
+
+class BedrockBatchClient(BatchClient):
+    """
+    Bedrock batch inference jobs: records are staged as JSONL under
+    BATCH_S3_URI and the job runs as BATCH_ROLE_ARN. Bedrock rejects jobs
+    below its minimum record count, so small runs belong on an HTTP endpoint.
+    """
+
+    def __init__(self, s3_uri: str = BATCH_S3_URI, role_arn: str = BATCH_ROLE_ARN):
+        import boto3
+
+        parsed = urlparse(s3_uri)
+        self.bucket = parsed.netloc
+        self.prefix = parsed.path.strip("/")
+        self.role_arn = role_arn
+        self.s3 = boto3.client("s3", region_name=AWS_REGION)
+        self.bedrock = boto3.client("bedrock", region_name=AWS_REGION)
+        self._inputs = {}  # job arn -> input key
+
+    def _key(self, *parts) -> str:
+        return "/".join(part for part in (self.prefix,) + parts if part)
+
+    def submit(self, model_id: str, records: list) -> str:
+        name = f"review-batch-{uuid.uuid4().hex[:12]}"
+        input_key = self._key(name, "input.jsonl")
+        body = "\n".join(json.dumps(record) for record in records).encode("utf-8")
+        self.s3.put_object(Bucket=self.bucket, Key=input_key, Body=body)
+        job_arn = self.bedrock.create_model_invocation_job(
+            jobName=name,
+            roleArn=self.role_arn,
+            modelId=model_id,
+            inputDataConfig={"s3InputDataConfig": {"s3Uri": f"s3://{self.bucket}/{input_key}"}},
+            outputDataConfig={"s3OutputDataConfig": {"s3Uri": f"s3://{self.bucket}/{self._key(name, 'output')}/"}},
+        )["jobArn"]
+        self._inputs[job_arn] = (name, input_key)
+        return job_arn
+
+    def status(self, batch_id: str) -> str:
+        status = self.bedrock.get_model_invocation_job(jobIdentifier=batch_id)["status"]
+        return "InProgress" if status in ("Validating", "Scheduled", "Stopping") else status
+
+    def results(self, batch_id: str) -> list:
+        name, input_key = self._inputs[batch_id]
+        # Bedrock writes {output uri}/{job id}/{input file name}.out
+        job_id = batch_id.rsplit("/", 1)[-1]
+        output_key = self._key(name, "output", job_id, input_key.rsplit("/", 1)[-1] + ".out")
+        body = self.s3.get_object(Bucket=self.bucket, Key=output_key)["Body"].read().decode("utf-8")
+        return [json.loads(line) for line in body.splitlines() if line.strip()]
+
+
+def get_batch_client(url: str = BATCH_URL) -> BatchClient:
+    if url == "bedrock":
+        return BedrockBatchClient()
+    return HttpBatchClient(url)
+
+
+def wait_for(client: BatchClient, batch_ids: list, poll_seconds: float, timeout: float) -> dict:
+    """Polls until every batch is done; returns batch_id -> final status."""
+    give_up_at = time.time() + timeout
+    statuses = {}
+    while True:
+        for batch_id in batch_ids:
+            if batch_id not in statuses:
+                status = client.status(batch_id)
+                if status in DONE_STATUSES:
+                    statuses[batch_id] = status
+        if len(statuses) == len(batch_ids):
+            return statuses
+        if time.time() >= give_up_at:
+            raise TimeoutError(f"{len(batch_ids) - len(statuses)} batch(es) still running after {timeout:.0f}s")
+        time.sleep(poll_seconds)
@@ -0,0 +1,208 @@
+import json
+import queue
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from app.utils.config import BROKER_URL, BROKER_QUEUE, BROKER_VISIBILITY_TIMEOUT_SECONDS
+
+try:
+    import redis
+except ImportError:  # optional: only needed for redis:// brokers
+    redis = None
+
+
+class Broker:
+    """
+    Job queue shared by API nodes (publish) and review workers (consume).
+
+    Delivery is at-least-once: a consumed message must be acked once the job
+    is done, otherwise it becomes visible again after the visibility timeout.
+    """
+
+    def publish(self, message: dict):
+        raise NotImplementedError
+
+    def consume(self, timeout: float = 1.0):
+        """Returns (message_id, message) or None if nothing arrived within timeout."""
+        raise NotImplementedError
+
+    def ack(self, message_id):
+        raise NotImplementedError
+
+    def depth(self) -> int:
+        raise NotImplementedError
+
+    def requeue_stale(self) -> int:
+        """Makes messages held by dead consumers visible again; brokers with visibility timeouts need nothing."""
+        return 0
+
+
+class InProcessBroker(Broker):
+    """Single-process broker for local runs and tests; nothing survives a restart."""
+
+    def __init__(self):
+        self._queue = queue.Queue()
+
+    def publish(self, message: dict):
+        self._queue.put((str(uuid.uuid4()), message))
+
+    def consume(self, timeout: float = 1.0):
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def ack(self, message_id):
+        pass
+
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+
+class SqliteBroker(Broker):
+    """
+    Broker backed by a table in a SQLite file, for several processes on one host.
+
+    Claims use a single UPDATE ... RETURNING, so two workers never get the
+    same message while it is invisible.
+    """
+
+    def __init__(self, path: str, queue_name: str = BROKER_QUEUE,
+                 visibility_timeout: float = BROKER_VISIBILITY_TIMEOUT_SECONDS):
+        self.path = path
+        self.queue_name = queue_name
+        self.visibility_timeout = visibility_timeout
+        db = self._connect()
+        db.execute('''
+            CREATE TABLE IF NOT EXISTS broker_messages (
+                id TEXT NOT NULL PRIMARY KEY,
+                queue TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                visible_at REAL NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+        db.execute("CREATE INDEX IF NOT EXISTS idx_broker_messages_visible ON broker_messages(queue, visible_at)")
+        db.commit()
+        db.close()
+
+    def _connect(self):
+        db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        db.execute("PRAGMA journal_mode=WAL")
+        return db
+
+    def publish(self, message: dict):
+        db = self._connect()
+        db.execute(
+            "INSERT INTO broker_messages (id, queue, payload, visible_at) VALUES (?, ?, ?, ?)",
+            (str(uuid.uuid4()), self.queue_name, json.dumps(message), time.time())
+        )
+        db.close()
+
+    def consume(self, timeout: float = 1.0):
+        give_up_at = time.time() + timeout
+        db = self._connect()
+        try:
+            while True:
+                now = time.time()
+                row = db.execute(
+                    """UPDATE broker_messages SET visible_at = ?, attempts = attempts + 1
+                       WHERE id = (SELECT id FROM broker_messages WHERE queue = ? AND visible_at <= ?
+                                   ORDER BY visible_at LIMIT 1)
+                       RETURNING id, payload""",
+                    (now + self.visibility_timeout, self.queue_name, now)
+                ).fetchone()
+                if row is not None:
+                    return row[0], json.loads(row[1])
+                if now >= give_up_at:
+                    return None
+                time.sleep(min(0.2, max(give_up_at - now, 0)))
+        finally:
+            db.close()
+
+    def ack(self, message_id):
+        db = self._connect()
+        db.execute("DELETE FROM broker_messages WHERE id = ?", (message_id,))
+        db.close()
+
+    def depth(self) -> int:
+        db = self._connect()
+        count = db.execute("SELECT COUNT(*) FROM broker_messages WHERE queue = ?", (self.queue_name,)).fetchone()[0]
+        db.close()
+        return count
+
+
+class RedisBroker(Broker):
+    """
+    Reliable-queue pattern on any Redis-compatible server.
+
+    consume moves a message from the queue onto a per-consumer processing
+    list (LMOVE), so a crashed worker's messages can be requeued by
+    requeue_stale; ack removes it from the processing list.
+    """
+
+    def __init__(self, url: str, queue_name: str = BROKER_QUEUE,
+                 visibility_timeout: float = BROKER_VISIBILITY_TIMEOUT_SECONDS):
+        if redis is None:
+            raise RuntimeError("The redis package is required for redis:// brokers")
+        self.client = redis.Redis.from_url(url)
+        self.queue_name = queue_name
+        self.visibility_timeout = visibility_timeout
+        self.consumer = f"{socket.gethostname()}:{os.getpid()}"
+        self.processing = f"{queue_name}:processing:{self.consumer}"
+
+    def publish(self, message: dict):
+        self.client.lpush(self.queue_name, json.dumps({"id": str(uuid.uuid4()), "body": message}))
+
+    def consume(self, timeout: float = 1.0):
+        raw = self.client.blmove(self.queue_name, self.processing, timeout, "RIGHT", "LEFT")
+        if raw is None:
+            return None
+        self.client.hset(f"{self.queue_name}:claimed", raw, time.time())
+        envelope = json.loads(raw)
+        return raw, envelope["body"]
+
+    def ack(self, message_id):
+        pipe = self.client.pipeline()
+        pipe.lrem(self.processing, 1, message_id)
+        pipe.hdel(f"{self.queue_name}:claimed", message_id)
+        pipe.execute()
+
+    def requeue_stale(self) -> int:
+        """Moves messages claimed longer than the visibility timeout back onto the queue."""
+        requeued = 0
+        cutoff = time.time() - self.visibility_timeout
+        for raw, claimed_at in self.client.hgetall(f"{self.queue_name}:claimed").items():
+            if float(claimed_at) > cutoff:
+                continue
+            for key in self.client.scan_iter(f"{self.queue_name}:processing:*"):
+                if self.client.lrem(key, 1, raw):
+                    self.client.rpush(self.queue_name, raw)
+                    requeued += 1
+                    break
+            self.client.hdel(f"{self.queue_name}:claimed", raw)
+        return requeued
+
+    def depth(self) -> int:
+        return self.client.llen(self.queue_name)
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker() -> Broker:
+    """Broker for BROKER_URL: inprocess://, sqlite:///path/to/file or redis://host:port/db."""
+    global _broker
+    with _broker_lock:
+        if _broker is None:
+            if BROKER_URL.startswith("redis://") or BROKER_URL.startswith("rediss://"):
+                _broker = RedisBroker(BROKER_URL)
+            elif BROKER_URL.startswith("sqlite:///"):
+                _broker = SqliteBroker(BROKER_URL[len("sqlite:///"):])
+            else:
+                _broker = InProcessBroker()
+        return _broker
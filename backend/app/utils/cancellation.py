@@ -0,0 +1,78 @@
+import threading
+import time
+from app.utils.config import CANCEL_POLL_SECONDS
+from app.utils.database import get_db_connection
+from app.utils.metrics import register, Counter
+
+JOBS_CANCELLED = register(Counter("review_jobs_cancelled_total", "Jobs cancelled through the API."))
+CALLS_ABANDONED = register(Counter("review_llm_calls_abandoned_total", "LLM calls abandoned because their job was cancelled.", ["section"]))
+
+
+class JobCancelled(BaseException):
+    """
+    Raised inside a cancelled job's graph run.
+
+    A BaseException, like KeyboardInterrupt, so the analyzers' `except
+    Exception` blocks do not turn it into report text.
+    """
+
+    def __init__(self, job_id):
+        super().__init__(f"Job {job_id} was cancelled")
+        self.job_id = job_id
+
+
+class CancellationRegistry:
+    """
+    Which jobs have been cancelled, as seen from this process.
+
+    The API process marks the job row "cancelled" and calls cancel(). Worker
+    processes never see that call, so for jobs not cancelled locally the row
+    is re-read at most every CANCEL_POLL_SECONDS.
+    """
+
+    def __init__(self, poll_seconds: float = CANCEL_POLL_SECONDS):
+        self.poll_seconds = poll_seconds
+        self._cancelled = set()
+        self._checked = {}  # job_id -> monotonic time of the last row read
+        self._lock = threading.Lock()
+
+    def cancel(self, job_id: str):
+        with self._lock:
+            self._cancelled.add(job_id)
+
+    def is_cancelled(self, job_id) -> bool:
+        if job_id is None:
+            return False
+        now = time.monotonic()
+        with self._lock:
+            if job_id in self._cancelled:
+                return True
+            if now - self._checked.get(job_id, float("-inf")) < self.poll_seconds:
+                return False
+            self._checked[job_id] = now
+        try:
+            db,conn = get_db_connection()
+            conn.execute("select status from job where job_id = ?", (job_id,))
+            row = conn.fetchone()
+            conn.close()
+        except Exception:
+            # a locked DB just delays noticing the cancellation
+            return False
+        if row is not None and row[0] == "cancelled":
+            self.cancel(job_id)
+            return True
+        return False
+
+    def check(self, job_id):
+        """Raises JobCancelled if the job has been cancelled."""
+        if self.is_cancelled(job_id):
+            raise JobCancelled(job_id)
+
+    def forget(self, job_id):
+        """Drops the job once nothing of it is running in this process."""
+        with self._lock:
+            self._cancelled.discard(job_id)
+            self._checked.pop(job_id, None)
+
+
+cancellations = CancellationRegistry()
@@ -0,0 +1,283 @@
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+from app.utils.config import (
+    JOB_RETENTION_DAYS,
+    JOB_RETENTION_PER_USER,
+    COMPACT_INTERVAL_SECONDS,
+    COMPACT_BATCH_SIZE,
+    ORPHAN_GRACE_SECONDS,
+    VACUUM_PAGES_PER_PASS,
+    JOB_STALE_SECONDS,
+    CHECKPOINT_DB_PATH,
+    UPLOAD_SPOOL_DIR,
+)
+from app.utils.database import get_db_connection
+from app.utils.storage import get_storage
+from app.utils.models import check_username
+from app.utils.metrics import register, Counter
+from app.utils.notifier import notify_job
+from app.analyzer_logic.errors import ABANDONED
+
+JOBS_EXPIRED = register(Counter("review_jobs_expired_total", "Finished jobs deleted by a retention policy.", ["policy"]))
+BLOBS_DELETED = register(Counter("review_orphan_blobs_deleted_total", "Stored blobs deleted because no job refers to them.", ["kind"]))
+JOBS_ABANDONED = register(Counter("review_jobs_abandoned_total", "Queued or processing jobs failed because no node finished them."))
+DB_PAGES_VACUUMED = register(Counter("review_db_pages_vacuumed_total", "Free database pages returned to the filesystem."))
+
+FINISHED_STATUSES = ("completed", "partial", "failed", "cancelled")
+
+# the only blob names the pipeline writes: job ids, reports, and LocalStorage's mkstemp partials
+_UUID = r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}"
+_REPORT_NAME = re.compile(_UUID + r"\.md")
+_CODE_NAME = re.compile(_UUID)
+_PARTIAL_NAME = re.compile(r"\.tmp-[a-z0-9_]{8}")
+# app.utils.uploads.spool_upload's mkstemp names
+_SPOOL_NAME = re.compile(r"upload-[a-z0-9_]{8}\.code")
+
+# jobs with token usage since midnight UTC still count against the daily quota
+_NOT_BILLED_TODAY = "NOT EXISTS (SELECT 1 FROM job_metrics m WHERE m.job_id = job.job_id AND m.created_at >= date('now'))"
+
+
+class JobCompactor:
+    """
+    Keeps the job table, job_metrics and report storage bounded.
+
+    Each pass fails jobs abandoned by a dead node, deletes expired jobs with
+    their reports, metrics rows and leftover checkpoints, then blobs no job
+    refers to and upload spool files left by dead nodes, then returns free
+    pages of the database to the filesystem. Jobs still counting against
+    today's quota are kept whatever the policies say.
+    """
+
+    def __init__(self, max_age_days: float = JOB_RETENTION_DAYS, per_user: int = JOB_RETENTION_PER_USER,
+                 orphan_grace_seconds: float = ORPHAN_GRACE_SECONDS, batch_size: int = COMPACT_BATCH_SIZE,
+                 vacuum_pages: int = VACUUM_PAGES_PER_PASS, stale_seconds: float = JOB_STALE_SECONDS,
+                 spool_dir: str = UPLOAD_SPOOL_DIR):
+        self.max_age_days = max_age_days
+        self.stale_seconds = stale_seconds
+        self.per_user = per_user
+        self.orphan_grace_seconds = orphan_grace_seconds
+        self.batch_size = batch_size
+        self.vacuum_pages = vacuum_pages
+        self.spool_dir = spool_dir
+        self.last_run = None
+        self._thread = None
+        self._stop = threading.Event()
+
+    def fail_stale_jobs(self) -> int:
+        """
+        Fails jobs still queued or processing stale_seconds after submission.
+        Their node died without recording an outcome, so pollers would
+        otherwise wait on them forever.
+        """
+        if self.stale_seconds <= 0:
+            return 0
+        cutoff = (datetime.now() - timedelta(seconds=self.stale_seconds)).isoformat()
+        error = f"No worker finished this job within {self.stale_seconds:.0f} seconds"
+        db,conn = get_db_connection()
+        conn.execute("SELECT job_id, callback_url FROM job WHERE status IN ('queued', 'processing') AND created_at < ?", (cutoff,))
+        stale = conn.fetchall()
+        failed = []
+        for job_id, callback_url in stale:
+            conn.execute("UPDATE job SET status= 'failed',error_code= ?,error= ? WHERE job_id = ? AND status IN ('queued', 'processing')",
+                         (ABANDONED, error, job_id))
+            if conn.rowcount:
+                failed.append((job_id, callback_url))
+        db.commit()
+        conn.close()
+        JOBS_ABANDONED.inc(len(failed))
+        for job_id, callback_url in failed:
+            notify_job(callback_url, job_id, "failed", ABANDONED, error)
+        return len(failed)
+
+    def expired_jobs(self) -> list:
+        """(job_id, status, report path, policy) for every finished job a policy expires."""
+        finished = ",".join("?" * len(FINISHED_STATUSES))
+        expired = {}
+        db,conn = get_db_connection()
+        if self.per_user > 0:
+            conn.execute(f"""SELECT job_id, status, path FROM (
+                                 SELECT job_id, status, path, ROW_NUMBER() OVER (
+                                     PARTITION BY username ORDER BY created_at DESC) AS newest
+                                 FROM job WHERE status IN ({finished}) AND {_NOT_BILLED_TODAY})
+                             WHERE newest > ?""", (*FINISHED_STATUSES, self.per_user))
+            for job_id, status, path in conn.fetchall():
+                expired[job_id] = (job_id, status, path, "per_user")
+        if self.max_age_days > 0:
+            cutoff = (datetime.now() - timedelta(days=self.max_age_days)).isoformat()
+            conn.execute(f"""SELECT job_id, status, path FROM job
+                             WHERE status IN ({finished}) AND created_at < ? AND {_NOT_BILLED_TODAY}""",
+                         (*FINISHED_STATUSES, cutoff))
+            for job_id, status, path in conn.fetchall():
+                expired[job_id] = (job_id, status, path, "age")
+        conn.close()
+        return list(expired.values())
+
+    def delete_jobs(self, jobs: list) -> int:
+        """Deletes the jobs' reports, then their rows, a batch per transaction so writers are not held up."""
+        storage = get_storage()
+        deleted = 0
+        for start in range(0, len(jobs), self.batch_size):
+            batch = jobs[start:start + self.batch_size]
+            # reports first: a pass that dies midway leaves rows that the next pass expires again
+            for _, _, path, _ in batch:
+                if path:
+                    storage.delete(path)
+            job_ids = [job[0] for job in batch]
+            marks = ",".join("?" * len(job_ids))
+            db,conn = get_db_connection()
+            conn.execute(f"DELETE FROM job_metrics WHERE job_id IN ({marks})", job_ids)
+            conn.execute(f"DELETE FROM job WHERE job_id IN ({marks})", job_ids)
+            deleted += conn.rowcount
+            db.commit()
+            conn.close()
+            for _, _, _, policy in batch:
+                JOBS_EXPIRED.inc(policy=policy)
+            # completed jobs drop their checkpoints when their report is stored
+            self._discard_checkpoints([job_id for job_id, status, _, _ in batch if status != "completed"])
+        return deleted
+
+    def _discard_checkpoints(self, job_ids: list):
+        if not job_ids or not CHECKPOINT_DB_PATH or not os.path.exists(CHECKPOINT_DB_PATH):
+            return
+        try:
+            from langgraph.checkpoint.sqlite import SqliteSaver
+        except ImportError:  # optional: without it no checkpoints were written
+            return
+        checkpoints = sqlite3.connect(CHECKPOINT_DB_PATH, check_same_thread=False)
+        try:
+            saver = SqliteSaver(checkpoints)
+            for job_id in job_ids:
+                saver.delete_thread(job_id)
+        finally:
+            checkpoints.close()
+
+    def delete_orphans(self) -> dict:
+        """
+        Deletes reports of jobs that no longer exist, queued code of jobs no
+        longer waiting for it, and partial writes left by crashed nodes.
+        Blobs younger than orphan_grace_seconds are left alone, since their
+        job row may not be visible yet.
+
+        Only "<user>/" prefixes of valid usernames and "code/" are swept, and
+        only blobs directly under them named like the pipeline's own
+        (<job_id>.md, <job_id>, .tmp-*); anything else sharing the storage
+        root is never touched.
+        """
+        db,conn = get_db_connection()
+        conn.execute("SELECT job_id, status FROM job")
+        statuses = dict(conn.fetchall())
+        conn.execute("SELECT username FROM users UNION SELECT DISTINCT username FROM job")
+        usernames = [row[0] for row in conn.fetchall()]
+        conn.close()
+
+        storage = get_storage()
+        deleted = {"report": 0, "code": 0, "partial": 0}
+
+        def sweep(prefix: str, orphaned):
+            try:
+                # lazily: a large prefix is never held in memory
+                for key, age in storage.scan(prefix):
+                    name = key[len(prefix):]
+                    if age < self.orphan_grace_seconds or not key.startswith(prefix) or "/" in name:
+                        continue
+                    kind = "partial" if _PARTIAL_NAME.fullmatch(name) else orphaned(name)
+                    if kind:
+                        storage.delete(key)
+                        deleted[kind] += 1
+                        BLOBS_DELETED.inc(kind=kind)
+            except ValueError:
+                # a prefix that resolves outside the storage root has nothing of ours
+                pass
+
+        for username in usernames:
+            try:
+                check_username(username)
+            except ValueError:
+                # rows from before usernames were validated; their reports were migrated or dropped
+                continue
+            sweep(f"{username}/", lambda name: "report" if _REPORT_NAME.fullmatch(name) and name[:-3] not in statuses else None)
+        sweep("code/", lambda name: "code" if _CODE_NAME.fullmatch(name) and statuses.get(name) not in ("queued", "processing") else None)
+        return deleted
+
+    def delete_spooled_uploads(self) -> int:
+        """
+        Deletes upload spool files older than stale_seconds. A node killed
+        with uploads still queued leaves them behind; by then fail_stale_jobs
+        has failed their jobs, so nothing will read them.
+        """
+        if self.stale_seconds <= 0 or not os.path.isdir(self.spool_dir):
+            return 0
+        cutoff = time.time() - self.stale_seconds
+        deleted = 0
+        with os.scandir(self.spool_dir) as entries:
+            for entry in entries:
+                if not _SPOOL_NAME.fullmatch(entry.name):
+                    continue
+                try:
+                    if entry.is_file(follow_symlinks=False) and entry.stat(follow_symlinks=False).st_mtime < cutoff:
+                        os.remove(entry.path)
+                        deleted += 1
+                except FileNotFoundError:
+                    # its job read it meanwhile
+                    continue
+        BLOBS_DELETED.inc(deleted, kind="spool")
+        return deleted
+
+    def vacuum(self) -> int:
+        """Returns up to vacuum_pages free pages to the filesystem; returns how many were freed."""
+        db,conn = get_db_connection()
+        try:
+            free = db.execute("PRAGMA freelist_count").fetchone()[0]
+            if not free:
+                return 0
+            if db.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+                # databases created before incremental mode switch over with one full VACUUM
+                db.execute("PRAGMA auto_vacuum = INCREMENTAL")
+                db.execute("VACUUM")
+            else:
+                # executescript steps the pragma to completion; execute frees a single page
+                db.executescript(f"PRAGMA incremental_vacuum({int(self.vacuum_pages)});")
+            freed = free - db.execute("PRAGMA freelist_count").fetchone()[0]
+        finally:
+            conn.close()
+            db.close()
+        DB_PAGES_VACUUMED.inc(freed)
+        return freed
+
+    def run_once(self) -> dict:
+        started = time.monotonic()
+        report = {"jobs_abandoned": self.fail_stale_jobs()}
+        report["jobs_deleted"] = self.delete_jobs(self.expired_jobs())
+        report["orphans_deleted"] = self.delete_orphans()
+        report["spool_files_deleted"] = self.delete_spooled_uploads()
+        report["pages_vacuumed"] = self.vacuum()
+        report["seconds"] = round(time.monotonic() - started, 3)
+        report["finished_at"] = time.time()
+        self.last_run = report
+        return report
+
+    def _loop(self, interval: float):
+        while not self._stop.wait(interval):
+            try:
+                self.run_once()
+            except Exception:
+                # a locked DB or an unreachable store just delays compaction to the next tick
+                pass
+
+    def start(self, interval: float = COMPACT_INTERVAL_SECONDS):
+        if self._thread is not None or interval <= 0:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, args=(interval,), daemon=True, name="job-compactor")
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread = None
+
+
+compactor = JobCompactor()
@@ -0,0 +1,213 @@
+import os
+from dotenv import load_dotenv
+
+load_dotenv(".env")
+
+# Deadlines (seconds). A node gives up waiting at NODE_TIMEOUT_SECONDS or at the
+# job deadline, whichever comes first; late sections are merged into the stored
+# report for up to LATE_SECTION_TIMEOUT_SECONDS after the job returns.
+NODE_TIMEOUT_SECONDS = float(os.getenv("NODE_TIMEOUT_SECONDS", "120"))
+JOB_TIMEOUT_SECONDS = float(os.getenv("JOB_TIMEOUT_SECONDS", "180"))
+LATE_SECTION_TIMEOUT_SECONDS = float(os.getenv("LATE_SECTION_TIMEOUT_SECONDS", "900"))
+
+# Bedrock client. LLM_PROVIDER=fake swaps in the offline stand-in model
+# (app/utils/fake_llm.py) for benchmarks and local runs.
+LLM_PROVIDER = os.getenv("LLM_PROVIDER", "bedrock")
+FAKE_LLM_LATENCY = os.getenv("FAKE_LLM_LATENCY", "lognormal:2.0:0.5")
+FAKE_LLM_OUTPUT_TOKENS = int(os.getenv("FAKE_LLM_OUTPUT_TOKENS", "400"))
+FAKE_LLM_ERROR_RATE = float(os.getenv("FAKE_LLM_ERROR_RATE", "0"))
+# provider error code of injected failures, e.g. ValidationException
+FAKE_LLM_ERROR_CODE = os.getenv("FAKE_LLM_ERROR_CODE", "ThrottlingException")
+AWS_REGION = os.getenv("AWS_REGION", "us-east-1")
+LLM_CONNECT_TIMEOUT_SECONDS = float(os.getenv("LLM_CONNECT_TIMEOUT_SECONDS", "10"))
+LLM_READ_TIMEOUT_SECONDS = float(os.getenv("LLM_READ_TIMEOUT_SECONDS", "600"))
+LLM_POOL_SIZE = int(os.getenv("LLM_POOL_SIZE", "32"))
+# Calls failing with a retryable error (throttled, timed out, unavailable; see
+# app/analyzer_logic/errors.py) are retried up to LLM_RETRY_ATTEMPTS times
+# after a random wait of up to LLM_RETRY_BACKOFF_SECONDS * 2**attempt.
+LLM_RETRY_ATTEMPTS = int(os.getenv("LLM_RETRY_ATTEMPTS", "2"))
+LLM_RETRY_BACKOFF_SECONDS = float(os.getenv("LLM_RETRY_BACKOFF_SECONDS", "1"))
+DB_PATH = os.getenv("DB_PATH", "db.sqlite")
+# Graph checkpoints per job_id, so a retried job resumes finished branches; "" disables
+CHECKPOINT_DB_PATH = os.getenv("CHECKPOINT_DB_PATH", "checkpoints.sqlite")
+
+# Request hedging: once a call outlives HEDGE_PERCENTILE of recent latency, a
+# duplicate is raced against it, within HEDGE_MAX_EXTRA_COST_PCT extra spend.
+HEDGE_ENABLED = os.getenv("HEDGE_ENABLED", "false").lower() == "true"
+HEDGE_PERCENTILE = float(os.getenv("HEDGE_PERCENTILE", "95"))
+HEDGE_MIN_SAMPLES = int(os.getenv("HEDGE_MIN_SAMPLES", "20"))
+HEDGE_MAX_EXTRA_COST_PCT = float(os.getenv("HEDGE_MAX_EXTRA_COST_PCT", "10"))
+HEDGE_BUDGET_WINDOW_SECONDS = float(os.getenv("HEDGE_BUDGET_WINDOW_SECONDS", "600"))
+
+# Price per 1k tokens (USD) used for cost estimates in job_metrics and /metrics
+LLM_INPUT_COST_PER_1K = float(os.getenv("LLM_INPUT_COST_PER_1K", "0.0025"))
+LLM_OUTPUT_COST_PER_1K = float(os.getenv("LLM_OUTPUT_COST_PER_1K", "0.0125"))
+
+# Model routing. LLM_ROUTING=adaptive picks a model tier and output cap per
+# analyzer and code size class (see app/analyzer_logic/routing.py);
+# LLM_ROUTING=fixed sends every call to the premier tier with a 32000 cap.
+# LLM_ROUTES_FILE may point at a JSON file overriding routes per section.
+LLM_ROUTING = os.getenv("LLM_ROUTING", "adaptive")
+LLM_MODEL_TIERS = {
+    "premier": os.getenv("LLM_MODEL_PREMIER", "us.amazon.nova-premier-v1:0"),
+    "standard": os.getenv("LLM_MODEL_STANDARD", "us.amazon.nova-pro-v1:0"),
+    "fast": os.getenv("LLM_MODEL_FAST", "us.amazon.nova-lite-v1:0"),
+}
+LLM_ROUTES_FILE = os.getenv("LLM_ROUTES_FILE", "")
+LLM_SMALL_CODE_CHARS = int(os.getenv("LLM_SMALL_CODE_CHARS", "4000"))
+LLM_LARGE_CODE_CHARS = int(os.getenv("LLM_LARGE_CODE_CHARS", "40000"))
+# (input, output) USD per 1k tokens by model id; others use LLM_*_COST_PER_1K
+LLM_MODEL_PRICES = {
+    "us.amazon.nova-premier-v1:0": (0.0025, 0.0125),
+    "us.amazon.nova-pro-v1:0": (0.0008, 0.0032),
+    "us.amazon.nova-lite-v1:0": (0.00006, 0.00024),
+}
+
+# Output budgets. Each call's max tokens is BASE + PER_UNIT per top-level
+# function/component + PER_KLINE per 1000 code lines (+ PER_FINDING per listed
+# finding for the summary), at least MIN and at most the route's cap. Answers
+# cut off at the budget are continued up to OUTPUT_MAX_CONTINUATIONS times.
+OUTPUT_BUDGET_BASE_TOKENS = int(os.getenv("OUTPUT_BUDGET_BASE_TOKENS", "600"))
+OUTPUT_BUDGET_PER_UNIT_TOKENS = int(os.getenv("OUTPUT_BUDGET_PER_UNIT_TOKENS", "80"))
+OUTPUT_BUDGET_PER_KLINE_TOKENS = int(os.getenv("OUTPUT_BUDGET_PER_KLINE_TOKENS", "600"))
+OUTPUT_BUDGET_PER_FINDING_TOKENS = int(os.getenv("OUTPUT_BUDGET_PER_FINDING_TOKENS", "40"))
+OUTPUT_BUDGET_MIN_TOKENS = int(os.getenv("OUTPUT_BUDGET_MIN_TOKENS", "800"))
+OUTPUT_MAX_CONTINUATIONS = int(os.getenv("OUTPUT_MAX_CONTINUATIONS", "1"))
+# Estimated tokens of section text generate_report reads; longer sections are summarized first
+SUMMARY_INPUT_TOKEN_BUDGET = int(os.getenv("SUMMARY_INPUT_TOKEN_BUDGET", "12000"))
+
+# Loading the analyzer stack (LangGraph, Bedrock client, compiled graph) takes
+# seconds, so importing the API does not do it. ANALYZER_WARMUP=background
+# loads it on a thread at startup, startup before serving, lazy on first use.
+ANALYZER_WARMUP = os.getenv("ANALYZER_WARMUP", "background")
+
+# Prompt templates, loaded and validated once at startup. Point PROMPTS_DIR at
+# an edited copy of app/analyzer_logic/prompts to change prompts without a release.
+PROMPTS_DIR = os.getenv("PROMPTS_DIR", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                                    "analyzer_logic", "prompts"))
+
+# Sessions. SESSION_MODE=db stores a row per login; SESSION_MODE=stateless
+# issues HMAC-signed tokens and only records logouts in a denylist.
+SESSION_MODE = os.getenv("SESSION_MODE", "db")
+SESSION_SECRET = os.getenv("SESSION_SECRET", "")
+DENYLIST_REFRESH_SECONDS = float(os.getenv("DENYLIST_REFRESH_SECONDS", "30"))
+SESSION_TTL_DAYS = int(os.getenv("SESSION_TTL_DAYS", "7"))
+SESSION_CACHE_SIZE = int(os.getenv("SESSION_CACHE_SIZE", "10000"))
+SESSION_CACHE_TTL_SECONDS = float(os.getenv("SESSION_CACHE_TTL_SECONDS", "60"))
+SESSION_SWEEP_INTERVAL_SECONDS = float(os.getenv("SESSION_SWEEP_INTERVAL_SECONDS", "300"))
+
+# Password hashing (scrypt on a process pool). Changing the cost parameters
+# makes existing hashes rehash on their next successful login.
+PASSWORD_POOL_SIZE = int(os.getenv("PASSWORD_POOL_SIZE", str(os.cpu_count() or 2)))
+PASSWORD_SCRYPT_N = int(os.getenv("PASSWORD_SCRYPT_N", "16384"))
+PASSWORD_SCRYPT_R = int(os.getenv("PASSWORD_SCRYPT_R", "8"))
+PASSWORD_SCRYPT_P = int(os.getenv("PASSWORD_SCRYPT_P", "1"))
+
+# Review job scheduling. Jobs are fair-queued per (username, priority) with
+# shares proportional to the class weight; DAILY_TOKEN_QUOTA=0 disables quotas.
+SCHEDULER_WORKERS = int(os.getenv("SCHEDULER_WORKERS", "4"))
+SCHEDULER_PER_USER_CONCURRENCY = int(os.getenv("SCHEDULER_PER_USER_CONCURRENCY", "2"))
+SCHEDULER_CLASS_WEIGHTS = {
+    "interactive": float(os.getenv("SCHEDULER_INTERACTIVE_WEIGHT", "4")),
+    "batch": float(os.getenv("SCHEDULER_BATCH_WEIGHT", "1")),
+}
+SCHEDULER_DEFAULT_JOB_SECONDS = float(os.getenv("SCHEDULER_DEFAULT_JOB_SECONDS", "60"))
+DAILY_TOKEN_QUOTA = int(os.getenv("DAILY_TOKEN_QUOTA", "0"))
+
+# Near-duplicate reuse: a submission whose MinHash similarity to a reviewed
+# one reaches NEAR_DUP_THRESHOLD, and whose functions/components are all
+# unchanged, reuses its analyzer sections (never the security report). Scoped
+# by FINDINGS_ISOLATION like the findings index below. 0 entries disables.
+# Fingerprinting runs on the job thread, about 0.2s of CPU per 64 KB.
+NEAR_DUP_CACHE_SIZE = int(os.getenv("NEAR_DUP_CACHE_SIZE", "1000"))
+NEAR_DUP_THRESHOLD = float(os.getenv("NEAR_DUP_THRESHOLD", "0.9"))
+NEAR_DUP_MAX_BYTES = int(os.getenv("NEAR_DUP_MAX_BYTES", str(64 * 1024)))
+
+# Per-function/component findings index (never the security report).
+# FINDINGS_ISOLATION=user keeps each user's findings to themselves, tenant
+# shares them across all users (findings quote identifier names from the
+# code they came from), off disables the index.
+FINDINGS_ISOLATION = os.getenv("FINDINGS_ISOLATION", "user")
+FINDINGS_MIN_UNIT_LINES = int(os.getenv("FINDINGS_MIN_UNIT_LINES", "4"))
+FINDINGS_MAX_AGE_DAYS = float(os.getenv("FINDINGS_MAX_AGE_DAYS", "30"))
+FINDINGS_MAX_ROWS = int(os.getenv("FINDINGS_MAX_ROWS", "200000"))
+FINDINGS_EVICT_EVERY = int(os.getenv("FINDINGS_EVICT_EVERY", "500"))
+
+# Rendered/compressed report bodies kept in memory by GET /api/file/report
+REPORT_CACHE_BYTES = int(os.getenv("REPORT_CACHE_BYTES", str(64 * 1024 * 1024)))
+
+# Input limits. MAX_CODE_BYTES bounds a submission; MAX_REQUEST_BYTES is
+# enforced on Content-Length for every request before the body is read.
+MAX_CODE_BYTES = int(os.getenv("MAX_CODE_BYTES", str(2 * 1024 * 1024)))
+MAX_REQUEST_BYTES = int(os.getenv("MAX_REQUEST_BYTES", str(3 * 1024 * 1024)))
+UPLOAD_SPOOL_DIR = os.getenv("UPLOAD_SPOOL_DIR", os.path.join(os.getcwd(), "uploads"))
+
+# Deployment. JOB_DISPATCH=local runs reviews on the API process's scheduler;
+# JOB_DISPATCH=broker publishes them to BROKER_URL for separate worker
+# processes (python -m app.worker). Reports and queued code are kept in
+# STORAGE_URL, which every API node and worker must share in broker mode.
+JOB_DISPATCH = os.getenv("JOB_DISPATCH", "local")
+BROKER_URL = os.getenv("BROKER_URL", "sqlite:///" + os.path.join(os.getcwd(), "broker.sqlite"))
+BROKER_QUEUE = os.getenv("BROKER_QUEUE", "review_jobs")
+BROKER_VISIBILITY_TIMEOUT_SECONDS = float(os.getenv("BROKER_VISIBILITY_TIMEOUT_SECONDS", "900"))
+BROKER_PREFETCH = int(os.getenv("BROKER_PREFETCH", "0")) or SCHEDULER_WORKERS * 2
+STORAGE_URL = os.getenv("STORAGE_URL", os.getcwd())
+
+# Worker processes. WORKER_PROCESSES>0 makes the API start that many
+# app.worker processes under a supervisor (python -m app.supervisor runs the
+# same pool standalone); needs JOB_DISPATCH=broker with a sqlite or redis broker,
+# and the API refuses to start without it.
+WORKER_PROCESSES = int(os.getenv("WORKER_PROCESSES", "0"))
+WORKER_DRAIN_TIMEOUT_SECONDS = float(os.getenv("WORKER_DRAIN_TIMEOUT_SECONDS", str(JOB_TIMEOUT_SECONDS + 30)))
+WORKER_HEARTBEAT_SECONDS = float(os.getenv("WORKER_HEARTBEAT_SECONDS", "10"))
+
+# Bulk reviews (python -m app.bulk_review) go through batch inference instead
+# of interactive calls. BATCH_URL is an HTTP batching endpoint
+# (app/utils/fake_batch_server.py is a local stand-in) or "bedrock" for
+# Bedrock batch inference jobs staged in BATCH_S3_URI and run as BATCH_ROLE_ARN.
+BATCH_URL = os.getenv("BATCH_URL", "http://127.0.0.1:8765")
+BATCH_S3_URI = os.getenv("BATCH_S3_URI", "")
+BATCH_ROLE_ARN = os.getenv("BATCH_ROLE_ARN", "")
+BATCH_MAX_RECORDS = int(os.getenv("BATCH_MAX_RECORDS", "10000"))
+BATCH_POLL_SECONDS = float(os.getenv("BATCH_POLL_SECONDS", "30"))
+BATCH_TIMEOUT_SECONDS = float(os.getenv("BATCH_TIMEOUT_SECONDS", str(24 * 3600)))
+
+# Job lifecycle. Workers notice a cancelled job within CANCEL_POLL_SECONDS.
+# A compactor on each API node runs every COMPACT_INTERVAL_SECONDS: it
+# deletes finished jobs older than JOB_RETENTION_DAYS and each user's finished
+# jobs beyond their newest JOB_RETENTION_PER_USER, with their reports and
+# metrics; deletes stored reports and code no job refers to once they are
+# ORPHAN_GRACE_SECONDS old; fails jobs still queued or processing
+# JOB_STALE_SECONDS after submission, whose node must have died, and deletes
+# upload spool files of that age from UPLOAD_SPOOL_DIR; and returns up
+# to VACUUM_PAGES_PER_PASS free pages of the database to the filesystem.
+# 0 disables a policy or the compactor.
+CANCEL_POLL_SECONDS = float(os.getenv("CANCEL_POLL_SECONDS", "2"))
+JOB_RETENTION_DAYS = float(os.getenv("JOB_RETENTION_DAYS", "30"))
+JOB_RETENTION_PER_USER = int(os.getenv("JOB_RETENTION_PER_USER", "1000"))
+COMPACT_INTERVAL_SECONDS = float(os.getenv("COMPACT_INTERVAL_SECONDS", "3600"))
+COMPACT_BATCH_SIZE = int(os.getenv("COMPACT_BATCH_SIZE", "500"))
+ORPHAN_GRACE_SECONDS = float(os.getenv("ORPHAN_GRACE_SECONDS", "3600"))
+JOB_STALE_SECONDS = float(os.getenv("JOB_STALE_SECONDS", str(24 * 3600)))
+VACUUM_PAGES_PER_PASS = int(os.getenv("VACUUM_PAGES_PER_PASS", "10000"))
+
+# Job notifications. A job submitted with a callback_url gets a JSON POST there
+# when it finishes, fails or is cancelled. With WEBHOOK_SECRET set, each POST
+# carries X-Review-Signature: sha256=HMAC(secret, "<X-Review-Timestamp>.<body>").
+# Deliveries wait in a queue of at most WEBHOOK_QUEUE_SIZE (new ones are
+# dropped when it is full), go out on WEBHOOK_WORKERS threads over at most
+# WEBHOOK_POOL_PER_HOST keep-alive connections per host, and are retried on
+# connection errors, 429 and 5xx up to WEBHOOK_MAX_ATTEMPTS times, waiting
+# about WEBHOOK_BACKOFF_SECONDS * 2**attempt. Callback hosts must resolve to
+# public addresses only, checked on submit and again on every connect.
+# WEBHOOK_ALLOWED_HOSTS (comma-separated), when set, limits callbacks to those
+# hosts, which may then also be private (an internal CI server, say).
+WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET", "")
+WEBHOOK_QUEUE_SIZE = int(os.getenv("WEBHOOK_QUEUE_SIZE", "10000"))
+WEBHOOK_WORKERS = int(os.getenv("WEBHOOK_WORKERS", "4"))
+WEBHOOK_POOL_PER_HOST = int(os.getenv("WEBHOOK_POOL_PER_HOST", "4"))
+WEBHOOK_MAX_ATTEMPTS = int(os.getenv("WEBHOOK_MAX_ATTEMPTS", "6"))
+WEBHOOK_BACKOFF_SECONDS = float(os.getenv("WEBHOOK_BACKOFF_SECONDS", "1"))
+WEBHOOK_TIMEOUT_SECONDS = float(os.getenv("WEBHOOK_TIMEOUT_SECONDS", "10"))
+WEBHOOK_DRAIN_SECONDS = float(os.getenv("WEBHOOK_DRAIN_SECONDS", "10"))
+WEBHOOK_ALLOWED_HOSTS = [host.strip() for host in os.getenv("WEBHOOK_ALLOWED_HOSTS", "").split(",") if host.strip()]
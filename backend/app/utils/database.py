@@ -1,12 +1,46 @@
 import sqlite3
+import time
+from app.utils.config import DB_PATH
+from app.utils.metrics import DB_WAIT_SECONDS, DB_LOCK_ERRORS
+
+def _timed(op: str, fn, *args):
+    """Runs a sqlite call, recording how long it blocked and any lock errors."""
+    start = time.monotonic()
+    try:
+        return fn(*args)
+    except sqlite3.OperationalError as e:
+        if "locked" in str(e):
+            DB_LOCK_ERRORS.inc(op=op)
+        raise
+    finally:
+        DB_WAIT_SECONDS.observe(time.monotonic() - start, op=op)
+
+class TimedCursor(sqlite3.Cursor):
+    def execute(self, *args):
+        return _timed("execute", super().execute, *args)
+
+    def executemany(self, *args):
+        return _timed("execute", super().executemany, *args)
+
+class TimedConnection(sqlite3.Connection):
+    def cursor(self, factory=TimedCursor):
+        return super().cursor(factory)
+
+    def execute(self, *args):
+        return _timed("execute", super().execute, *args)
+
+    def commit(self):
+        return _timed("commit", super().commit)
 
 def get_db_connection():
-    db = sqlite3.connect("db.sqlite")
+    db = sqlite3.connect(DB_PATH, factory=TimedConnection)
     conn = db.cursor()
     return db,conn
 
 def create_db():
     db,conn = get_db_connection()
+    # only takes effect on a new database; app.utils.compactor converts older ones
+    db.execute("PRAGMA auto_vacuum = INCREMENTAL")
     db.execute('''
         CREATE TABLE IF NOT EXISTS users (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -29,6 +63,8 @@ def create_db():
         )
     ''')
     
+    db.execute("CREATE INDEX IF NOT EXISTS idx_sessions_expires_at ON sessions(expires_at)")
+
     db.execute('''
         CREATE TABLE IF NOT EXISTS job (
             job_id TEXT NOT NULL PRIMARY KEY,
@@ -38,9 +74,114 @@ def create_db():
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             result TEXT,
             error TEXT,
+            error_code TEXT,
+            callback_url TEXT,
             FOREIGN KEY (username) REFERENCES users(username)
         )
     ''')
+    # columns added after the table was first released
+    job_columns = {row[1] for row in db.execute("PRAGMA table_info(job)")}
+    for column in ("error_code", "callback_url"):
+        if column not in job_columns:
+            db.execute(f"ALTER TABLE job ADD COLUMN {column} TEXT")
     
+    db.execute('''
+        CREATE TABLE IF NOT EXISTS revoked_tokens (
+            jti TEXT NOT NULL PRIMARY KEY,
+            expires_at REAL NOT NULL
+        )
+    ''')
+
+    db.execute('''
+        CREATE TABLE IF NOT EXISTS job_metrics (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            job_id TEXT NOT NULL,
+            name TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            wall_seconds REAL,
+            queue_seconds REAL,
+            input_tokens INTEGER,
+            output_tokens INTEGER,
+            retries INTEGER,
+            cost_usd REAL,
+            error TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (job_id) REFERENCES job(job_id)
+        )
+    ''')
+    db.execute("CREATE INDEX IF NOT EXISTS idx_job_metrics_job_id ON job_metrics(job_id)")
+
+    # Analyzer findings per normalized function/component, shared across jobs
+    db.execute('''
+        CREATE TABLE IF NOT EXISTS unit_findings (
+            unit_hash TEXT NOT NULL,
+            section TEXT NOT NULL,
+            scope TEXT NOT NULL,
+            findings TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            last_used_at REAL NOT NULL,
+            hits INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (unit_hash, section, scope)
+        )
+    ''')
+    db.execute("CREATE INDEX IF NOT EXISTS idx_unit_findings_last_used ON unit_findings(last_used_at)")
+
+    # One row per review worker process, upserted by its heartbeat
+    db.execute('''
+        CREATE TABLE IF NOT EXISTS worker_health (
+            worker_id TEXT NOT NULL PRIMARY KEY,
+            pid INTEGER NOT NULL,
+            state TEXT NOT NULL,
+            running INTEGER NOT NULL,
+            completed INTEGER NOT NULL,
+            failed INTEGER NOT NULL,
+            peak_rss_bytes INTEGER,
+            started_at REAL NOT NULL,
+            heartbeat_at REAL NOT NULL
+        )
+    ''')
+
     db.commit()
-    conn.close()
\ No newline at end of file
+    migrate_report_paths(db)
+    migrate_sessions(db)
+    conn.close()
+
+def migrate_sessions(db):
+    """
+    Deletes sessions whose user_id is not unambiguously a users.id.
+    Registration used to store the username there; SQLite's INTEGER
+    affinity turns a numeric username into a number that may be another
+    user's id. Those users sign in again.
+    """
+    db.execute("""DELETE FROM sessions WHERE typeof(user_id) != 'integer'
+                  OR user_id NOT IN (SELECT id FROM users)
+                  OR CAST(user_id AS TEXT) IN (SELECT username FROM users WHERE users.id != sessions.user_id)""")
+    db.commit()
+
+def migrate_report_paths(db):
+    """
+    Moves reports of job rows written before storage keys existed, which
+    hold absolute paths, to their "<user>/<job_id>.md" key. Rows whose
+    file is gone or whose username is not a safe path segment lose their
+    path, since storage no longer reads outside its root.
+    """
+    from app.utils.models import check_username
+    from app.utils.storage import get_storage
+
+    rows = db.execute("SELECT job_id, username, path FROM job WHERE path LIKE '/%'").fetchall()
+    if not rows:
+        return
+    storage = get_storage()
+    for job_id, username, path in rows:
+        key = None
+        try:
+            check_username(username)
+            with open(path, "rb") as f:
+                data = f.read()
+            key = f"{username}/{job_id}.md"
+            storage.put(key, data)
+        except (ValueError, OSError):
+            # an unsafe username, or a report that was never written or was deleted
+            key = None
+        db.execute("UPDATE job SET path = ? WHERE job_id = ?", (key, job_id))
+    db.commit()
\ No newline at end of file
@@ -1,8 +1,21 @@
 from langchain_aws import ChatBedrockConverse
 from langgraph.graph.message import MessagesState
-from dotenv import load_dotenv
+from botocore.config import Config
 import boto3
-from typing import Optional
+import operator
+from typing import Annotated, Optional, TypedDict
+from app.utils.config import (
+    LLM_PROVIDER,
+    FAKE_LLM_LATENCY,
+    FAKE_LLM_OUTPUT_TOKENS,
+    FAKE_LLM_ERROR_RATE,
+    FAKE_LLM_ERROR_CODE,
+    AWS_REGION,
+    LLM_CONNECT_TIMEOUT_SECONDS,
+    LLM_READ_TIMEOUT_SECONDS,
+    LLM_POOL_SIZE,
+    LLM_MODEL_TIERS,
+)
 
 class AgentState(MessagesState):
     """Enhanced state to track all analysis results."""
@@ -12,20 +25,60 @@ class AgentState(MessagesState):
     best_practices_report: Optional[str] = None
     complexity_report: Optional[str] = None
     documentation_report: Optional[str] = None
+    react_specific_report: Optional[str] = None
+    accessibility_report: Optional[str] = None
     final_documentation: Optional[str] = None
-    user_code: str
+    code_ref: str
     metadata: Optional[dict] = None
     language: str
-    
-load_dotenv(".env")
+    job_id: Optional[str] = None
+    deadline: Optional[float] = None
+    reused_sections: Optional[dict] = None
+    findings_scope: Optional[str] = None
+    # app.analyzer_logic.errors.node_error entries; parallel branches append
+    errors: Annotated[list, operator.add]
 
-# Initialize Bedrock client
-bedrock_client = boto3.client("bedrock-runtime", region_name="us-east-1")
+class BranchInput(TypedDict):
+    """What a fan-out analyzer receives: a ref to the shared code buffer, not the full state."""
+    code_ref: str
+    language: str
+    job_id: Optional[str]
+    deadline: Optional[float]
+    reused_sections: Optional[dict]
+    findings_scope: Optional[str]
 
-llm = ChatBedrockConverse(
-    model="us.amazon.nova-premier-v1:0",
-    max_tokens=32000,
-    temperature=0.3,  # Lower temperature for more consistent analysis
-    bedrock_client=bedrock_client,
-    region_name="us-east-1"
+if LLM_PROVIDER == "fake":
+    from app.utils.fake_llm import FakeChatModel
+else:
+    # Initialize Bedrock client. Long generations outlast botocore's 60s default
+    # read timeout; per-node and per-job deadlines are enforced in llm_runner.
+    bedrock_client = boto3.client(
+        "bedrock-runtime",
+        region_name=AWS_REGION,
+        config=Config(
+            connect_timeout=LLM_CONNECT_TIMEOUT_SECONDS,
+            read_timeout=LLM_READ_TIMEOUT_SECONDS,
+            max_pool_connections=LLM_POOL_SIZE,
+            retries={"max_attempts": 2, "mode": "adaptive"},
+        ),
     )
+
+def build_llm(model_id: str, max_tokens: int):
+    """A chat model for one route; every Bedrock model shares the one boto3 client."""
+    if LLM_PROVIDER == "fake":
+        return FakeChatModel(
+            latency=FAKE_LLM_LATENCY,
+            output_tokens=min(FAKE_LLM_OUTPUT_TOKENS, max_tokens),
+            error_rate=FAKE_LLM_ERROR_RATE,
+            error_code=FAKE_LLM_ERROR_CODE,
+            model_id=model_id
+        )
+    return ChatBedrockConverse(
+        model=model_id,
+        max_tokens=max_tokens,
+        temperature=0.3,  # Lower temperature for more consistent analysis
+        bedrock_client=bedrock_client,
+        region_name=AWS_REGION
+        )
+
+llm = build_llm(LLM_MODEL_TIERS["premier"], 32000)
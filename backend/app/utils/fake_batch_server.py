@@ -0,0 +1,123 @@
+"""
+Offline stand-in for a batch inference endpoint (see app/utils/batch_client.py).
+
+Answers every record with FakeChatModel after a fixed processing delay, so
+bulk reviews can be run and benchmarked without network access or spend:
+
+    python -m app.utils.fake_batch_server --port 8765 --delay 2
+"""
+import argparse
+import json
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from app.utils.fake_llm import FakeChatModel
+from app.utils.config import FAKE_LLM_OUTPUT_TOKENS, FAKE_LLM_ERROR_RATE
+
+
+class FakeBatchServer:
+    """Holds submitted batches and processes each on a background thread."""
+
+    def __init__(self, delay: float = 0.0, output_tokens: int = FAKE_LLM_OUTPUT_TOKENS,
+                 error_rate: float = FAKE_LLM_ERROR_RATE):
+        self.delay = delay
+        self.output_tokens = output_tokens
+        self.error_rate = error_rate
+        self.batches = {}  # batch id -> {"status", "model_id", "records", "results"}
+        self._lock = threading.Lock()
+
+    def submit(self, model_id: str, records: list) -> str:
+        batch_id = uuid.uuid4().hex
+        with self._lock:
+            self.batches[batch_id] = {"status": "Submitted", "model_id": model_id, "records": records, "results": []}
+        threading.Thread(target=self._process, args=(batch_id,), daemon=True).start()
+        return batch_id
+
+    def _process(self, batch_id: str):
+        batch = self.batches[batch_id]
+        batch["status"] = "InProgress"
+        time.sleep(self.delay)
+        model = FakeChatModel(output_tokens=self.output_tokens, error_rate=self.error_rate, model_id=batch["model_id"])
+        results = []
+        for record in batch["records"]:
+            model_input = record["modelInput"]
+            prompt = "".join(part.get("text", "") for part in model_input["messages"][-1]["content"])
+            max_tokens = model_input.get("inferenceConfig", {}).get("maxTokens")
+            try:
+                message = model.invoke(prompt, maxTokens=max_tokens)
+            except Exception as e:
+                results.append({"recordId": record["recordId"], "error": {"errorCode": 500, "errorMessage": str(e)}})
+                continue
+            results.append({
+                "recordId": record["recordId"],
+                "modelOutput": {
+                    "output": {"message": {"role": "assistant", "content": [{"text": message.content}]}},
+                    "stopReason": message.response_metadata["stopReason"],
+                    "usage": {
+                        "inputTokens": message.usage_metadata["input_tokens"],
+                        "outputTokens": message.usage_metadata["output_tokens"],
+                    },
+                },
+            })
+        batch["results"] = results
+        batch["status"] = "Completed"
+
+    def handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _reply(self, status: int, body: bytes, content_type: str = "application/json"):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                if self.path.rstrip("/") != "/batches":
+                    return self._reply(404, b'{"error": "not found"}')
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                batch_id = server.submit(body["modelId"], body["records"])
+                self._reply(200, json.dumps({"batchId": batch_id, "status": "Submitted"}).encode("utf-8"))
+
+            def do_GET(self):
+                match = re.fullmatch(r"/batches/(\w+)(/results)?", self.path.rstrip("/"))
+                batch = server.batches.get(match.group(1)) if match else None
+                if batch is None:
+                    return self._reply(404, b'{"error": "not found"}')
+                if not match.group(2):
+                    return self._reply(200, json.dumps({"status": batch["status"]}).encode("utf-8"))
+                lines = "".join(json.dumps(result) + "\n" for result in batch["results"])
+                self._reply(200, lines.encode("utf-8"), "application/x-ndjson")
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def serve(self, host: str = "127.0.0.1", port: int = 8765) -> ThreadingHTTPServer:
+        """Starts serving on a daemon thread; port 0 picks a free one (see .server_address)."""
+        httpd = ThreadingHTTPServer((host, port), self.handler())
+        threading.Thread(target=httpd.serve_forever, daemon=True).start()
+        return httpd
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline stand-in batch inference endpoint.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--delay", type=float, default=0.0, help="seconds each batch takes to complete")
+    args = parser.parse_args()
+
+    httpd = FakeBatchServer(delay=args.delay).serve(args.host, args.port)
+    print(f"fake batch server on http://{args.host}:{httpd.server_address[1]}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        httpd.shutdown()
+
+
+if __name__ == "__main__":
+    main()
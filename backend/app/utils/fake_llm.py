@@ -0,0 +1,79 @@
+import math
+import random
+import re
+import time
+from langchain_core.messages import AIMessage
+
+
+def parse_latency(spec: str):
+    """
+    Builds a latency sampler from a spec string:
+
+    fixed:<seconds>, uniform:<low>:<high> or lognormal:<median>:<sigma>
+    """
+    kind, *params = spec.split(":")
+    params = [float(p) for p in params]
+    if kind == "fixed":
+        return lambda: params[0]
+    if kind == "uniform":
+        return lambda: random.uniform(params[0], params[1])
+    if kind == "lognormal":
+        mu = math.log(params[0])
+        return lambda: random.lognormvariate(mu, params[1])
+    raise ValueError(f"Unknown latency spec: {spec}")
+
+
+class FakeProviderError(RuntimeError):
+    """An injected failure, shaped like a botocore ClientError so it classifies like the real one."""
+
+    def __init__(self, code: str):
+        super().__init__(f"Fake LLM injected failure ({code})")
+        self.response = {"Error": {"Code": code, "Message": "Fake LLM injected failure"}}
+
+
+class FakeChatModel:
+    """
+    Offline stand-in for ChatBedrockConverse.
+
+    Sleeps for a sampled latency and returns a canned markdown section with
+    usage metadata shaped like Bedrock's, so the graph, metrics and storage
+    layers can be exercised without network access or spend.
+    """
+
+    def __init__(self, latency: str = "fixed:0", output_tokens: int = 400, error_rate: float = 0.0,
+                 model_id: str = "fake", error_code: str = "ThrottlingException"):
+        self.model_id = model_id
+        self.sample_latency = parse_latency(latency)
+        self.output_tokens = output_tokens
+        self.error_rate = error_rate
+        self.error_code = error_code
+
+    def invoke(self, prompt, **kwargs):
+        time.sleep(self.sample_latency())
+        if self.error_rate and random.random() < self.error_rate:
+            raise FakeProviderError(self.error_code)
+
+        if not isinstance(prompt, str):
+            # message lists (continuations) are answered from the last turn
+            prompt = prompt[-1].content if prompt else ""
+        output_tokens = min(self.output_tokens, kwargs.get("maxTokens") or self.output_tokens)
+        title = str(prompt).splitlines()[0][:80] if prompt else ""
+        # about four characters per token, like the usage estimate below
+        body = " ".join(["bug"] * output_tokens)
+        content = f"## Offline review\n\n_{title}_\n\n{body}\n"
+        # answer the per-unit appendix the findings index asks for
+        units = re.findall(r"^- unit: (\S+)$", str(prompt), re.M)
+        if units:
+            content += "\n## Findings by Unit\n" + "".join(f"\n#### Unit: {name}\n- finding on line 1\n" for name in units)
+        return AIMessage(
+            content=content,
+            usage_metadata={
+                "input_tokens": len(prompt) // 4,
+                "output_tokens": output_tokens,
+                "total_tokens": len(prompt) // 4 + output_tokens,
+            },
+            response_metadata={
+                "stopReason": "max_tokens" if output_tokens < self.output_tokens else "end_turn",
+                "ResponseMetadata": {"RetryAttempts": 0},
+            },
+        )
@@ -0,0 +1,115 @@
+"""
+Local stand-in for a callback_url receiver (see app/utils/notifier.py).
+
+Records every notification it is sent, checks its signature, and can fail the
+first deliveries to exercise retries. Keeps connections alive, so the
+notifier's connection reuse shows up in its connection count. Loopback
+callbacks are refused unless allow-listed, so run the API with
+WEBHOOK_ALLOWED_HOSTS=127.0.0.1:
+
+    python -m app.utils.fake_webhook_receiver --port 8766 --secret s3cret --fail-first 1
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from app.utils.notifier import verify, SIGNATURE_HEADER, TIMESTAMP_HEADER
+
+
+class WebhookReceiver:
+    """Accepts POSTs on any path; the first fail_first deliveries of each id get fail_status."""
+
+    def __init__(self, secret: str = "", fail_first: int = 0, fail_status: int = 503):
+        self.secret = secret
+        self.fail_first = fail_first
+        self.fail_status = fail_status
+        self.deliveries = []  # {"delivery", "event", "payload", "verified", "received_at"}
+        self.attempts = {}  # delivery id -> attempts seen
+        self.connections = 0
+        self._lock = threading.Lock()
+        self._received = threading.Condition(self._lock)
+
+    def receive(self, headers, body: bytes) -> int:
+        delivery_id = headers.get("X-Review-Delivery", "")
+        with self._lock:
+            self.attempts[delivery_id] = self.attempts.get(delivery_id, 0) + 1
+            if self.attempts[delivery_id] <= self.fail_first:
+                return self.fail_status
+            self.deliveries.append({
+                "delivery": delivery_id,
+                "event": headers.get("X-Review-Event"),
+                "payload": json.loads(body),
+                "verified": verify(self.secret, headers.get(TIMESTAMP_HEADER), body, headers.get(SIGNATURE_HEADER))
+                            if self.secret else None,
+                "received_at": time.time(),
+            })
+            self._received.notify_all()
+        return 204
+
+    def wait_for(self, count: int, timeout: float) -> bool:
+        """Waits until count deliveries were accepted; False if time ran out first."""
+        give_up_at = time.monotonic() + timeout
+        with self._received:
+            while len(self.deliveries) < count:
+                remaining = give_up_at - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._received.wait(remaining)
+        return True
+
+    def handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                with server._lock:
+                    server.connections += 1
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                status = server.receive(self.headers, body)
+                self.send_response(status)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def serve(self, host: str = "127.0.0.1", port: int = 8766) -> ThreadingHTTPServer:
+        """Starts serving on a daemon thread; port 0 picks a free one (see .server_address)."""
+        httpd = ThreadingHTTPServer((host, port), self.handler())
+        threading.Thread(target=httpd.serve_forever, daemon=True).start()
+        return httpd
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in webhook receiver.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--secret", default="", help="WEBHOOK_SECRET to verify signatures with")
+    parser.add_argument("--fail-first", type=int, default=0, help="attempts of each delivery to answer with --fail-status")
+    parser.add_argument("--fail-status", type=int, default=503)
+    args = parser.parse_args()
+
+    receiver = WebhookReceiver(args.secret, args.fail_first, args.fail_status)
+    httpd = receiver.serve(args.host, args.port)
+    print(f"webhook receiver on http://{args.host}:{httpd.server_address[1]}")
+    try:
+        while True:
+            time.sleep(1)
+            with receiver._lock:
+                for delivery in receiver.deliveries:
+                    print(json.dumps(delivery))
+                receiver.deliveries.clear()
+    except KeyboardInterrupt:
+        httpd.shutdown()
+
+
+if __name__ == "__main__":
+    main()
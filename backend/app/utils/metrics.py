@@ -0,0 +1,194 @@
+import bisect
+import threading
+import time
+from app.utils.config import LLM_INPUT_COST_PER_1K, LLM_OUTPUT_COST_PER_1K, LLM_MODEL_PRICES
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300)
+DB_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5)
+TOKEN_BUCKETS = (100, 500, 1000, 2000, 4000, 8000, 16000, 32000, 64000, 128000)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _label_str(names, values) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values))
+    return "{" + pairs + "}"
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labels=()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(labels.get(n, "") for n in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_label_str(self.labels, key)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._series = {}  # label values -> [bucket counts, sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(labels.get(n, "") for n in self.labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.setdefault(key, [[0] * len(self.buckets), 0.0, 0])
+            if index < len(self.buckets):
+                series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        bucket_labels = self.labels + ("le",)
+        with self._lock:
+            for key, (counts, total, count) in sorted(self._series.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, counts):
+                    cumulative += bucket_count
+                    lines.append(f"{self.name}_bucket{_label_str(bucket_labels, key + (bound,))} {cumulative}")
+                lines.append(f"{self.name}_bucket{_label_str(bucket_labels, key + ('+Inf',))} {count}")
+                lines.append(f"{self.name}_sum{_label_str(self.labels, key)} {total}")
+                lines.append(f"{self.name}_count{_label_str(self.labels, key)} {count}")
+        return lines
+
+
+REGISTRY = []
+
+
+def register(metric):
+    REGISTRY.append(metric)
+    return metric
+
+
+JOB_QUEUE_SECONDS = register(Histogram("review_job_queue_wait_seconds", "Time from submission until the graph starts."))
+JOB_SECONDS = register(Histogram("review_job_duration_seconds", "Graph run time per job.", ["language"]))
+NODE_SECONDS = register(Histogram("review_node_duration_seconds", "Wall time per graph node.", ["node"]))
+NODE_ERRORS = register(Counter("review_node_errors_total", "Exceptions raised by graph nodes.", ["node", "error"]))
+LLM_SECONDS = register(Histogram("review_llm_call_duration_seconds", "Wall time per LLM call.", ["section"]))
+LLM_QUEUE_SECONDS = register(Histogram("review_llm_queue_wait_seconds", "Time an LLM call waited for a worker thread.", ["section"]))
+LLM_TOKENS = register(Histogram("review_llm_tokens", "Tokens per LLM call.", ["section", "direction"], TOKEN_BUCKETS))
+LLM_RETRIES = register(Counter("review_llm_retries_total", "Provider-side retries reported by botocore.", ["section"]))
+LLM_ERRORS = register(Counter("review_llm_errors_total", "Failed LLM calls.", ["section", "error"]))
+LLM_COST = register(Counter("review_llm_cost_usd_total", "Estimated LLM spend in USD.", ["section"]))
+DB_WAIT_SECONDS = register(Histogram("review_db_wait_seconds", "Time blocked in SQLite statements and commits, including lock waits.", ["op"], DB_BUCKETS))
+DB_LOCK_ERRORS = register(Counter("review_db_lock_errors_total", "SQLite 'database is locked' errors.", ["op"]))
+
+# Callables returning {metric name: value}, rendered as gauges (e.g. hedge stats)
+COLLECTORS = []
+
+# job_id -> rows waiting to be written to job_metrics
+_job_rows = {}
+_job_rows_lock = threading.Lock()
+
+
+def _add_row(job_id, row: tuple):
+    if job_id is None:
+        return
+    with _job_rows_lock:
+        _job_rows.setdefault(job_id, []).append(row)
+
+
+def estimate_cost(input_tokens: int, output_tokens: int, model: str = None) -> float:
+    input_price, output_price = LLM_MODEL_PRICES.get(model, (LLM_INPUT_COST_PER_1K, LLM_OUTPUT_COST_PER_1K))
+    return input_tokens / 1000 * input_price + output_tokens / 1000 * output_price
+
+
+def record_node(job_id, node: str, seconds: float, error: str = None):
+    NODE_SECONDS.observe(seconds, node=node)
+    if error:
+        NODE_ERRORS.inc(node=node, error=error)
+    _add_row(job_id, (job_id, node, "node", seconds, None, None, None, None, None, error))
+
+
+def record_llm_call(job_id, section: str, seconds: float, queue_seconds: float, result=None, error: str = None,
+                    model: str = None):
+    LLM_SECONDS.observe(seconds, section=section)
+    LLM_QUEUE_SECONDS.observe(queue_seconds, section=section)
+    if error:
+        LLM_ERRORS.inc(section=section, error=error)
+        _add_row(job_id, (job_id, section, "llm", seconds, queue_seconds, None, None, None, None, error))
+        return
+
+    usage = getattr(result, "usage_metadata", None) or {}
+    input_tokens = usage.get("input_tokens", 0)
+    output_tokens = usage.get("output_tokens", 0)
+    response_metadata = getattr(result, "response_metadata", None) or {}
+    retries = response_metadata.get("ResponseMetadata", {}).get("RetryAttempts", 0)
+    cost = estimate_cost(input_tokens, output_tokens, model)
+
+    LLM_TOKENS.observe(input_tokens, section=section, direction="input")
+    LLM_TOKENS.observe(output_tokens, section=section, direction="output")
+    if retries:
+        LLM_RETRIES.inc(retries, section=section)
+    LLM_COST.inc(cost, section=section)
+    _add_row(job_id, (job_id, section, "llm", seconds, queue_seconds, input_tokens, output_tokens, retries, cost, None))
+
+
+def save_job_metrics(job_id: str):
+    """Writes the rows recorded for a job to the job_metrics table."""
+    from app.utils.database import get_db_connection
+
+    with _job_rows_lock:
+        rows = _job_rows.pop(job_id, [])
+    if not rows:
+        return
+    db, conn = get_db_connection()
+    conn.executemany(
+        """INSERT INTO job_metrics
+           (job_id, name, kind, wall_seconds, queue_seconds, input_tokens, output_tokens, retries, cost_usd, error)
+           VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+        rows
+    )
+    db.commit()
+    conn.close()
+
+
+def instrument_node(name: str, fn):
+    """Wraps a graph node so its wall time and exceptions are recorded."""
+    def wrapper(state):
+        start = time.monotonic()
+        try:
+            result = fn(state)
+        except Exception as e:
+            record_node(state.get("job_id"), name, time.monotonic() - start, type(e).__name__)
+            raise
+        record_node(state.get("job_id"), name, time.monotonic() - start)
+        return result
+
+    wrapper.__name__ = getattr(fn, "__name__", name)
+    wrapper.__doc__ = fn.__doc__
+    wrapper.__annotations__ = getattr(fn, "__annotations__", {})
+    return wrapper
+
+
+def render_prometheus() -> str:
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    for collect in COLLECTORS:
+        for name, value in collect().items():
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {value}")
+    return "\n".join(lines) + "\n"
@@ -1,13 +1,30 @@
-from pydantic import BaseModel, EmailStr
+import re
+from pydantic import BaseModel, EmailStr, AfterValidator
 from datetime import datetime
-from typing import Optional
+from typing import Optional, Literal, Annotated
+
+# A username is the user's directory in report storage, so it must be one
+# safe path segment; "code" is where queued code is kept.
+USERNAME_PATTERN = re.compile(r"[A-Za-z0-9][A-Za-z0-9_.-]{0,63}")
+RESERVED_USERNAMES = {"code"}
+
+def check_username(username: str) -> str:
+    if not USERNAME_PATTERN.fullmatch(username or "") or username in RESERVED_USERNAMES:
+        raise ValueError("username must be 1-64 letters, digits, '.', '_' or '-', starting with a letter or digit")
+    return username
+
+Username = Annotated[str, AfterValidator(check_username)]
 
 class SubmitInput(BaseModel):
     code : str
-    username : str
+    # jobs belong to the signed-in user; a username here must be theirs
+    username : Optional[Username] = None
+    priority : Literal["interactive", "batch"] = "interactive"
+    # receives a signed POST when the job finishes; see app/utils/notifier.py
+    callback_url : Optional[str] = None
 
 class UserCreate(BaseModel):
-    username: str
+    username: Username
     email: EmailStr
     password: str
 
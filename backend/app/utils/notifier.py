@@ -0,0 +1,337 @@
+import hashlib
+import heapq
+import hmac
+import http.client
+import ipaddress
+import itertools
+import json
+import random
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime
+from urllib.parse import urlsplit
+from app.utils.config import (
+    WEBHOOK_SECRET,
+    WEBHOOK_QUEUE_SIZE,
+    WEBHOOK_WORKERS,
+    WEBHOOK_POOL_PER_HOST,
+    WEBHOOK_MAX_ATTEMPTS,
+    WEBHOOK_BACKOFF_SECONDS,
+    WEBHOOK_TIMEOUT_SECONDS,
+    WEBHOOK_DRAIN_SECONDS,
+    WEBHOOK_ALLOWED_HOSTS,
+)
+from app.utils.metrics import register, Counter, Histogram
+
+WEBHOOK_DELIVERIES = register(Counter("review_webhook_deliveries_total", "Webhook notifications by outcome.", ["result"]))
+WEBHOOK_SECONDS = register(Histogram("review_webhook_delivery_seconds", "Time from job outcome to delivered webhook."))
+
+SIGNATURE_HEADER = "X-Review-Signature"
+TIMESTAMP_HEADER = "X-Review-Timestamp"
+
+
+def sign(secret: str, timestamp: str, body: bytes) -> str:
+    digest = hmac.new(secret.encode("utf-8"), timestamp.encode("ascii") + b"." + body, hashlib.sha256).hexdigest()
+    return "sha256=" + digest
+
+
+def verify(secret: str, timestamp: str, body: bytes, signature: str, tolerance_seconds: float = 300) -> bool:
+    """What a receiver checks: the signature matches and the timestamp is recent, so replays expire."""
+    try:
+        fresh = abs(time.time() - int(timestamp)) <= tolerance_seconds
+    except (TypeError, ValueError):
+        return False
+    return fresh and hmac.compare_digest(sign(secret, timestamp, body), signature or "")
+
+
+def resolve_callback_host(host: str, port: int, allowed_hosts: list = WEBHOOK_ALLOWED_HOSTS) -> list:
+    """
+    Addresses host resolves to. Raises ValueError when the host is not
+    allow-listed (if a list is set) or when any address is not public
+    (loopback, private, link-local such as cloud metadata, reserved), so
+    callbacks cannot be aimed at the server's own network. Allow-listed
+    hosts may resolve anywhere.
+    """
+    if allowed_hosts and host not in allowed_hosts:
+        raise ValueError(f"callback_url host {host} is not allowed")
+    try:
+        infos = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    except OSError:
+        raise ValueError(f"callback_url host {host} does not resolve")
+    addresses = [info[4][0] for info in infos]
+    if host in allowed_hosts:
+        return addresses
+    for address in addresses:
+        ip = ipaddress.ip_address(address.split("%", 1)[0])
+        if isinstance(ip, ipaddress.IPv6Address) and ip.ipv4_mapped:
+            ip = ip.ipv4_mapped
+        if not ip.is_global or ip.is_multicast:
+            raise ValueError(f"callback_url host {host} resolves to non-public address {ip}")
+    return addresses
+
+
+def validate_callback_url(url: str, allowed_hosts: list = WEBHOOK_ALLOWED_HOSTS) -> str:
+    """Raises ValueError unless url is an http(s) URL whose host may be called back (see resolve_callback_host)."""
+    parts = urlsplit(url)
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        raise ValueError("callback_url must be an http or https URL")
+    resolve_callback_host(parts.hostname, port or (443 if parts.scheme == "https" else 80), allowed_hosts)
+    return url
+
+
+def job_event(job_id: str, status: str, error_code: str = None, error: str = None) -> dict:
+    """The notification body for a job that reached a final status."""
+    from app.analyzer_logic.errors import RETRYABLE
+
+    return {
+        "event": f"job.{status}",
+        "job_id": job_id,
+        "status": status,
+        "result": f"/api/file/report/{job_id}" if status in ("completed", "partial") else None,
+        "error_code": error_code,
+        "retryable": error_code in RETRYABLE if error_code else None,
+        "error": error,
+        "finished_at": datetime.now().isoformat(),
+    }
+
+
+class ConnectionPool:
+    """
+    Keep-alive HTTP(S) connections per (scheme, host, port), so a burst of
+    notifications to one CI server reuses a few sockets instead of opening
+    one per delivery.
+
+    Every new connection resolves the host again and connects to an address
+    that passed resolve_callback_host, so a name that resolved to a public
+    address on submit cannot be rebound to an internal one before delivery.
+    TLS still verifies the certificate against the host name.
+    """
+
+    def __init__(self, per_host: int = WEBHOOK_POOL_PER_HOST, timeout: float = WEBHOOK_TIMEOUT_SECONDS,
+                 allowed_hosts: list = WEBHOOK_ALLOWED_HOSTS):
+        self.per_host = per_host
+        self.timeout = timeout
+        self.allowed_hosts = allowed_hosts
+        self.opened = 0
+        self._idle = {}  # (scheme, host, port) -> [connection]
+        self._lock = threading.Lock()
+
+    def _open_socket(self, address, timeout=None, source_address=None):
+        host, port = address
+        checked = resolve_callback_host(host, port, self.allowed_hosts)
+        return socket.create_connection((checked[0], port), timeout, source_address)
+
+    def _connect(self, scheme: str, host: str, port: int):
+        with self._lock:
+            self.opened += 1
+        if scheme == "https":
+            connection = http.client.HTTPSConnection(host, port, timeout=self.timeout)
+        else:
+            connection = http.client.HTTPConnection(host, port, timeout=self.timeout)
+        # http.client opens its socket through this hook; HTTPS wraps it afterwards
+        connection._create_connection = self._open_socket
+        return connection
+
+    def post(self, url: str, body: bytes, headers: dict) -> int:
+        """
+        POSTs body and returns the response status; raises OSError or
+        HTTPException if it never got one, ValueError if the host is refused.
+        """
+        parts = urlsplit(url)
+        key = (parts.scheme, parts.hostname, parts.port or (443 if parts.scheme == "https" else 80))
+        path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        with self._lock:
+            idle = self._idle.get(key)
+            connection = idle.pop() if idle else None
+        reused = connection is not None
+        while True:
+            if connection is None:
+                connection = self._connect(*key)
+            try:
+                connection.request("POST", path, body, headers)
+                response = connection.getresponse()
+                response.read()
+                break
+            except ValueError:
+                connection.close()
+                raise
+            except (OSError, http.client.HTTPException):
+                connection.close()
+                connection = None
+                # the server may have closed an idle connection; one fresh attempt settles it
+                if not reused:
+                    raise
+                reused = False
+
+        if response.will_close:
+            connection.close()
+        else:
+            with self._lock:
+                idle = self._idle.setdefault(key, [])
+                if len(idle) < self.per_host:
+                    idle.append(connection)
+                    connection = None
+            if connection is not None:
+                connection.close()
+        return response.status
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for connections in idle.values():
+            for connection in connections:
+                connection.close()
+
+
+class _Delivery:
+    __slots__ = ("delivery_id", "url", "event", "body", "attempts", "created_at")
+
+    def __init__(self, url: str, event: str, body: bytes):
+        self.delivery_id = uuid.uuid4().hex
+        self.url = url
+        self.event = event
+        self.body = body
+        self.attempts = 0
+        self.created_at = time.monotonic()
+
+
+class WebhookNotifier:
+    """
+    Delivers job notifications to callback URLs without holding up the job.
+
+    notify() only enqueues; WEBHOOK_WORKERS threads, started on first use,
+    POST the queued bodies. Failed attempts (connection errors, 429, 5xx)
+    go back on the queue due after a jittered exponential backoff, so a slow
+    receiver delays only its own retries. Other 4xx answers are final.
+    The queue is bounded: when it is full new notifications are dropped and
+    counted, and pollers still see the outcome on the job row.
+    """
+
+    def __init__(self, secret: str = WEBHOOK_SECRET, queue_size: int = WEBHOOK_QUEUE_SIZE,
+                 workers: int = WEBHOOK_WORKERS, max_attempts: int = WEBHOOK_MAX_ATTEMPTS,
+                 backoff_seconds: float = WEBHOOK_BACKOFF_SECONDS, pool: ConnectionPool = None):
+        self.secret = secret
+        self.queue_size = queue_size
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+        self.pool = pool or ConnectionPool()
+        self._queue = []  # heap of (due monotonic time, seq, _Delivery)
+        self._seq = itertools.count()
+        self._in_flight = 0
+        self._cond = threading.Condition()
+        self._threads = []
+        self._stopping = False
+
+    def notify(self, url: str, payload: dict) -> bool:
+        """Queues payload for url; False if the queue was full and it was dropped."""
+        delivery = _Delivery(url, payload.get("event", "job"), json.dumps(payload, separators=(",", ":")).encode("utf-8"))
+        with self._cond:
+            if len(self._queue) >= self.queue_size:
+                WEBHOOK_DELIVERIES.inc(result="dropped")
+                return False
+            heapq.heappush(self._queue, (time.monotonic(), next(self._seq), delivery))
+            self._cond.notify()
+            if len(self._threads) < self.workers:
+                self._start_workers()
+        return True
+
+    def _start_workers(self):
+        """Caller holds the lock; also restarts a stopped notifier."""
+        self._stopping = False
+        while len(self._threads) < self.workers:
+            thread = threading.Thread(target=self._worker, daemon=True, name=f"webhook-{len(self._threads)}")
+            thread.start()
+            self._threads.append(thread)
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                while True:
+                    if self._stopping:
+                        return
+                    now = time.monotonic()
+                    if self._queue and self._queue[0][0] <= now:
+                        _, _, delivery = heapq.heappop(self._queue)
+                        self._in_flight += 1
+                        break
+                    self._cond.wait(self._queue[0][0] - now if self._queue else None)
+            try:
+                self._deliver(delivery)
+            finally:
+                with self._cond:
+                    self._in_flight -= 1
+                    self._cond.notify_all()
+
+    def _deliver(self, delivery: _Delivery):
+        delivery.attempts += 1
+        timestamp = str(int(time.time()))
+        headers = {
+            "Content-Type": "application/json",
+            "User-Agent": "code-reviewer-webhooks/1",
+            "X-Review-Event": delivery.event,
+            "X-Review-Delivery": delivery.delivery_id,
+            TIMESTAMP_HEADER: timestamp,
+        }
+        if self.secret:
+            headers[SIGNATURE_HEADER] = sign(self.secret, timestamp, delivery.body)
+        try:
+            status = self.pool.post(delivery.url, delivery.body, headers)
+        except ValueError:
+            # the host now resolves somewhere callbacks may not go; retrying will not help
+            WEBHOOK_DELIVERIES.inc(result="blocked")
+            return
+        except (OSError, http.client.HTTPException):
+            status = None
+
+        if status is not None and 200 <= status < 300:
+            WEBHOOK_DELIVERIES.inc(result="delivered")
+            WEBHOOK_SECONDS.observe(time.monotonic() - delivery.created_at)
+            return
+        if (status is not None and status != 429 and status < 500) or delivery.attempts >= self.max_attempts:
+            WEBHOOK_DELIVERIES.inc(result="failed")
+            return
+        WEBHOOK_DELIVERIES.inc(result="retried")
+        delay = self.backoff_seconds * 2 ** (delivery.attempts - 1) * random.uniform(0.5, 1.0)
+        with self._cond:
+            heapq.heappush(self._queue, (time.monotonic() + delay, next(self._seq), delivery))
+            self._cond.notify()
+
+    def drain(self, timeout: float) -> bool:
+        """Waits until nothing is queued or in flight; False if time ran out first."""
+        give_up_at = time.monotonic() + timeout
+        with self._cond:
+            while self._queue or self._in_flight:
+                remaining = give_up_at - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def stop(self, timeout: float = WEBHOOK_DRAIN_SECONDS):
+        """Gives queued deliveries up to timeout to go out, then stops the workers and closes connections."""
+        self.drain(timeout)
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        self._threads = []
+        self.pool.close()
+
+    def status(self) -> dict:
+        with self._cond:
+            return {"queued": len(self._queue), "in_flight": self._in_flight, "connections_opened": self.pool.opened}
+
+
+notifier = WebhookNotifier()
+
+
+def notify_job(callback_url: str, job_id: str, status: str, error_code: str = None, error: str = None):
+    """Queues the notification for a job that reached a final status, if it asked for one."""
+    if callback_url:
+        notifier.notify(callback_url, job_event(job_id, status, error_code, error))
@@ -0,0 +1,89 @@
+import asyncio
+import base64
+import hashlib
+import hmac
+import os
+from concurrent.futures import ProcessPoolExecutor
+from app.utils.config import PASSWORD_POOL_SIZE, PASSWORD_SCRYPT_N, PASSWORD_SCRYPT_R, PASSWORD_SCRYPT_P
+
+# Stored format: scrypt$<version>$<n>,<r>,<p>$<salt>$<hash> (base64, no padding).
+# Anything else is treated as a legacy unsalted sha256 hex digest.
+SCHEME = "scrypt"
+VERSION = 1
+SALT_BYTES = 16
+KEY_BYTES = 32
+
+
+def _b64(data: bytes) -> str:
+    return base64.b64encode(data).rstrip(b"=").decode()
+
+
+def _unb64(data: str) -> bytes:
+    return base64.b64decode(data + "=" * (-len(data) % 4))
+
+
+def _scrypt(password: str, salt: bytes, n: int, r: int, p: int) -> bytes:
+    return hashlib.scrypt(password.encode(), salt=salt, n=n, r=r, p=p, maxmem=256 * n * r + 1024 * 1024, dklen=KEY_BYTES)
+
+
+def hash_password_sync(password: str, n: int = PASSWORD_SCRYPT_N, r: int = PASSWORD_SCRYPT_R, p: int = PASSWORD_SCRYPT_P) -> str:
+    salt = os.urandom(SALT_BYTES)
+    key = _scrypt(password, salt, n, r, p)
+    return f"{SCHEME}${VERSION}${n},{r},{p}${_b64(salt)}${_b64(key)}"
+
+
+def verify_password_sync(password: str, stored: str) -> tuple[bool, bool]:
+    """Returns (matches, needs_rehash)."""
+    if not stored.startswith(SCHEME + "$"):
+        legacy = hashlib.sha256(password.encode()).hexdigest()
+        return hmac.compare_digest(legacy, stored), True
+
+    _, version, params, salt, key = stored.split("$")
+    n, r, p = (int(x) for x in params.split(","))
+    matches = hmac.compare_digest(_scrypt(password, _unb64(salt), n, r, p), _unb64(key))
+    outdated = int(version) != VERSION or (n, r, p) != (PASSWORD_SCRYPT_N, PASSWORD_SCRYPT_R, PASSWORD_SCRYPT_P)
+    return matches, outdated
+
+
+# Verified against when the username does not exist, so an unknown user costs
+# the same KDF run as a wrong password; no password matches its random key.
+DUMMY_HASH = (f"{SCHEME}${VERSION}${PASSWORD_SCRYPT_N},{PASSWORD_SCRYPT_R},{PASSWORD_SCRYPT_P}"
+              f"${_b64(os.urandom(SALT_BYTES))}${_b64(os.urandom(KEY_BYTES))}")
+
+
+class PasswordHasher:
+    """
+    Runs the KDF on a bounded process pool so it never blocks the event loop.
+
+    At most pool_size * 4 hashes are queued; further callers wait on the
+    semaphore, which keeps a login burst from piling up unbounded work.
+    """
+
+    def __init__(self, pool_size: int = PASSWORD_POOL_SIZE):
+        self.pool_size = pool_size
+        self._pool = None
+        self._slots = None
+
+    def _ensure_pool(self):
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.pool_size)
+            self._slots = asyncio.Semaphore(self.pool_size * 4)
+
+    async def _run(self, fn, *args):
+        self._ensure_pool()
+        async with self._slots:
+            return await asyncio.get_running_loop().run_in_executor(self._pool, fn, *args)
+
+    async def hash(self, password: str) -> str:
+        return await self._run(hash_password_sync, password)
+
+    async def verify(self, password: str, stored: str) -> tuple[bool, bool]:
+        return await self._run(verify_password_sync, password, stored)
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+password_hasher = PasswordHasher()
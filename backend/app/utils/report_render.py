@@ -0,0 +1,190 @@
+import gzip
+import html
+import re
+import threading
+from collections import OrderedDict
+from app.utils.config import REPORT_CACHE_BYTES
+from app.utils.storage import get_storage
+
+try:
+    import brotli
+except ImportError:  # optional: br is only offered when the package is installed
+    brotli = None
+
+try:
+    import markdown
+    from markdown.extensions import Extension
+    from markdown.treeprocessors import Treeprocessor
+except ImportError:  # optional: falls back to escaped <pre> output
+    markdown = None
+
+# link and image targets kept in HTML reports; anything else (javascript:, data:) is dropped
+SAFE_URL_SCHEMES = ("http:", "https:", "mailto:")
+_URL_SCHEME = re.compile(r"[a-z][a-z0-9+.-]*:")
+
+HTML_TEMPLATE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Code review {job_id}</title></head>
+<body>
+{body}
+</body></html>
+"""
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return etag in candidates
+
+
+def representation_etag(etag: str, fmt: str, encoding: str) -> str:
+    """
+    The stored report's ETag suffixed with its format and content coding, so
+    each variant has its own strong validator: a cache never serves a gzip
+    body for an identity request, and If-Range never splices two codings.
+    """
+    suffix = ("-html" if fmt == "html" else "") + ("" if encoding == "identity" else f"-{encoding}")
+    return etag[:-1] + suffix + '"' if suffix else etag
+
+
+def negotiate_encoding(accept_encoding: str) -> str:
+    """Picks br, gzip or identity from an Accept-Encoding header, honouring q=0."""
+    offered = {}
+    for part in (accept_encoding or "").split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        if name:
+            offered[name.lower()] = quality
+    for encoding in ("br", "gzip"):
+        if encoding == "br" and brotli is None:
+            continue
+        if offered.get(encoding, offered.get("*", 0)) > 0:
+            return encoding
+    return "identity"
+
+
+def parse_range(range_header: str, size: int):
+    """
+    Parses a single 'bytes=' range into (start, end) inclusive.
+
+    Returns None when there is no usable Range header and raises ValueError
+    when the range cannot be satisfied.
+    """
+    if not range_header or not range_header.startswith("bytes=") or "," in range_header:
+        return None
+    start_text, _, end_text = range_header[6:].strip().partition("-")
+    if not start_text:
+        length = int(end_text)
+        if length <= 0:
+            raise ValueError("unsatisfiable range")
+        return max(size - length, 0), size - 1
+    start = int(start_text)
+    end = int(end_text) if end_text else size - 1
+    if start >= size or end < start:
+        raise ValueError("unsatisfiable range")
+    return start, min(end, size - 1)
+
+
+def _safe_url(url: str) -> bool:
+    """Relative URLs and SAFE_URL_SCHEMES; browsers ignore control characters and spaces in a scheme."""
+    scheme = _URL_SCHEME.match(re.sub(r"[\x00-\x20]", "", url).lower())
+    return scheme is None or scheme.group(0) in SAFE_URL_SCHEMES
+
+
+if markdown is not None:
+    class _SafeLinks(Treeprocessor):
+        def run(self, root):
+            for element in root.iter():
+                for attribute in ("href", "src"):
+                    url = element.get(attribute)
+                    if url is not None and not _safe_url(url):
+                        del element.attrib[attribute]
+
+    class EscapeHtml(Extension):
+        """
+        Reports quote submitted code and model output, so raw HTML in them is
+        rendered as text and links keep only SAFE_URL_SCHEMES.
+        """
+
+        def extendMarkdown(self, md):
+            md.preprocessors.deregister("html_block")
+            md.inlinePatterns.deregister("html")
+            md.treeprocessors.register(_SafeLinks(md), "safe_links", 0)
+
+
+def render_html(job_id: str, text: str) -> str:
+    if markdown is not None:
+        body = markdown.markdown(text, extensions=["fenced_code", "tables", EscapeHtml()])
+    else:
+        body = f"<pre>{html.escape(text)}</pre>"
+    return HTML_TEMPLATE.format(job_id=html.escape(job_id), body=body)
+
+
+def _compress(data: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(data, quality=5)
+    if encoding == "gzip":
+        return gzip.compress(data, compresslevel=6)
+    return data
+
+
+class ReportCache:
+    """
+    Byte-bounded LRU of rendered/compressed report bodies.
+
+    Keys include the stored report's ETag, so a report rewritten by late sections is
+    picked up on the next request and stale variants age out.
+    """
+
+    def __init__(self, max_bytes: int = REPORT_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            body = self._entries.get(key)
+            if body is not None:
+                self._entries.move_to_end(key)
+            return body
+
+    def put(self, key, body: bytes):
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= len(old)
+            self._entries[key] = body
+            self._size += len(body)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def body(self, job_id: str, report_key: str, etag: str, fmt: str, encoding: str) -> bytes:
+        """Returns the report body in the requested format and encoding, reading storage only on a miss."""
+        key = (job_id, etag, fmt, encoding)
+        body = self.get(key)
+        if body is not None:
+            return body
+
+        if encoding != "identity":
+            body = _compress(self.body(job_id, report_key, etag, fmt, "identity"), encoding)
+        elif fmt == "html":
+            text = self.body(job_id, report_key, etag, "markdown", "identity").decode("utf-8")
+            body = render_html(job_id, text).encode("utf-8")
+        else:
+            body = get_storage().get(report_key)
+        self.put(key, body)
+        return body
+
+
+report_cache = ReportCache()
@@ -0,0 +1,168 @@
+import math
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta
+from app.utils.config import (
+    SCHEDULER_WORKERS,
+    SCHEDULER_PER_USER_CONCURRENCY,
+    SCHEDULER_CLASS_WEIGHTS,
+    SCHEDULER_DEFAULT_JOB_SECONDS,
+    DAILY_TOKEN_QUOTA,
+)
+from app.utils.database import get_db_connection
+from app.utils.metrics import register, Histogram
+
+SCHEDULER_WAIT_SECONDS = register(Histogram("review_scheduler_wait_seconds", "Time a job spent queued in the fair scheduler.", ["priority"]))
+
+
+class ScheduledJob:
+    __slots__ = ("job_id", "username", "priority", "cost", "fn", "args", "virtual_start", "virtual_finish", "enqueued_at")
+
+    def __init__(self, job_id, username, priority, cost, fn, args):
+        self.job_id = job_id
+        self.username = username
+        self.priority = priority
+        self.cost = cost
+        self.fn = fn
+        self.args = args
+        self.virtual_start = 0.0
+        self.virtual_finish = 0.0
+        self.enqueued_at = time.time()
+
+
+class FairScheduler:
+    """
+    Start-time fair queuing over (username, priority) flows.
+
+    Each flow gets a share of the workers proportional to its class weight,
+    so one user's 500-file batch interleaves with everyone else instead of
+    running ahead of them. A user never has more than per_user_limit jobs
+    running at once; their other jobs wait without blocking other flows.
+    """
+
+    def __init__(self, workers: int = SCHEDULER_WORKERS, per_user_limit: int = SCHEDULER_PER_USER_CONCURRENCY,
+                 class_weights: dict = SCHEDULER_CLASS_WEIGHTS):
+        self.workers = workers
+        self.per_user_limit = per_user_limit
+        self.class_weights = class_weights
+        self._cond = threading.Condition()
+        self._flows = {}  # (username, priority) -> deque of ScheduledJob
+        self._last_finish = {}  # flow -> virtual finish of its newest job
+        self._virtual_time = 0.0
+        self._running = {}  # username -> running job count
+        self._queued = {}  # job_id -> ScheduledJob
+        self._avg_seconds = SCHEDULER_DEFAULT_JOB_SECONDS
+        self._threads = []
+        self._stopping = False
+
+    def submit(self, job_id: str, username: str, priority: str, cost: float, fn, *args):
+        job = ScheduledJob(job_id, username, priority, max(cost, 1.0), fn, args)
+        flow = (username, priority)
+        weight = self.class_weights.get(priority, 1.0)
+        with self._cond:
+            job.virtual_start = max(self._virtual_time, self._last_finish.get(flow, 0.0))
+            job.virtual_finish = job.virtual_start + job.cost / weight
+            self._last_finish[flow] = job.virtual_finish
+            self._flows.setdefault(flow, deque()).append(job)
+            self._queued[job_id] = job
+            self._cond.notify()
+
+    def _take_next(self):
+        """Pops the eligible head-of-flow job with the smallest finish tag. Caller holds the lock."""
+        best_flow = None
+        for flow, queue in self._flows.items():
+            if self._running.get(flow[0], 0) >= self.per_user_limit:
+                continue
+            if best_flow is None or queue[0].virtual_finish < self._flows[best_flow][0].virtual_finish:
+                best_flow = flow
+        if best_flow is None:
+            return None
+
+        job = self._flows[best_flow].popleft()
+        if not self._flows[best_flow]:
+            del self._flows[best_flow]
+        del self._queued[job.job_id]
+        self._virtual_time = max(self._virtual_time, job.virtual_start)
+        # idle flows whose tags are in the past carry no state worth keeping
+        for flow in [f for f, tag in self._last_finish.items() if f not in self._flows and tag <= self._virtual_time]:
+            del self._last_finish[flow]
+        return job
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                job = None
+                while not self._stopping and (job := self._take_next()) is None:
+                    self._cond.wait()
+                if job is None:
+                    return
+                self._running[job.username] = self._running.get(job.username, 0) + 1
+
+            SCHEDULER_WAIT_SECONDS.observe(time.time() - job.enqueued_at, priority=job.priority)
+            started = time.monotonic()
+            try:
+                job.fn(*job.args)
+            except Exception:
+                # the job function records its own failure on the job row
+                pass
+            finally:
+                elapsed = time.monotonic() - started
+                with self._cond:
+                    self._running[job.username] -= 1
+                    if not self._running[job.username]:
+                        del self._running[job.username]
+                    self._avg_seconds = 0.8 * self._avg_seconds + 0.2 * elapsed
+                    self._cond.notify_all()
+
+    def start(self):
+        with self._cond:
+            self._stopping = False
+        while len(self._threads) < self.workers:
+            thread = threading.Thread(target=self._worker, daemon=True, name=f"review-worker-{len(self._threads)}")
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        """Stops taking new jobs; running jobs finish, queued ones stay queued."""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        self._threads = []
+
+    def queue_status(self, job_id: str):
+        """Returns queue position and estimated start for a queued job, or None."""
+        with self._cond:
+            job = self._queued.get(job_id)
+            if job is None:
+                return None
+            ahead = sum(1 for other in self._queued.values() if other.virtual_finish < job.virtual_finish)
+            running = sum(self._running.values())
+            avg_seconds = self._avg_seconds
+        free_now = max(self.workers - running, 0)
+        waves = 0 if ahead < free_now else math.ceil((ahead - free_now + 1) / self.workers)
+        return {
+            "queue_position": ahead + 1,
+            "estimated_start": (datetime.now() + timedelta(seconds=waves * avg_seconds)).isoformat(),
+        }
+
+
+def tokens_used_today(username: str) -> int:
+    """LLM tokens billed to the user's jobs since midnight UTC."""
+    db,conn = get_db_connection()
+    conn.execute(
+        """SELECT COALESCE(SUM(COALESCE(m.input_tokens, 0) + COALESCE(m.output_tokens, 0)), 0)
+           FROM job_metrics m JOIN job j ON m.job_id = j.job_id
+           WHERE j.username = ? AND m.created_at >= date('now')""",
+        (username,)
+    )
+    used = conn.fetchone()[0]
+    conn.close()
+    return used
+
+
+def quota_exceeded(username: str) -> bool:
+    return DAILY_TOKEN_QUOTA > 0 and tokens_used_today(username) >= DAILY_TOKEN_QUOTA
+
+
+scheduler = FairScheduler()
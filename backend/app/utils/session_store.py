@@ -0,0 +1,133 @@
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from app.utils.config import (
+    SESSION_TTL_DAYS,
+    SESSION_CACHE_SIZE,
+    SESSION_CACHE_TTL_SECONDS,
+    SESSION_SWEEP_INTERVAL_SECONDS,
+    SESSION_MODE,
+)
+from app.utils.database import get_db_connection
+from app.utils.metrics import register, Counter
+
+SESSION_LOOKUPS = register(Counter("review_session_lookups_total", "Bearer token validations by cache outcome.", ["result"]))
+
+# Sentinel cached for tokens the DB does not know, so repeated bad tokens
+# do not each cost a query.
+_MISSING = object()
+
+
+class SessionStore:
+    """
+    DB-backed sessions with an in-process LRU/TTL cache in front.
+
+    Entries are trusted for at most SESSION_CACHE_TTL_SECONDS, so a logout
+    handled by another process takes effect within that window.
+    """
+
+    def __init__(self, max_entries: int = SESSION_CACHE_SIZE, cache_ttl: float = SESSION_CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.cache_ttl = cache_ttl
+        self._cache = OrderedDict()  # token -> (user_id or _MISSING, valid_until)
+        self._lock = threading.Lock()
+        self._sweeper = None
+        self._stop = threading.Event()
+
+    def _remember(self, token: str, user_id, expires_at: float):
+        valid_until = min(expires_at, time.time() + self.cache_ttl)
+        with self._lock:
+            self._cache[token] = (user_id, valid_until)
+            self._cache.move_to_end(token)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+
+    def create(self, user_id) -> tuple[str, datetime]:
+        token = secrets.token_urlsafe(32)
+        expires_at = datetime.now() + timedelta(days=SESSION_TTL_DAYS)
+
+        db,conn = get_db_connection()
+        db.execute(
+            "INSERT INTO sessions (user_id, token, expires_at) VALUES (?, ?, ?)",
+            (user_id, token, expires_at)
+        )
+        db.commit()
+        conn.close()
+
+        self._remember(token, user_id, expires_at.timestamp())
+        return token, expires_at
+
+    def validate(self, token: str):
+        """Returns the session's user_id, or None if the token is unknown or expired."""
+        now = time.time()
+        with self._lock:
+            entry = self._cache.get(token)
+            if entry is not None and entry[1] > now:
+                self._cache.move_to_end(token)
+                SESSION_LOOKUPS.inc(result="hit")
+                return None if entry[0] is _MISSING else entry[0]
+
+        SESSION_LOOKUPS.inc(result="miss")
+        db,conn = get_db_connection()
+        conn.execute("SELECT user_id, expires_at FROM sessions WHERE token = ?", (token,))
+        row = conn.fetchone()
+        conn.close()
+
+        if row is None:
+            self._remember(token, _MISSING, now + self.cache_ttl)
+            return None
+        expires_at = datetime.fromisoformat(row[1]).timestamp()
+        if expires_at <= now:
+            return None
+        self._remember(token, row[0], expires_at)
+        return row[0]
+
+    def revoke(self, token: str):
+        with self._lock:
+            self._cache.pop(token, None)
+        db,conn = get_db_connection()
+        conn.execute("DELETE FROM sessions WHERE token = ?", (token,))
+        db.commit()
+        conn.close()
+
+    def sweep(self) -> int:
+        """Deletes expired sessions from the table and the cache."""
+        now = time.time()
+        with self._lock:
+            for token in [t for t, (_, valid_until) in self._cache.items() if valid_until <= now]:
+                del self._cache[token]
+        db,conn = get_db_connection()
+        conn.execute("DELETE FROM sessions WHERE expires_at < ?", (datetime.now(),))
+        deleted = conn.rowcount
+        db.commit()
+        conn.close()
+        return deleted
+
+    def _sweep_loop(self, interval: float):
+        while not self._stop.wait(interval):
+            try:
+                self.sweep()
+            except Exception:
+                # A locked DB just delays the sweep to the next tick
+                pass
+
+    def start_sweeper(self, interval: float = SESSION_SWEEP_INTERVAL_SECONDS):
+        if self._sweeper is not None:
+            return
+        self._stop.clear()
+        self._sweeper = threading.Thread(target=self._sweep_loop, args=(interval,), daemon=True, name="session-sweeper")
+        self._sweeper.start()
+
+    def stop_sweeper(self):
+        self._stop.set()
+        self._sweeper = None
+
+
+if SESSION_MODE == "stateless":
+    from app.utils.signed_tokens import SignedTokenStore
+
+    session_store = SignedTokenStore()
+else:
+    session_store = SessionStore()
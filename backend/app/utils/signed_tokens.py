@@ -0,0 +1,117 @@
+import base64
+import hashlib
+import hmac
+import json
+import secrets
+import threading
+import time
+from datetime import datetime, timedelta
+from app.utils.config import SESSION_TTL_DAYS, SESSION_SECRET, DENYLIST_REFRESH_SECONDS
+from app.utils.database import get_db_connection
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+class SignedTokenStore:
+    """
+    Stateless sessions: HMAC-SHA256 signed tokens carrying user, expiry and id.
+
+    Login writes nothing and validation never touches the DB. Logout adds the
+    token id to a denylist table that only holds revoked, unexpired tokens;
+    each process keeps a copy in memory and refreshes it on the sweeper tick.
+    """
+
+    def __init__(self, secret: str = SESSION_SECRET):
+        if not secret:
+            raise RuntimeError("SESSION_SECRET must be set when SESSION_MODE=stateless")
+        self._key = secret.encode()
+        self._denylist = {}  # jti -> exp
+        self._lock = threading.Lock()
+        self._sweeper = None
+        self._stop = threading.Event()
+
+    def _sign(self, body: str) -> str:
+        return _b64encode(hmac.new(self._key, body.encode(), hashlib.sha256).digest())
+
+    def _decode(self, token: str):
+        """Returns the verified claims, or None for a malformed or forged token."""
+        body, _, signature = token.partition(".")
+        if not signature or not hmac.compare_digest(signature, self._sign(body)):
+            return None
+        try:
+            return json.loads(_b64decode(body))
+        except ValueError:
+            return None
+
+    def create(self, user_id) -> tuple[str, datetime]:
+        expires_at = datetime.now() + timedelta(days=SESSION_TTL_DAYS)
+        claims = {"sub": user_id, "exp": int(expires_at.timestamp()), "jti": secrets.token_urlsafe(12)}
+        body = _b64encode(json.dumps(claims, separators=(",", ":")).encode())
+        return f"{body}.{self._sign(body)}", expires_at
+
+    def validate(self, token: str):
+        """Returns the token's user_id, or None if it is invalid, expired or revoked."""
+        claims = self._decode(token)
+        if claims is None or claims.get("exp", 0) <= time.time():
+            return None
+        with self._lock:
+            if claims.get("jti") in self._denylist:
+                return None
+        return claims.get("sub")
+
+    def revoke(self, token: str):
+        claims = self._decode(token)
+        if claims is None or claims.get("exp", 0) <= time.time():
+            return
+        with self._lock:
+            self._denylist[claims["jti"]] = claims["exp"]
+        db,conn = get_db_connection()
+        conn.execute(
+            "INSERT OR IGNORE INTO revoked_tokens (jti, expires_at) VALUES (?, ?)",
+            (claims["jti"], claims["exp"])
+        )
+        db.commit()
+        conn.close()
+
+    def sweep(self) -> int:
+        """Drops expired denylist entries and reloads revocations from other processes."""
+        now = time.time()
+        db,conn = get_db_connection()
+        conn.execute("DELETE FROM revoked_tokens WHERE expires_at < ?", (now,))
+        deleted = conn.rowcount
+        db.commit()
+        conn.execute("SELECT jti, expires_at FROM revoked_tokens")
+        rows = conn.fetchall()
+        conn.close()
+        with self._lock:
+            # keep local revocations that raced with the SELECT
+            merged = dict(rows)
+            merged.update({jti: exp for jti, exp in self._denylist.items() if exp > now})
+            self._denylist = merged
+        return deleted
+
+    def _sweep_loop(self, interval: float):
+        while not self._stop.wait(interval):
+            try:
+                self.sweep()
+            except Exception:
+                # A locked DB just delays the refresh to the next tick
+                pass
+
+    def start_sweeper(self, interval: float = DENYLIST_REFRESH_SECONDS):
+        if self._sweeper is not None:
+            return
+        self.sweep()
+        self._stop.clear()
+        self._sweeper = threading.Thread(target=self._sweep_loop, args=(interval,), daemon=True, name="denylist-sweeper")
+        self._sweeper.start()
+
+    def stop_sweeper(self):
+        self._stop.set()
+        self._sweeper = None
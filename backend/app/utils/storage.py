@@ -0,0 +1,149 @@
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from app.utils.config import STORAGE_URL
+
+try:
+    import redis
+except ImportError:  # optional: only needed for redis:// storage
+    redis = None
+
+
+class Storage:
+    """
+    Blob store for reports and queued code, shared by API nodes and workers.
+
+    Keys are relative paths such as "<user>/<job_id>.md"; etag returns None
+    for keys that do not exist. scan yields (key, seconds since written) for
+    the keys under a "<dir>/" prefix, for the compactor.
+    """
+
+    def put(self, key: str, data: bytes):
+        raise NotImplementedError
+
+    def get(self, key: str) -> bytes:
+        raise NotImplementedError
+
+    def etag(self, key: str):
+        raise NotImplementedError
+
+    def delete(self, key: str):
+        raise NotImplementedError
+
+    def scan(self, prefix: str):
+        raise NotImplementedError
+
+
+class LocalStorage(Storage):
+    """Files under a root directory; point every node at the same volume to share it."""
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def _path(self, key: str) -> str:
+        # absolute keys, "..", and an empty user segment ("/job.md") all land outside the root
+        path = os.path.normpath(os.path.join(self.root, key))
+        if not path.startswith(os.path.normpath(self.root) + os.sep):
+            raise ValueError(f"Storage key {key!r} escapes the storage root")
+        return path
+
+    def put(self, key: str, data: bytes):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # write-then-rename so readers on other nodes never see a partial report
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+    def get(self, key: str) -> bytes:
+        with open(self._path(key), "rb") as f:
+            return f.read()
+
+    def etag(self, key: str):
+        """Strong ETag from size and mtime, so revalidation never reads the file."""
+        try:
+            stat = os.stat(self._path(key))
+        except FileNotFoundError:
+            return None
+        return f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+
+    def delete(self, key: str):
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def scan(self, prefix: str):
+        directory = self._path(prefix)
+        now = time.time()
+        for dirpath, _, filenames in os.walk(directory):
+            for name in filenames:
+                path = os.path.join(dirpath, name)
+                try:
+                    age = now - os.stat(path).st_mtime
+                except FileNotFoundError:
+                    continue
+                yield os.path.relpath(path, self.root).replace(os.sep, "/"), age
+
+
+class RedisStorage(Storage):
+    """Blobs in any Redis-compatible server, with a content hash kept alongside as the ETag."""
+
+    def __init__(self, url: str, prefix: str = "review:blob:"):
+        if redis is None:
+            raise RuntimeError("The redis package is required for redis:// storage")
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def put(self, key: str, data: bytes):
+        etag = '"' + hashlib.sha256(data).hexdigest()[:32] + '"'
+        pipe = self.client.pipeline()
+        pipe.set(self.prefix + key, data)
+        pipe.set(self.prefix + key + ":etag", etag)
+        pipe.execute()
+
+    def get(self, key: str) -> bytes:
+        data = self.client.get(self.prefix + key)
+        if data is None:
+            raise FileNotFoundError(key)
+        return data
+
+    def etag(self, key: str):
+        etag = self.client.get(self.prefix + key + ":etag")
+        return etag.decode("ascii") if etag is not None else None
+
+    def delete(self, key: str):
+        self.client.delete(self.prefix + key, self.prefix + key + ":etag")
+
+    def scan(self, prefix: str):
+        # idle time bounds the age from below: a key is touched when written and when read
+        for raw in self.client.scan_iter(match=self.prefix + prefix + "*", count=1000):
+            key = raw.decode("utf-8")[len(self.prefix):]
+            if key.endswith(":etag"):
+                continue
+            idle = self.client.object("idletime", raw)
+            if idle is not None:
+                yield key, float(idle)
+
+
+_storage = None
+_storage_lock = threading.Lock()
+
+
+def get_storage() -> Storage:
+    """Storage for STORAGE_URL: a directory path or redis://host:port/db."""
+    global _storage
+    with _storage_lock:
+        if _storage is None:
+            if STORAGE_URL.startswith("redis://") or STORAGE_URL.startswith("rediss://"):
+                _storage = RedisStorage(STORAGE_URL)
+            else:
+                _storage = LocalStorage(STORAGE_URL)
+        return _storage
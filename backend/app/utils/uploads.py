@@ -0,0 +1,55 @@
+import codecs
+import hashlib
+import os
+import tempfile
+from fastapi import HTTPException, Request
+from app.utils.config import MAX_CODE_BYTES, UPLOAD_SPOOL_DIR
+
+
+async def spool_upload(request: Request, max_bytes: int = MAX_CODE_BYTES) -> tuple[str, str, int]:
+    """
+    Streams the request body to a spool file, hashing as it goes.
+
+    Returns (path, sha256, size). Oversized bodies are rejected with 413 as
+    soon as the declared or received length passes max_bytes, so nothing
+    past the limit is buffered and no LLM work is queued.
+    """
+    declared = request.headers.get("content-length")
+    if declared and declared.isdigit() and int(declared) > max_bytes:
+        raise HTTPException(status_code=413, detail=f"Code exceeds {max_bytes} bytes.")
+
+    os.makedirs(UPLOAD_SPOOL_DIR, exist_ok=True)
+    digest = hashlib.sha256()
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    size = 0
+    fd, path = tempfile.mkstemp(prefix="upload-", suffix=".code", dir=UPLOAD_SPOOL_DIR)
+    try:
+        with os.fdopen(fd, "wb") as spool:
+            async for chunk in request.stream():
+                size += len(chunk)
+                if size > max_bytes:
+                    raise HTTPException(status_code=413, detail=f"Code exceeds {max_bytes} bytes.")
+                utf8.decode(chunk)
+                digest.update(chunk)
+                spool.write(chunk)
+            utf8.decode(b"", final=True)
+    except UnicodeDecodeError:
+        os.remove(path)
+        raise HTTPException(status_code=400, detail="Code must be UTF-8 text.")
+    except BaseException:
+        os.remove(path)
+        raise
+
+    if size == 0:
+        os.remove(path)
+        raise HTTPException(status_code=400, detail="Code is required.")
+    return path, digest.hexdigest(), size
+
+
+def read_spooled(path: str) -> str:
+    """Loads a spooled upload as text and removes the spool file."""
+    try:
+        with open(path, "rb") as f:
+            return f.read().decode("utf-8")
+    finally:
+        os.remove(path)
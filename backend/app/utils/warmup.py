@@ -0,0 +1,61 @@
+import threading
+import time
+from app.utils.config import ANALYZER_WARMUP
+
+
+class AnalyzerWarmup:
+    """
+    Loads the analyzer stack (LangGraph, the Bedrock client, prompt templates,
+    the compiled graph) once per process.
+
+    Importing the API does not load it; it is loaded at startup according to
+    ANALYZER_WARMUP, by POST /warmup, or by the first job, whichever comes first.
+    """
+
+    def __init__(self):
+        self.state = "cold"
+        self.seconds = None
+        self.error = None
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+
+    def run(self) -> dict:
+        """Loads the stack if no one has yet, waiting for a load already in progress."""
+        with self._lock:
+            first = self.state in ("cold", "failed")
+            if first:
+                self.state = "warming"
+                self._done.clear()
+        if not first:
+            self._done.wait()
+            return self.status()
+
+        started = time.monotonic()
+        try:
+            from app.analyzer_logic.graph import get_workflow
+
+            get_workflow()
+            self.state, self.error = "ready", None
+        except Exception as e:
+            # jobs will retry the imports and surface the error on their own row
+            self.state, self.error = "failed", f"{type(e).__name__}: {e}"
+        self.seconds = time.monotonic() - started
+        self._done.set()
+        return self.status()
+
+    def start(self, mode: str = ANALYZER_WARMUP):
+        """startup loads before returning, background on a daemon thread, lazy not at all."""
+        if mode == "startup":
+            self.run()
+        elif mode == "background":
+            threading.Thread(target=self.run, name="analyzer-warmup", daemon=True).start()
+
+    def status(self) -> dict:
+        return {
+            "state": self.state,
+            "seconds": round(self.seconds, 3) if self.seconds is not None else None,
+            "error": self.error,
+        }
+
+
+warmup = AnalyzerWarmup()
@@ -0,0 +1,147 @@
+"""
+Review worker for JOB_DISPATCH=broker deployments.
+
+Run any number of these next to any number of API nodes:
+
+    python -m app.worker
+
+Each worker pulls up to BROKER_PREFETCH messages from the broker into its
+local fair scheduler, acks a message once its job has finished, and on
+SIGTERM/SIGINT stops pulling and drains the jobs it already holds.
+app.supervisor runs a pool of these processes on one host.
+"""
+import os
+import resource
+import signal
+import socket
+import threading
+import time
+from app.utils.broker import get_broker
+from app.utils.database import create_db, get_db_connection
+from app.utils.scheduler import scheduler
+from app.utils.notifier import notifier
+from app.utils.config import BROKER_PREFETCH, BROKER_VISIBILITY_TIMEOUT_SECONDS, WORKER_HEARTBEAT_SECONDS
+from app.analyzer_logic.tasks import analyze_stored_task
+from app.utils.warmup import warmup
+
+REQUEUE_INTERVAL_SECONDS = min(30.0, BROKER_VISIBILITY_TIMEOUT_SECONDS)
+
+
+class WorkerHealth:
+    """Job counters for one worker process, written to worker_health on every heartbeat."""
+
+    def __init__(self, worker_id: str):
+        self.worker_id = worker_id
+        self.state = "starting"
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+
+    def job_started(self):
+        with self._lock:
+            self.running += 1
+
+    def job_finished(self, ok: bool):
+        with self._lock:
+            self.running -= 1
+            if ok:
+                self.completed += 1
+            else:
+                self.failed += 1
+
+    def report(self):
+        # ru_maxrss is KiB on Linux
+        peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+        with self._lock:
+            row = (self.worker_id, os.getpid(), self.state, self.running, self.completed, self.failed,
+                   peak_rss, self.started_at, time.time())
+        try:
+            db,conn = get_db_connection()
+            conn.execute(
+                """INSERT INTO worker_health
+                   (worker_id, pid, state, running, completed, failed, peak_rss_bytes, started_at, heartbeat_at)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                   ON CONFLICT(worker_id) DO UPDATE SET
+                   pid=excluded.pid, state=excluded.state, running=excluded.running,
+                   completed=excluded.completed, failed=excluded.failed,
+                   peak_rss_bytes=excluded.peak_rss_bytes, started_at=excluded.started_at,
+                   heartbeat_at=excluded.heartbeat_at""",
+                row
+            )
+            db.commit()
+            conn.close()
+        except Exception:
+            # a missed heartbeat only makes the worker look stale until the next one
+            pass
+
+    def run_heartbeat(self, stop: threading.Event):
+        while not stop.wait(WORKER_HEARTBEAT_SECONDS):
+            self.report()
+
+
+def _run_message(broker, message_id, message: dict, slots: threading.Semaphore, health: WorkerHealth):
+    health.job_started()
+    ok = False
+    try:
+        status = analyze_stored_task(message["code_key"], message.get("code_sha256"), message["username"],
+                                     message["job_id"], message.get("submitted_at"))
+        ok = status != "failed"
+    finally:
+        # failures are recorded on the job row; only a dead worker leaves a message unacked
+        broker.ack(message_id)
+        health.job_finished(ok)
+        slots.release()
+
+
+def run_worker(stop, broker=None, prefetch: int = BROKER_PREFETCH, worker_id: str = None):
+    """Consumes review jobs until stop is set, then waits for held jobs to finish."""
+    broker = broker or get_broker()
+    health = WorkerHealth(worker_id or f"{socket.gethostname()}:{os.getpid()}")
+    heartbeat_stop = threading.Event()
+    threading.Thread(target=health.run_heartbeat, args=(heartbeat_stop,), daemon=True).start()
+
+    slots = threading.Semaphore(prefetch)
+    scheduler.start()
+    health.state = "running"
+    health.report()
+    next_requeue = 0.0
+    try:
+        while not stop.is_set():
+            if time.monotonic() >= next_requeue:
+                broker.requeue_stale()
+                next_requeue = time.monotonic() + REQUEUE_INTERVAL_SECONDS
+            if not slots.acquire(timeout=1.0):
+                continue
+            delivery = broker.consume(timeout=1.0)
+            if delivery is None:
+                slots.release()
+                continue
+            message_id, message = delivery
+            scheduler.submit(message["job_id"], message["username"], message.get("priority", "interactive"),
+                             message.get("cost", 1.0), _run_message, broker, message_id, message, slots, health)
+    finally:
+        health.state = "draining"
+        health.report()
+        for _ in range(prefetch):
+            slots.acquire()
+        scheduler.stop()
+        # outcomes recorded while draining still owe their callbacks
+        notifier.stop()
+        heartbeat_stop.set()
+        health.state = "stopped"
+        health.report()
+
+
+def main():
+    create_db()
+    warmup.start()
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+    run_worker(stop)
+
+
+if __name__ == "__main__":
+    main()
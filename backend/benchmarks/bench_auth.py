@@ -0,0 +1,89 @@
+"""
+Bearer-token validation overhead per request at a fixed request rate.
+
+Creates a pool of sessions in a scratch SQLite file, then validates random
+tokens from it at --rps for --seconds, once with the session cache enabled and
+once with it disabled (every request hits SQLite):
+
+    python benchmarks/bench_auth.py --rps 1000 --seconds 10 --sessions 2000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * pct / 100), len(ordered) - 1)]
+
+
+def drive(validate, tokens, rps: int, seconds: float, workers: int) -> dict:
+    latencies = []
+    lock = threading.Lock()
+
+    def one(token):
+        start = time.perf_counter()
+        validate(token)
+        elapsed = time.perf_counter() - start
+        with lock:
+            latencies.append(elapsed)
+
+    interval = 1 / rps
+    total = int(rps * seconds)
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for i in range(total):
+            # open-loop pacing: schedule by wall clock, not by completion
+            delay = started + i * interval - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(one, random.choice(tokens))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "requests": total,
+        "achieved_rps": round(total / elapsed, 1),
+        "p50_us": round(percentile(latencies, 50) * 1e6, 1),
+        "p99_us": round(percentile(latencies, 99) * 1e6, 1),
+        "mean_us": round(sum(latencies) / len(latencies) * 1e6, 1),
+        "cpu_ms_per_1k_requests": round(sum(latencies) / total * 1000 * 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Auth overhead per request.")
+    parser.add_argument("--rps", type=int, default=1000)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--sessions", type=int, default=2000)
+    parser.add_argument("--workers", type=int, default=16)
+    args = parser.parse_args()
+
+    sys.path.insert(0, BACKEND_DIR)
+    os.chdir(tempfile.mkdtemp(prefix="review-auth-"))
+
+    from app.utils.database import create_db
+    from app.utils.session_store import SessionStore
+
+    create_db()
+    seed = SessionStore()
+    tokens = [seed.create(i)[0] for i in range(args.sessions)]
+
+    cached = SessionStore()
+    uncached = SessionStore(cache_ttl=0)
+    report = {
+        "cached": drive(cached.validate, tokens, args.rps, args.seconds, args.workers),
+        "uncached": drive(uncached.validate, tokens, args.rps, args.seconds, args.workers),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
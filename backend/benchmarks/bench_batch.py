@@ -0,0 +1,74 @@
+"""
+Bulk review through batch inference against the local stand-in batch server.
+
+Writes a tree of generated Python and React files, starts
+app/utils/fake_batch_server.py in-process and reviews the tree with
+app.bulk_review, then prints the number of batches and records next to
+the interactive calls the same files would have made:
+
+    python benchmarks/bench_batch.py --files 200 --delay 1
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PYTHON_UNIT = "def handler_{n}(request):\n    value = request.get('v{n}')\n    if value:\n        return value * {n}\n    return None\n\n"
+REACT_UNIT = "export const Item{n} = (props) => {{\n  const [open, setOpen] = useState(false);\n  return <div className=\"item\" onClick={{() => setOpen(!open)}}>{{props.name}}</div>;\n}};\n\n"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk review through the stand-in batch server.")
+    parser.add_argument("--files", type=int, default=200)
+    parser.add_argument("--delay", type=float, default=1.0, help="seconds the server takes per batch")
+    args = parser.parse_args()
+
+    os.environ.update(LLM_PROVIDER="fake", BATCH_POLL_SECONDS="0.2", NEAR_DUP_CACHE_SIZE="0",
+                      FINDINGS_ISOLATION="off", CHECKPOINT_DB_PATH="")
+    workdir = tempfile.mkdtemp(prefix="review-batch-")
+    os.chdir(workdir)
+    sys.path.insert(0, BACKEND_DIR)
+    from app.utils.fake_batch_server import FakeBatchServer
+    from app.utils.batch_client import HttpBatchClient
+    from app.utils.database import create_db
+    from app.utils.metrics import LLM_SECONDS
+    from app.analyzer_logic.batching import BatchSession
+    from app.bulk_review import collect_files, review_files
+
+    rng = random.Random(7)
+    src = os.path.join(workdir, "src")
+    os.makedirs(src)
+    for i in range(args.files):
+        react = i % 3 == 0
+        unit = REACT_UNIT if react else PYTHON_UNIT
+        header = 'import React, { useState } from "react";\n\n' if react else "import os\n\n"
+        body = header + "".join(unit.format(n=rng.randint(1, 10_000)) for _ in range(rng.randint(2, 8)))
+        with open(os.path.join(src, f"file_{i}.{'jsx' if react else 'py'}"), "w") as f:
+            f.write(body)
+
+    httpd = FakeBatchServer(delay=args.delay).serve(port=0)
+    create_db()
+    session = BatchSession(HttpBatchClient(f"http://127.0.0.1:{httpd.server_address[1]}"))
+    started = time.monotonic()
+    rows = review_files(collect_files([src]), "bench-user", session=session)
+    seconds = time.monotonic() - started
+
+    calls = sum(series[2] for series in LLM_SECONDS._series.values())
+    print(json.dumps({
+        "files": args.files,
+        "completed": sum(row[2] == "completed" for row in rows),
+        "llm_calls": calls,
+        "batches": session.batches,
+        "batch_records": session.records,
+        "seconds": round(seconds, 1),
+    }, indent=2))
+    httpd.shutdown()
+
+
+if __name__ == "__main__":
+    main()
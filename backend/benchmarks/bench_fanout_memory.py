@@ -0,0 +1,63 @@
+"""
+Peak Python heap per job for a large input, measured with tracemalloc.
+
+Runs analyze_code once against the offline stand-in model and reports the peak
+traced allocation relative to the size of the submitted code, so the cost of
+the Send fan-out (state copies, prompt assembly) can be compared across
+commits:
+
+    python benchmarks/bench_fanout_memory.py --code-mb 4
+    git checkout <older commit> && python benchmarks/bench_fanout_memory.py --code-mb 4
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Peak memory per job for a large input.")
+    parser.add_argument("--code-mb", type=float, default=4)
+    parser.add_argument("--language", choices=["python", "react"], default="python")
+    args = parser.parse_args()
+
+    os.environ.setdefault("LLM_PROVIDER", "fake")
+    os.environ.setdefault("FAKE_LLM_LATENCY", "fixed:0")
+    sys.path.insert(0, BACKEND_DIR)
+    os.chdir(tempfile.mkdtemp(prefix="review-mem-"))
+
+    from app.utils.database import create_db
+    from app.analyzer_logic.graph import analyze_code
+
+    create_db()
+    if args.language == "react":
+        unit = "export const Item = (props) => <div className=\"item\">{props.name}</div>;\n"
+    else:
+        unit = "def handler(request):\n    return {'status': request.get('status')}\n\n"
+    code = unit * int(args.code_mb * 1024 * 1024 / len(unit))
+
+    tracemalloc.start()
+    started = time.monotonic()
+    analyze_code(code, "bench-user", "bench-job")
+    elapsed = time.monotonic() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    code_mb = len(code) / (1024 * 1024)
+    peak_mb = peak / (1024 * 1024)
+    print(json.dumps({
+        "language": args.language,
+        "code_mb": round(code_mb, 2),
+        "peak_traced_mb": round(peak_mb, 2),
+        "peak_over_code_size": round(peak_mb / code_mb, 2),
+        "elapsed_seconds": round(elapsed, 3),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Import-time profile of the API entry point, as a startup regression check.
+
+Runs `python -X importtime -c "import main"` in a fresh interpreter (and a
+scratch working directory), prints the slowest imports, and exits non-zero
+when importing main loads any of the deferred analyzer-stack packages or
+takes longer than --budget-ms:
+
+    python benchmarks/bench_import.py --budget-ms 1000
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# loaded by app.utils.warmup or the first job, never by importing the API
+DEFERRED = ("langgraph", "langchain_aws", "langchain_core", "boto3", "botocore", "app.analyzer_logic.graph")
+
+
+def profile(module: str) -> dict:
+    """module -> (self µs, cumulative µs) from -X importtime."""
+    env = dict(os.environ, PYTHONPATH=BACKEND_DIR)
+    stderr = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], env=env,
+                            cwd=tempfile.mkdtemp(prefix="review-import-"), capture_output=True, text=True,
+                            check=True).stderr
+    timings = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = (field.strip() for field in line[len("import time:"):].split("|"))
+        timings[name] = (int(self_us), int(cumulative_us))
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import-time profile of main.")
+    parser.add_argument("--module", default="main")
+    parser.add_argument("--budget-ms", type=float, default=1000)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    timings = profile(args.module)
+    total_ms = timings[args.module][1] / 1000
+    deferred = sorted(name for name in timings if name.split(".")[0] in DEFERRED or name in DEFERRED)
+    slowest = sorted(timings.items(), key=lambda item: item[1][1], reverse=True)[:args.top]
+    print(json.dumps({
+        "module": args.module,
+        "import_ms": round(total_ms, 1),
+        "budget_ms": args.budget_ms,
+        "modules_loaded": len(timings),
+        "deferred_modules_loaded": deferred[:20],
+        "slowest_cumulative_ms": {name: round(cumulative / 1000, 1) for name, (_, cumulative) in slowest},
+    }, indent=2))
+
+    if deferred:
+        sys.exit(f"importing {args.module} loads deferred modules: {', '.join(deferred[:5])}")
+    if total_ms > args.budget_ms:
+        sys.exit(f"importing {args.module} took {total_ms:.0f} ms, over the {args.budget_ms:.0f} ms budget")
+
+
+if __name__ == "__main__":
+    main()
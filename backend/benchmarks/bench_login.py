@@ -0,0 +1,69 @@
+"""
+Password verification throughput against KDF pool size.
+
+For each pool size, verifies --logins passwords concurrently through
+PasswordHasher (the path /api/auth/login uses) and reports logins/s plus the
+worst event-loop stall seen meanwhile, which should stay near zero because
+the KDF runs in worker processes:
+
+    python benchmarks/bench_login.py --pool-sizes 1,2,4,8 --logins 200
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+async def loop_lag(stop: asyncio.Event, interval: float = 0.005) -> float:
+    worst = 0.0
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        worst = max(worst, time.perf_counter() - start - interval)
+    return worst
+
+
+async def run_pool(pool_size: int, stored: str, logins: int) -> dict:
+    from app.utils.passwords import PasswordHasher
+
+    hasher = PasswordHasher(pool_size)
+    await hasher.verify("warmup", stored)  # fork workers outside the timing
+
+    stop = asyncio.Event()
+    lag = asyncio.create_task(loop_lag(stop))
+    started = time.perf_counter()
+    results = await asyncio.gather(*(hasher.verify("correct horse", stored) for _ in range(logins)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    worst_lag = await lag
+    hasher.shutdown()
+
+    assert all(matches for matches, _ in results)
+    return {
+        "pool_size": pool_size,
+        "logins": logins,
+        "logins_per_second": round(logins / elapsed, 1),
+        "max_event_loop_lag_ms": round(worst_lag * 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Login throughput vs KDF pool size.")
+    parser.add_argument("--pool-sizes", default="1,2,4,8")
+    parser.add_argument("--logins", type=int, default=200)
+    args = parser.parse_args()
+
+    sys.path.insert(0, BACKEND_DIR)
+    from app.utils.passwords import hash_password_sync
+
+    stored = hash_password_sync("correct horse")
+    report = [asyncio.run(run_pool(int(size), stored, args.logins)) for size in args.pool_sizes.split(",")]
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
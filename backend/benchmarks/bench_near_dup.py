@@ -0,0 +1,128 @@
+"""
+Hit rate and lookup latency of the near-duplicate cache.
+
+Indexes a corpus of generated Python and React files, then looks up
+resubmissions that differ only in whitespace, comments, variable names or
+import order (which should hit), and unrelated files, resubmissions with one
+function appended and resubmissions by another user under
+FINDINGS_ISOLATION=user (which should all miss):
+
+    python benchmarks/bench_near_dup.py --files 500
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+WORDS = ["user", "order", "item", "price", "total", "cache", "queue", "token", "record", "payload",
+         "count", "limit", "buffer", "report", "config", "result", "value", "entry", "batch", "score"]
+MODULES = ["os", "sys", "json", "time", "re", "math", "random", "hashlib", "itertools", "collections"]
+
+
+def python_file(rng: random.Random) -> str:
+    imports = rng.sample(MODULES, 4)
+    lines = [f"import {name}" for name in imports] + [""]
+    for f in range(rng.randint(3, 6)):
+        a, b, c = rng.sample(WORDS, 3)
+        lines += [
+            f"def {a}_{b}_{f}({a}, {b}):",
+            f"    {c} = []",
+            f"    for i in range({b}):",
+            f"        if i % {rng.randint(2, 9)} == 0:",
+            f"            {c}.append({a} * i + {rng.randint(1, 99)})",
+            f"    return {imports[f % 4]}.{rng.choice(['dumps', 'sleep', 'floor', 'sha256', 'chain'])}({c})",
+            "",
+        ]
+    return "\n".join(lines)
+
+
+def react_file(rng: random.Random) -> str:
+    a, b, c = rng.sample(WORDS, 3)
+    return "\n".join([
+        'import React, { useState } from "react";',
+        f'import {{ {b}Api }} from "./{b}";',
+        f"export const {a.title()}Card = (props) => {{",
+        f"  const [{c}, set{c.title()}] = useState({rng.randint(0, 9)});",
+        f"  const on{b.title()} = () => set{c.title()}({c} + {rng.randint(1, 5)});",
+        f'  return <div className="{a}-card" onClick={{on{b.title()}}}>{{props.{a}}} {{{c}}}</div>;',
+        "};",
+        "",
+    ])
+
+
+def resubmission(code: str, rng: random.Random) -> str:
+    """Whitespace, comment, rename and import-order noise that should still hit."""
+    lines = code.split("\n")
+    imports = [line for line in lines if line.startswith("import ")]
+    rest = [line for line in lines if not line.startswith("import ")]
+    rng.shuffle(imports)
+    comment = "//" if "React" in code else "#"
+    noisy = []
+    for line in imports + rest:
+        noisy.append(line.rstrip() + ("   " if rng.random() < 0.3 else ""))
+        if rng.random() < 0.15:
+            noisy.append(f"{comment} reviewed {rng.randint(1, 1000)}")
+    text = "\n".join(noisy)
+    for word in rng.sample(WORDS, 3):
+        text = text.replace(f"{word}", f"{word}_v2")
+    return text
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Near-duplicate cache hit rate and lookup latency.")
+    parser.add_argument("--files", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    sys.path.insert(0, BACKEND_DIR)
+    from app.analyzer_logic.near_dup import NearDuplicateIndex
+
+    rng = random.Random(args.seed)
+    index = NearDuplicateIndex(capacity=args.files * 2)
+    corpus = []
+    for i in range(args.files):
+        language = "react" if i % 4 == 0 else "python"
+        code = react_file(rng) if language == "react" else python_file(rng)
+        corpus.append((language, code))
+        index.add(f"job-{i}", code, index.fingerprint(code, language, "alice"), {
+            "code_analysis": "Issue on line 3.", "security_report": "No security issues found.",
+        })
+
+    def measure(samples, scope="alice"):
+        hits, latencies = 0, []
+        for language, code in samples:
+            started = time.perf_counter()
+            hit = index.lookup(code, index.fingerprint(code, language, scope))
+            assert hit is None or "security_report" not in hit[0]
+            latencies.append(time.perf_counter() - started)
+            hits += hit is not None
+        latencies.sort()
+        return {
+            "hit_rate": round(hits / len(samples), 3),
+            "lookup_p50_ms": round(statistics.median(latencies) * 1000, 3),
+            "lookup_p99_ms": round(latencies[int(len(latencies) * 0.99) - 1] * 1000, 3),
+        }
+
+    variants = [(language, resubmission(code, rng)) for language, code in corpus]
+    unrelated = [(lang, react_file(rng) if lang == "react" else python_file(rng)) for lang, _ in corpus]
+    appended = [
+        (language, code + ("\nexport const RunCmd = (props) => {\n  return eval(props.cmd);\n};\n" if language == "react" else
+                           "\ndef run_cmd(request):\n    import subprocess\n    return subprocess.call(request.get('cmd'), shell=True)\n"))
+        for language, code in corpus
+    ]
+    print(json.dumps({
+        "indexed": args.files,
+        "resubmissions": measure(variants),
+        "unrelated": measure(unrelated),
+        "appended_unit": measure(appended),
+        "other_user": measure(corpus, scope="bob"),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
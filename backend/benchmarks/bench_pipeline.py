@@ -0,0 +1,235 @@
+"""
+End-to-end load test for submit -> background task -> graph -> SQLite -> report file.
+
+Starts the API under uvicorn with the offline stand-in model (LLM_PROVIDER=fake)
+in a scratch directory, drives /api/file/submit_code plus status polling at the
+requested concurrency, then reports throughput, job latency percentiles, server
+side queueing delay, SQLite wait/lock counts and memory per in-flight job.
+
+    python benchmarks/bench_pipeline.py --jobs 200 --concurrency 20 \\
+        --latency lognormal:1.5:0.6 --code-kb 16
+
+Only the standard library is needed on the client side.
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SAMPLE_FUNCTION = '''
+def process_records(records, threshold=10):
+    results = []
+    for record in records:
+        if record["value"] > threshold:
+            results.append({"id": record["id"], "score": record["value"] * 2})
+    return results
+'''
+
+
+def make_code(size_kb: int) -> str:
+    chunks = []
+    while sum(len(c) for c in chunks) < size_kb * 1024:
+        chunks.append(SAMPLE_FUNCTION.replace("process_records", f"process_records_{len(chunks)}"))
+    return "import json\n" + "".join(chunks)
+
+
+def request(url: str, payload: dict = None, timeout: float = 30, token: str = None):
+    data = json.dumps(payload).encode() if payload is not None else None
+    headers = {"Content-Type": "application/json"}
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+    req = urllib.request.Request(url, data=data, headers=headers)
+    with urllib.request.urlopen(req, timeout=timeout) as response:
+        body = response.read()
+    return json.loads(body) if body[:1] in (b"{", b"[") else body.decode()
+
+
+def percentile(values, pct):
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * pct / 100), len(ordered) - 1)]
+
+
+def rss_mb(pid: int):
+    """Resident set size of a process in MB (Linux only)."""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        return None
+    return None
+
+
+def parse_metrics(text: str) -> dict:
+    values = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            name, _, value = line.rpartition(" ")
+            values[name] = float(value)
+    return values
+
+
+def metric_sum(values: dict, prefix: str) -> float:
+    return sum(v for k, v in values.items() if k.startswith(prefix))
+
+
+def start_server(workdir: str, port: int, args) -> subprocess.Popen:
+    env = dict(os.environ)
+    env.update({
+        "LLM_PROVIDER": "fake",
+        "FAKE_LLM_LATENCY": args.latency,
+        "FAKE_LLM_OUTPUT_TOKENS": str(args.output_tokens),
+        "FAKE_LLM_ERROR_RATE": str(args.error_rate),
+        "PYTHONPATH": BACKEND_DIR,
+    })
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--app-dir", BACKEND_DIR,
+         "--port", str(port), "--log-level", "warning"],
+        cwd=workdir,
+        env=env,
+    )
+    base = f"http://127.0.0.1:{port}"
+    for _ in range(100):
+        try:
+            request(f"{base}/metrics", timeout=1)
+            return process
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("Server did not start")
+
+
+def run(args):
+    workdir = tempfile.mkdtemp(prefix="review-bench-")
+    base = f"http://127.0.0.1:{args.port}"
+    server = start_server(workdir, args.port, args)
+    code = make_code(args.code_kb)
+    # jobs are owned by the signed-in user
+    tokens = {
+        username: request(f"{base}/api/auth/register", {
+            "username": username, "email": f"{username}@example.com", "password": "bench-password"
+        })["access_token"]
+        for username in (f"bench-user-{index}" for index in range(args.users))
+    }
+
+    in_flight = 0
+    in_flight_lock = threading.Lock()
+    memory_samples = []  # (rss_mb, in_flight)
+    stop_sampling = threading.Event()
+
+    def sample_memory():
+        while not stop_sampling.is_set():
+            rss = rss_mb(server.pid)
+            if rss is not None:
+                memory_samples.append((rss, in_flight))
+            time.sleep(0.1)
+
+    def run_job(index: int):
+        nonlocal in_flight
+        username = f"bench-user-{index % args.users}"
+        submitted = time.monotonic()
+        job = request(f"{base}/api/file/submit_code", {"code": code}, token=tokens[username])
+        submit_latency = time.monotonic() - submitted
+        with in_flight_lock:
+            in_flight += 1
+        try:
+            while True:
+                time.sleep(args.poll_interval)
+                status = request(f"{base}/api/file/job/{username}/{job['job_id']}", token=tokens[username])
+                if status["status"] not in ("processing", "queued", "running"):
+                    return status["status"], time.monotonic() - submitted, submit_latency
+                if time.monotonic() - submitted > args.job_timeout:
+                    return "timed_out", time.monotonic() - submitted, submit_latency
+        finally:
+            with in_flight_lock:
+                in_flight -= 1
+
+    baseline_rss = rss_mb(server.pid)
+    sampler = threading.Thread(target=sample_memory, daemon=True)
+    sampler.start()
+
+    started = time.monotonic()
+    try:
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            results = list(pool.map(run_job, range(args.jobs)))
+        elapsed = time.monotonic() - started
+        metrics = parse_metrics(request(f"{base}/metrics"))
+    finally:
+        stop_sampling.set()
+        server.terminate()
+        server.wait(timeout=10)
+        if not args.keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    latencies = [r[1] for r in results]
+    submit_latencies = [r[2] for r in results]
+    statuses = {}
+    for status, _, _ in results:
+        statuses[status] = statuses.get(status, 0) + 1
+
+    queue_count = metrics.get("review_job_queue_wait_seconds_count", 0)
+    queue_sum = metrics.get("review_job_queue_wait_seconds_sum", 0)
+    peak_rss, in_flight_at_peak = max(memory_samples, default=(baseline_rss or 0, 0))
+    busiest = max((s for s in memory_samples if s[1]), key=lambda s: s[1], default=None)
+
+    report = {
+        "jobs": args.jobs,
+        "concurrency": args.concurrency,
+        "latency_spec": args.latency,
+        "code_kb": args.code_kb,
+        "statuses": statuses,
+        "elapsed_seconds": round(elapsed, 3),
+        "throughput_jobs_per_second": round(args.jobs / elapsed, 3),
+        "submit_p50_ms": round(percentile(submit_latencies, 50) * 1000, 1),
+        "submit_p99_ms": round(percentile(submit_latencies, 99) * 1000, 1),
+        "job_latency_p50_seconds": round(percentile(latencies, 50), 3),
+        "job_latency_p95_seconds": round(percentile(latencies, 95), 3),
+        "job_latency_p99_seconds": round(percentile(latencies, 99), 3),
+        "job_latency_mean_seconds": round(statistics.mean(latencies), 3),
+        "queue_wait_mean_seconds": round(queue_sum / queue_count, 3) if queue_count else None,
+        "db_wait_seconds_total": round(metric_sum(metrics, "review_db_wait_seconds_sum"), 3),
+        "db_statements": int(metric_sum(metrics, "review_db_wait_seconds_count")),
+        "db_lock_errors": int(metric_sum(metrics, "review_db_lock_errors_total")),
+        "baseline_rss_mb": baseline_rss,
+        "peak_rss_mb": peak_rss,
+        "memory_per_in_flight_job_mb": (
+            round((busiest[0] - baseline_rss) / busiest[1], 2) if busiest and baseline_rss else None
+        ),
+        "in_flight_at_peak_rss": in_flight_at_peak,
+    }
+    print(json.dumps(report, indent=2))
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--jobs", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--users", type=int, default=5, help="distinct usernames to spread jobs over")
+    parser.add_argument("--code-kb", type=int, default=8)
+    parser.add_argument("--latency", default="lognormal:0.5:0.5", help="fake LLM latency spec, see app/utils/fake_llm.py")
+    parser.add_argument("--output-tokens", type=int, default=400)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--poll-interval", type=float, default=0.25)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--keep", action="store_true", help="keep the scratch directory with db.sqlite and reports")
+    parser.add_argument("--job-timeout", type=float, default=600, help="give up polling a job after this many seconds")
+    args = parser.parse_args()
+    run(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Prompt assembly cost for a large submission.
+
+Compares, for a --size byte input (1 MB by default), the former per-call
+f-string path with the template registry. The former path interpolates the
+code into the prompt, scans the prompt for the code and rewrites it when
+indexed units are elided, then appends the unit and budget instructions.
+The template path renders the elided code and the instructions in one join.
+Prints time per assembly and peak allocation of each:
+
+    python benchmarks/bench_prompts.py --size 1000000
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+UNIT = "def handler_{n}(request):\n    value = request.get('v{n}')\n    if value:\n        return value * {n}\n    return None\n\n"
+
+
+def measure(fn, repeat: int) -> dict:
+    fn()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    seconds = (time.perf_counter() - started) / repeat
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"ms": round(seconds * 1000, 3), "peak_bytes": peak}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prompt assembly: f-strings vs the template registry.")
+    parser.add_argument("--size", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    sys.path.insert(0, BACKEND_DIR)
+    from app.analyzer_logic.templates import PromptRegistry
+
+    registry = PromptRegistry()
+    template = registry.get("python/security_report")
+    code = "".join(UNIT.format(n=n) for n in range(args.size // len(UNIT) + 1))[:args.size]
+    # a few indexed units blanked out, as the findings index does
+    elided = code.replace("def handler_1(", "# [handler_1: reviewed earlier]\n#", 1)
+    instructions = "\n\nAfter the report, add a final section `## Findings by Unit`...\n- unit: handler_2"
+    note = "\n\nKeep the whole answer under about 1500 words."
+    with open(os.path.join(registry.directory, "python", "security_report.txt"), encoding="utf-8") as f:
+        prefix, suffix = f.read().split("{{code}}")
+
+    def fstring_path():
+        prompt = f"""{prefix}{code}{suffix}"""
+        if code in prompt:
+            prompt = prompt.replace(code, elided, 1)
+        prompt += instructions
+        prompt += note
+        return prompt
+
+    def template_path():
+        return template.render(code=elided, extra=(instructions, note))
+
+    assert fstring_path() == template_path()
+    print(json.dumps({
+        "input_bytes": len(code),
+        "template_version": template.version,
+        "fstring": measure(fstring_path, args.repeat),
+        "template": measure(template_path, args.repeat),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+LLM calls saved by resuming a killed job from its graph checkpoint.
+
+Starts a review in a child process against the offline stand-in model,
+SIGKILLs it once some (but not all) analyzer branches have written their
+results to the checkpoint database, then retries the same job_id in this
+process and counts the LLM calls the retry made:
+
+    python benchmarks/bench_resume.py
+"""
+import argparse
+import json
+import os
+import signal
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+JOB_ID = "bench-resume-job"
+USER_ID = "bench-user"
+CODE = "def handler(request):\n    return {'status': request.get('status')}\n\n" * 200
+PYTHON_SECTIONS = ["code_analysis", "security_report", "performance_report",
+                   "best_practices_report", "complexity_report", "documentation_report"]
+
+
+def finished_sections(checkpoint_db: str) -> set:
+    """Analyzer state keys written to the checkpoint so far."""
+    if not os.path.exists(checkpoint_db):
+        return set()
+    try:
+        db = sqlite3.connect(checkpoint_db, timeout=1)
+        rows = db.execute("SELECT DISTINCT channel FROM writes WHERE thread_id = ?", (JOB_ID,)).fetchall()
+        db.close()
+    except sqlite3.OperationalError:
+        # the table does not exist until the checkpointer's first write
+        return set()
+    return {row[0] for row in rows} & set(PYTHON_SECTIONS)
+
+
+def run_child():
+    from app.utils.database import create_db
+    from app.analyzer_logic.graph import analyze_code
+
+    create_db()
+    analyze_code(CODE, USER_ID, JOB_ID)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="LLM calls saved by checkpoint resume.")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--kill-after", type=int, default=3, help="finished branches before the kill")
+    args = parser.parse_args()
+
+    sys.path.insert(0, BACKEND_DIR)
+    if args.child:
+        run_child()
+        return
+
+    workdir = tempfile.mkdtemp(prefix="review-resume-")
+    os.chdir(workdir)
+    os.environ["LLM_PROVIDER"] = "fake"
+    # spread branch latencies so the kill lands mid-fanout
+    os.environ["FAKE_LLM_LATENCY"] = "uniform:0.2:4"
+    os.environ["CHECKPOINT_DB_PATH"] = os.path.join(workdir, "checkpoints.sqlite")
+    checkpoint_db = os.environ["CHECKPOINT_DB_PATH"]
+
+    child = subprocess.Popen([sys.executable, os.path.abspath(__file__), "--child"], cwd=workdir)
+    while len(finished_sections(checkpoint_db)) < args.kill_after and child.poll() is None:
+        time.sleep(0.05)
+    os.kill(child.pid, signal.SIGKILL)
+    child.wait()
+    before_kill = finished_sections(checkpoint_db)
+
+    from app.utils.database import get_db_connection
+    from app.analyzer_logic.graph import analyze_code
+
+    started = time.monotonic()
+    result = analyze_code(CODE, USER_ID, JOB_ID)
+    elapsed = time.monotonic() - started
+
+    db, conn = get_db_connection()
+    conn.execute("SELECT name FROM job_metrics WHERE job_id = ? AND kind = 'llm'", (JOB_ID,))
+    resumed_calls = sorted(row[0] for row in conn.fetchall())
+    conn.close()
+
+    rerun = sorted(set(resumed_calls) & before_kill)
+    print(json.dumps({
+        "finished_before_kill": sorted(before_kill),
+        "llm_calls_on_resume": resumed_calls,
+        "full_run_llm_calls": len(PYTHON_SECTIONS) + 1,
+        "finished_branches_rerun": rerun,
+        "resume_seconds": round(elapsed, 3),
+        "report_key": result["report_key"],
+    }, indent=2))
+    sys.exit(1 if rerun else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Database and report storage size under sustained load, with retention.
+
+Simulates --rounds rounds of --jobs finished jobs (spread over --users users,
+each with a report and job_metrics rows, a few orphaned reports and a few
+jobs aged past the retention window) in a scratch directory, running one
+compactor pass after each round. Prints the database size and report count
+after each pass; both stay flat once the per-user limit is reached:
+
+    python benchmarks/bench_retention.py --rounds 5 --jobs 2000 --per-user 100
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+REPORT = ("## Code Review\n\n" + "- finding: unchecked input in handler\n" * 60).encode("utf-8")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Database and storage size under load, with retention.")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--jobs", type=int, default=2000, help="finished jobs per round")
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--per-user", type=int, default=100)
+    parser.add_argument("--max-age-days", type=float, default=30)
+    args = parser.parse_args()
+
+    scratch = tempfile.mkdtemp(prefix="review-retention-")
+    os.environ.update(DB_PATH=os.path.join(scratch, "db.sqlite"), STORAGE_URL=scratch,
+                      CHECKPOINT_DB_PATH="", COMPACT_INTERVAL_SECONDS="0")
+    sys.path.insert(0, BACKEND_DIR)
+    from app.utils.database import create_db, get_db_connection
+    from app.utils.storage import get_storage
+    from app.utils.compactor import JobCompactor
+
+    create_db()
+    storage = get_storage()
+    compactor = JobCompactor(max_age_days=args.max_age_days, per_user=args.per_user, orphan_grace_seconds=0)
+    users = [f"user{n}" for n in range(args.users)]
+    rounds = []
+    for round_number in range(args.rounds):
+        db, conn = get_db_connection()
+        for n in range(args.jobs):
+            job_id, username = str(uuid.uuid4()), users[n % len(users)]
+            # metrics from earlier days, so the daily quota does not pin the jobs
+            created = datetime.now() - timedelta(days=2 + (args.max_age_days if n % 20 == 0 else 0), seconds=-n)
+            report_key = f"{username}/{job_id}.md"
+            storage.put(report_key, REPORT)
+            conn.execute("INSERT INTO job(job_id,status,username,path,created_at) VALUES (?, ?, ?, ?, ?)",
+                         (job_id, "completed", username, report_key, created.isoformat()))
+            conn.executemany("INSERT INTO job_metrics(job_id,name,kind,wall_seconds,input_tokens,output_tokens,created_at) "
+                             "VALUES (?, ?, 'llm', 1.0, 2000, 800, ?)",
+                             [(job_id, section, created.strftime("%Y-%m-%d %H:%M:%S")) for section in range(8)])
+            if n % 50 == 0:
+                storage.put(f"{username}/{uuid.uuid4()}.md", REPORT)
+        db.commit()
+        conn.close()
+
+        started = time.monotonic()
+        result = compactor.run_once()
+        db, conn = get_db_connection()
+        conn.execute("SELECT COUNT(*) FROM job")
+        jobs = conn.fetchone()[0]
+        conn.close()
+        rounds.append({
+            "round": round_number + 1,
+            "pass_seconds": round(time.monotonic() - started, 3),
+            "jobs_deleted": result["jobs_deleted"],
+            "orphans_deleted": result["orphans_deleted"]["report"],
+            "pages_vacuumed": result["pages_vacuumed"],
+            "jobs_kept": jobs,
+            "reports_kept": sum(1 for username in users for _ in storage.scan(f"{username}/")),
+            "db_bytes": os.path.getsize(os.environ["DB_PATH"]),
+        })
+    print(json.dumps({"bound_jobs": args.users * args.per_user, "rounds": rounds}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
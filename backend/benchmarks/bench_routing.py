@@ -0,0 +1,74 @@
+"""
+Cost of adaptive model routing against sending every call to the premier model.
+
+Runs the same mix of small, medium and large Python and React submissions
+once with LLM_ROUTING=fixed and once with LLM_ROUTING=adaptive against the
+offline stand-in model, then prints the per-route report of each run and the
+estimated savings:
+
+    python benchmarks/bench_routing.py --jobs 6
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PYTHON_UNIT = "def handler(request):\n    return {'status': request.get('status')}\n\n"
+REACT_UNIT = "export const Item = (props) => <div className=\"item\">{props.name}</div>;\n"
+SIZES = {"small": 2_000, "medium": 20_000, "large": 80_000}
+
+
+def run_mode(jobs: int):
+    sys.path.insert(0, BACKEND_DIR)
+    os.chdir(tempfile.mkdtemp(prefix="review-routing-"))
+    from app.utils.database import create_db
+    from app.analyzer_logic.graph import analyze_code
+    from app.analyzer_logic.routing import router
+
+    create_db()
+    for i in range(jobs):
+        unit = REACT_UNIT if i % 2 else PYTHON_UNIT
+        size = list(SIZES.values())[i % len(SIZES)]
+        code = (unit * (size // len(unit) + 1))[:size] + f"\n# job {i}\n"
+        analyze_code(code, "bench-user", f"bench-job-{i}")
+    print(json.dumps(router.report()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Adaptive vs fixed model routing cost.")
+    parser.add_argument("--jobs", type=int, default=6)
+    parser.add_argument("--mode", choices=["fixed", "adaptive"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        run_mode(args.jobs)
+        return
+
+    reports = {}
+    for mode in ("fixed", "adaptive"):
+        env = dict(os.environ, LLM_PROVIDER="fake", FAKE_LLM_LATENCY="fixed:0", FAKE_LLM_OUTPUT_TOKENS="3000",
+                   LLM_ROUTING=mode, NEAR_DUP_CACHE_SIZE="0", FINDINGS_ISOLATION="off", CHECKPOINT_DB_PATH="")
+        output = subprocess.run([sys.executable, os.path.abspath(__file__), "--mode", mode, "--jobs", str(args.jobs)],
+                                env=env, check=True, capture_output=True, text=True).stdout
+        reports[mode] = json.loads(output.strip().splitlines()[-1])
+
+    fixed, adaptive = reports["fixed"]["cost_usd"], reports["adaptive"]["cost_usd"]
+    print(json.dumps({
+        "jobs": args.jobs,
+        "fixed_cost_usd": round(fixed, 4),
+        "adaptive_cost_usd": round(adaptive, 4),
+        "savings_pct": round(100 * (fixed - adaptive) / fixed, 1) if fixed else 0.0,
+        "adaptive_routes": {
+            name: {"model": stats["model"], "max_tokens": stats["max_tokens"], "calls": stats["calls"],
+                   "output_tokens": stats["output_tokens"], "cost_usd": round(stats["cost_usd"], 4)}
+            for name, stats in sorted(reports["adaptive"]["routes"].items())
+        },
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Webhook delivery throughput, retries and connection reuse.
+
+Queues --events job notifications to a local WebhookReceiver that fails the
+first --fail-first attempts of each delivery, then waits for all of them.
+Prints deliveries per second, retries, and connections opened, which stays
+near the pool size rather than growing with the number of deliveries:
+
+    python benchmarks/bench_webhooks.py --events 2000 --workers 4 --fail-first 1
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import uuid
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Webhook delivery throughput and connection reuse.")
+    parser.add_argument("--events", type=int, default=2000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--pool-per-host", type=int, default=4)
+    parser.add_argument("--fail-first", type=int, default=1, help="attempts of each delivery the receiver rejects")
+    parser.add_argument("--backoff", type=float, default=0.05)
+    parser.add_argument("--timeout", type=float, default=60)
+    args = parser.parse_args()
+
+    sys.path.insert(0, BACKEND_DIR)
+    from app.utils.notifier import WebhookNotifier, ConnectionPool, job_event
+    from app.utils.fake_webhook_receiver import WebhookReceiver
+
+    secret = uuid.uuid4().hex
+    receiver = WebhookReceiver(secret, fail_first=args.fail_first)
+    httpd = receiver.serve(port=0)
+    url = f"http://127.0.0.1:{httpd.server_address[1]}/hooks/review"
+    notifier = WebhookNotifier(secret, queue_size=args.events, workers=args.workers, max_attempts=args.fail_first + 3,
+                               backoff_seconds=args.backoff, pool=ConnectionPool(per_host=args.pool_per_host, allowed_hosts=["127.0.0.1"]))
+
+    started = time.monotonic()
+    queued = sum(notifier.notify(url, job_event(str(uuid.uuid4()), "completed")) for _ in range(args.events))
+    delivered = receiver.wait_for(queued, args.timeout)
+    elapsed = time.monotonic() - started
+    notifier.stop(timeout=0)
+    httpd.shutdown()
+
+    print(json.dumps({
+        "events": args.events,
+        "queued": queued,
+        "delivered": len(receiver.deliveries),
+        "all_delivered": delivered,
+        "verified": sum(1 for delivery in receiver.deliveries if delivery["verified"]),
+        "attempts": sum(receiver.attempts.values()),
+        "connections_opened": notifier.pool.opened,
+        "receiver_connections": receiver.connections,
+        "seconds": round(elapsed, 3),
+        "deliveries_per_second": round(len(receiver.deliveries) / elapsed, 1) if elapsed else None,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,47 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from app.utils.database import create_db
 from app.routes.auth_routes import auth_routes
 from app.routes.file_routes import file_router
+from app.routes.metrics_routes import metrics_router
+from app.utils.session_store import session_store
+from app.utils.passwords import password_hasher
+from app.utils.scheduler import scheduler
+from app.supervisor import worker_supervisor
+from app.utils.warmup import warmup
+from app.utils.compactor import compactor
+from app.utils.notifier import notifier
+from app.utils.config import MAX_REQUEST_BYTES, JOB_DISPATCH
 # from app.routes.sessions_router import sessions_router
 
 
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # worker children only pull from the broker; with local dispatch they would never get a job
+    if worker_supervisor is not None and JOB_DISPATCH != "broker":
+        raise RuntimeError("WORKER_PROCESSES > 0 requires JOB_DISPATCH=broker")
+    create_db()
+    warmup.start()
+    session_store.start_sweeper()
+    compactor.start()
+    # in broker mode reviews run in app.worker processes, not in API nodes
+    if JOB_DISPATCH == "local":
+        scheduler.start()
+    if worker_supervisor is not None:
+        worker_supervisor.start()
+    yield
+    if worker_supervisor is not None:
+        worker_supervisor.stop()
+    scheduler.stop()
+    compactor.stop()
+    notifier.stop()
+    session_store.stop_sweeper()
+    password_hasher.shutdown()
 
-create_db()
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -18,10 +50,17 @@ app.add_middleware(
     allow_headers=["*"],  # Allows all headers
 )
 
-jobs = {}
+@app.middleware("http")
+async def limit_request_size(request: Request, call_next):
+    # reject before the body is read or parsed; streamed uploads enforce their own limit
+    length = request.headers.get("content-length")
+    if length and length.isdigit() and int(length) > MAX_REQUEST_BYTES:
+        return JSONResponse(status_code=413, content={"detail": "Request body too large."})
+    return await call_next(request)
 
 app.include_router(auth_routes, prefix="/api/auth", tags=["Authentication"])
 app.include_router(file_router, prefix="/api/file", tags=["File"])
+app.include_router(metrics_router, tags=["Metrics"])
 # app.include_router(sessions_router, prefix="/api/sessions", tags=["Sessions"])
 
 if __name__ == "__main__":
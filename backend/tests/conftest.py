@@ -0,0 +1,28 @@
+"""
+Tests run against the offline stand-in model, with every database, report
+and spool file in a scratch directory. app.utils.config reads the
+environment on import, so it is set here before any app module loads.
+"""
+import os
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WORK_DIR = tempfile.mkdtemp(prefix="review-tests-")
+
+os.environ.update({
+    "LLM_PROVIDER": "fake",
+    "FAKE_LLM_LATENCY": "fixed:0",
+    "DB_PATH": os.path.join(WORK_DIR, "db.sqlite"),
+    "CHECKPOINT_DB_PATH": os.path.join(WORK_DIR, "checkpoints.sqlite"),
+    "STORAGE_URL": os.path.join(WORK_DIR, "storage"),
+    "UPLOAD_SPOOL_DIR": os.path.join(WORK_DIR, "uploads"),
+    "BROKER_URL": "sqlite:///" + os.path.join(WORK_DIR, "broker.sqlite"),
+    # reuse across submissions would hide which sections a run called
+    "FINDINGS_ISOLATION": "off",
+    "NEAR_DUP_CACHE_SIZE": "0",
+    "ANALYZER_WARMUP": "lazy",
+    "COMPACT_INTERVAL_SECONDS": "0",
+    "BATCH_POLL_SECONDS": "0.05",
+})
+sys.path.insert(0, BACKEND_DIR)
@@ -0,0 +1,60 @@
+import pytest
+from app.utils.batch_client import BatchClient, HttpBatchClient
+from app.utils.database import create_db, get_db_connection
+from app.utils.fake_batch_server import FakeBatchServer
+from app.analyzer_logic.batching import BatchSession
+from app.analyzer_logic.errors import THROTTLED
+from app.bulk_review import review_files
+
+UNIT = "def handler_{n}(request):\n    value = request.get('value_{n}')\n    if value:\n        return value * {n}\n    return None\n\n"
+
+
+class ThrottledBatchClient(BatchClient):
+    def submit(self, model_id: str, records: list) -> str:
+        raise RuntimeError("ThrottlingException: too many batch jobs")
+
+
+@pytest.fixture(autouse=True)
+def database():
+    create_db()
+
+
+@pytest.fixture
+def files(tmp_path):
+    paths = []
+    for i in range(4):
+        path = tmp_path / f"file_{i}.py"
+        path.write_text("import os\n\n" + UNIT.format(n=i) + UNIT.format(n=i + 10))
+        paths.append(str(path))
+    return paths
+
+
+def job_rows(rows: list) -> dict:
+    db, conn = get_db_connection()
+    conn.execute(f"SELECT job_id, status, error_code FROM job WHERE job_id IN ({','.join('?' * len(rows))})",
+                 [row[1] for row in rows])
+    found = {job_id: (status, error_code) for job_id, status, error_code in conn.fetchall()}
+    conn.close()
+    return found
+
+
+def test_session_keeps_nothing_for_finished_chunks(files):
+    httpd = FakeBatchServer().serve(port=0)
+    try:
+        session = BatchSession(HttpBatchClient(f"http://127.0.0.1:{httpd.server_address[1]}"))
+        rows = review_files(files, "bulk-user", chunk=2, session=session)
+    finally:
+        httpd.shutdown()
+
+    assert [row[2] for row in rows] == ["completed"] * len(files)
+    assert session.batches >= 4 and session.records > 0
+    assert not (session._results or session._pending or session._waiting or session._keys or session._delivered)
+
+
+def test_failed_batch_fails_its_chunk(files):
+    session = BatchSession(ThrottledBatchClient())
+    rows = review_files(files, "bulk-user", chunk=2, session=session)
+
+    assert [row[2] for row in rows] == ["failed"] * len(files)
+    assert set(job_rows(rows).values()) == {("failed", THROTTLED)}
+    assert not (session._results or session._waiting or session._keys)
@@ -0,0 +1,65 @@
+import threading
+import time
+import pytest
+from app.utils.database import create_db
+from app.analyzer_logic import llm_runner
+from app.analyzer_logic.errors import REPORT_NODE
+from app.analyzer_logic.graph import get_workflow, run_review
+
+CODE = "def handler(request):\n    return {'status': request.get('status')}\n\n" * 20
+FINISHED = {"code_analysis", "complexity_report", "documentation_report"}
+INTERRUPTED = {"security_report", "performance_report", "best_practices_report"}
+
+
+class WorkerKilled(BaseException):
+    """Stands in for the worker dying: the analyzer nodes only catch Exception."""
+
+
+def checkpointed_sections(job_id: str) -> set:
+    saved = get_workflow().checkpointer.get_tuple({"configurable": {"thread_id": job_id}})
+    return {channel for _, channel, _ in (saved.pending_writes or [])} if saved else set()
+
+
+@pytest.fixture(autouse=True)
+def database():
+    create_db()
+
+
+def test_resume_reruns_only_unfinished_branches(monkeypatch):
+    job_id = "resume-test-job"
+    invoke_llm = llm_runner.invoke_llm
+    calls = []
+    calls_lock = threading.Lock()
+
+    def killed_mid_fanout(job_id, label, *args, **kwargs):
+        if label in INTERRUPTED:
+            # let the other branches land in the checkpoint, then die
+            give_up_at = time.monotonic() + 10
+            while not FINISHED <= checkpointed_sections(job_id) and time.monotonic() < give_up_at:
+                time.sleep(0.01)
+            raise WorkerKilled()
+        with calls_lock:
+            calls.append(label)
+        return invoke_llm(job_id, label, *args, **kwargs)
+
+    monkeypatch.setattr(llm_runner, "invoke_llm", killed_mid_fanout)
+    with pytest.raises(WorkerKilled):
+        run_review(CODE, job_id)
+    assert set(calls) == FINISHED
+    assert checkpointed_sections(job_id) >= FINISHED
+
+    calls.clear()
+
+    def counted(job_id, label, *args, **kwargs):
+        with calls_lock:
+            calls.append(label)
+        return invoke_llm(job_id, label, *args, **kwargs)
+
+    monkeypatch.setattr(llm_runner, "invoke_llm", counted)
+    monkeypatch.setattr("app.analyzer_logic.graph.invoke_llm", counted)
+    review = run_review(CODE, job_id)
+
+    assert sorted(calls) == sorted(INTERRUPTED | {REPORT_NODE})
+    for section in FINISHED | INTERRUPTED:
+        assert review.result_state[section].startswith("## Offline review")
+    assert review.result_state["final_documentation"]
@@ -0,0 +1,56 @@
+import threading
+import time
+import pytest
+from app.utils.database import create_db
+from app.analyzer_logic import graph, unit_findings
+from app.analyzer_logic.single_flight import SharedReview
+
+CODE = "def handler(request):\n    return request.get('status')\n"
+
+
+@pytest.fixture(autouse=True)
+def database():
+    create_db()
+
+
+def run_concurrently(monkeypatch, users: list) -> list:
+    """Submits CODE once per user while the first review is still running; returns the users whose review ran."""
+    ran = []
+    release = threading.Event()
+
+    def blocked_review(user_code, job_id, code_sha256=None, user_id=None):
+        ran.append(user_id)
+        release.wait(5)
+        return SharedReview({"errors": [], "metadata": {}, "final_documentation": "# Review\n"}, lambda key, text: None)
+
+    monkeypatch.setattr(graph, "run_review", blocked_review)
+    threads = [
+        threading.Thread(target=graph.analyze_code, args=(CODE, user, f"coalesce-{user}-{index}"))
+        for index, user in enumerate(users)
+    ]
+    threads[0].start()
+    while not ran:
+        time.sleep(0.01)
+    for thread in threads[1:]:
+        thread.start()
+    # followers attach to the leader's call before it is let go
+    time.sleep(0.2)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    return ran
+
+
+def test_users_do_not_share_reviews_under_user_isolation(monkeypatch):
+    monkeypatch.setattr(unit_findings, "FINDINGS_ISOLATION", "user")
+    assert sorted(run_concurrently(monkeypatch, ["alice", "bob"])) == ["alice", "bob"]
+
+
+def test_same_user_still_coalesces_under_user_isolation(monkeypatch):
+    monkeypatch.setattr(unit_findings, "FINDINGS_ISOLATION", "user")
+    assert run_concurrently(monkeypatch, ["alice", "alice"]) == ["alice"]
+
+
+def test_users_share_reviews_when_findings_are_tenant_wide(monkeypatch):
+    monkeypatch.setattr(unit_findings, "FINDINGS_ISOLATION", "tenant")
+    assert run_concurrently(monkeypatch, ["alice", "bob"]) == ["alice"]
@@ -0,0 +1,108 @@
+import uuid
+from datetime import datetime
+import pytest
+from fastapi.testclient import TestClient
+from app.utils.database import create_db, get_db_connection
+from app.utils.storage import get_storage
+from main import app
+
+client = TestClient(app)
+
+
+@pytest.fixture(autouse=True)
+def database():
+    create_db()
+
+
+def sign_up(username: str) -> dict:
+    response = client.post("/api/auth/register", json={
+        "username": username, "email": f"{username}@example.com", "password": "correct horse"
+    })
+    assert response.status_code == 200
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+def add_job(username: str, status: str, report: bytes = None) -> str:
+    job_id = str(uuid.uuid4())
+    path = None
+    if report is not None:
+        path = f"{username}/{job_id}.md"
+        get_storage().put(path, report)
+    db, conn = get_db_connection()
+    conn.execute("INSERT into job(job_id,status,username,created_at,path) VALUES (?, ?, ?, ?, ?)",
+                 (job_id, status, username, datetime.now().isoformat(), path))
+    db.commit()
+    conn.close()
+    return job_id
+
+
+@pytest.fixture(scope="module")
+def owners():
+    create_db()
+    suffix = uuid.uuid4().hex[:8]
+    return {name: (f"{name}-{suffix}", sign_up(f"{name}-{suffix}")) for name in ("alice", "mallory")}
+
+
+def test_report_is_served_to_its_owner_only(owners):
+    alice, alice_auth = owners["alice"]
+    _, mallory_auth = owners["mallory"]
+    job_id = add_job(alice, "completed", b"# Review\n")
+
+    assert client.get(f"/api/file/report/{job_id}").status_code in (401, 403)
+    assert client.get(f"/api/file/report/{job_id}", headers=mallory_auth).status_code == 404
+    response = client.get(f"/api/file/report/{job_id}", headers=alice_auth)
+    assert response.status_code == 200 and response.text == "# Review\n"
+
+
+def test_only_the_owner_can_cancel(owners):
+    alice, alice_auth = owners["alice"]
+    _, mallory_auth = owners["mallory"]
+    job_id = add_job(alice, "queued")
+
+    assert client.post(f"/api/file/job/{alice}/{job_id}/cancel", headers=mallory_auth).status_code == 404
+    response = client.post(f"/api/file/job/{alice}/{job_id}/cancel", headers=alice_auth)
+    assert response.status_code == 200 and response.json()["status"] == "cancelled"
+
+
+def test_login_session_resolves_to_the_same_user(owners):
+    alice, _ = owners["alice"]
+    response = client.post("/api/auth/login", json={"username": alice, "password": "correct horse"})
+    auth = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    job_id = add_job(alice, "completed", b"# Again\n")
+
+    assert client.get(f"/api/file/report/{job_id}", headers=auth).status_code == 200
+
+
+def job_owner(job_id: str) -> str:
+    db, conn = get_db_connection()
+    conn.execute("SELECT username FROM job WHERE job_id = ?", (job_id,))
+    row = conn.fetchone()
+    conn.close()
+    return row[0]
+
+
+def test_jobs_are_submitted_as_the_signed_in_user(owners):
+    alice, alice_auth = owners["alice"]
+    mallory, mallory_auth = owners["mallory"]
+
+    assert client.post("/api/file/submit_code", json={"code": "print(1)\n"}).status_code in (401, 403)
+    assert client.post("/api/file/submit_code", json={"code": "print(1)\n", "username": alice},
+                       headers=mallory_auth).status_code == 403
+    response = client.post("/api/file/submit_code", json={"code": "print(1)\n"}, headers=mallory_auth)
+    assert response.status_code == 200 and job_owner(response.json()["job_id"]) == mallory
+
+    assert client.post(f"/api/file/upload_code?username={alice}", content=b"print(2)\n",
+                       headers=mallory_auth).status_code == 403
+    response = client.post("/api/file/upload_code", content=b"print(2)\n", headers=alice_auth)
+    assert response.status_code == 200 and job_owner(response.json()["job_id"]) == alice
+
+
+def test_status_is_shown_to_its_owner_only(owners):
+    alice, alice_auth = owners["alice"]
+    _, mallory_auth = owners["mallory"]
+    job_id = add_job(alice, "failed")
+
+    assert client.get(f"/api/file/job/{alice}/{job_id}").status_code in (401, 403)
+    assert client.get(f"/api/file/job/{alice}/{job_id}", headers=mallory_auth).status_code == 404
+    response = client.get(f"/api/file/job/{alice}/{job_id}", headers=alice_auth)
+    assert response.status_code == 200 and response.json()["status"] == "failed"
@@ -0,0 +1,49 @@
+import os
+import time
+import uuid
+from datetime import datetime
+import pytest
+from app.utils.database import create_db, get_db_connection
+from app.utils.cancellation import cancellations
+from app.utils.compactor import JobCompactor
+from app.analyzer_logic.tasks import analyze_upload_task
+
+
+@pytest.fixture(autouse=True)
+def database():
+    create_db()
+
+
+def spool_file(directory, name: str, age_seconds: float) -> str:
+    path = os.path.join(directory, name)
+    with open(path, "w") as f:
+        f.write("print('queued')\n")
+    then = time.time() - age_seconds
+    os.utime(path, (then, then))
+    return path
+
+
+def test_compactor_sweeps_only_old_spool_files(tmp_path):
+    old = spool_file(tmp_path, "upload-abc123_x.code", 7200)
+    fresh = spool_file(tmp_path, "upload-def456_y.code", 10)
+    unrelated = spool_file(tmp_path, "notes.txt", 7200)
+
+    compactor = JobCompactor(stale_seconds=3600, spool_dir=str(tmp_path))
+    assert compactor.delete_spooled_uploads() == 1
+    assert not os.path.exists(old)
+    assert os.path.exists(fresh) and os.path.exists(unrelated)
+
+
+def test_cancelled_upload_is_forgotten(tmp_path):
+    job_id = str(uuid.uuid4())
+    db, conn = get_db_connection()
+    conn.execute("INSERT into job(job_id,status,username,created_at,result,error) VALUES (?, ?, ?, ?, ?, ?)",
+                 (job_id, "cancelled", "upload-user", datetime.now().isoformat(), None, None))
+    db.commit()
+    conn.close()
+    path = spool_file(tmp_path, "upload-ghi789_z.code", 0)
+    cancellations.cancel(job_id)
+
+    assert analyze_upload_task(path, "sha", "upload-user", job_id) == "cancelled"
+    assert not os.path.exists(path)
+    assert job_id not in cancellations._cancelled and job_id not in cancellations._checked
@@ -0,0 +1,37 @@
+import pytest
+from app.utils import report_render
+from app.utils.report_render import render_html
+
+SECTION = """## Security
+
+The handler echoes input:
+
+<script>alert(document.cookie)</script>
+
+Inline <img src=x onerror="alert(1)"> too, and [a link](javascript:alert(1)).
+
+```html
+<script>fenced()</script>
+```
+"""
+
+
+@pytest.mark.parametrize("use_markdown", [True, False])
+def test_raw_html_in_a_section_is_escaped(monkeypatch, use_markdown):
+    if use_markdown:
+        pytest.importorskip("markdown")
+    else:
+        monkeypatch.setattr(report_render, "markdown", None)
+    page = render_html("job-1", SECTION)
+
+    assert "<script>" not in page and "<img" not in page and 'href="javascript' not in page
+    assert "&lt;script&gt;alert(document.cookie)&lt;/script&gt;" in page
+    assert "&lt;script&gt;fenced()&lt;/script&gt;" in page
+
+
+def test_links_keep_safe_schemes_only():
+    pytest.importorskip("markdown")
+    page = render_html("job-1", "[docs](https://example.com/a) [rel](#top) [bad](JaVa\tScript:alert(1))")
+
+    assert 'href="https://example.com/a"' in page and 'href="#top"' in page
+    assert page.count("href=") == 2
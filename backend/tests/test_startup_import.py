@@ -0,0 +1,26 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# loaded by app.utils.warmup or the first job, never by importing the API
+DEFERRED = ("langgraph", "langchain_aws", "langchain_core", "boto3", "botocore", "app.analyzer_logic.graph")
+# generous next to the ~400 ms it takes, so only a regression trips it
+IMPORT_BUDGET_MS = float(os.getenv("IMPORT_BUDGET_MS", "1500"))
+
+
+def test_importing_the_api_defers_the_analyzer_stack():
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import json, sys, main; print(json.dumps(sorted(sys.modules)))"],
+        env=dict(os.environ, PYTHONPATH=BACKEND_DIR), cwd=tempfile.mkdtemp(prefix="review-import-"),
+        capture_output=True, text=True, check=True
+    )
+    loaded = json.loads(result.stdout)
+    assert [name for name in loaded if name.split(".")[0] in DEFERRED or name in DEFERRED] == []
+
+    main_line = next(line for line in result.stderr.splitlines() if line.rstrip().endswith("| main"))
+    cumulative_ms = int(main_line.split("|")[1]) / 1000
+    assert cumulative_ms < IMPORT_BUDGET_MS